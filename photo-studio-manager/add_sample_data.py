@@ -13,15 +13,19 @@ import random
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from database.mysql_database_manager import MySQLDatabaseManager
+from database.repository import create_repository
 from models.database_models import Klien, Fotografer, Studio, Jadwal
 
+def newest_ids(rows, id_field, count):
+    """Get the IDs of the most recently inserted rows"""
+    return sorted(row[id_field] for row in rows)[-count:]
+
 def add_sample_data():
     """Add comprehensive sample data to the database"""
     print("Adding sample data to Photo Studio Management System...")
     
-    # Initialize MySQL database manager
-    db_manager = MySQLDatabaseManager()
+    # Initialize the configured database backend
+    db_manager = create_repository()
     
     # Sample clients
     print("\nAdding sample clients...")
@@ -36,11 +40,9 @@ def add_sample_data():
         {"nama": "Hani Puspita", "nomor_hp": "081234567897", "email": "hani.puspita@email.com", "alamat": "Jl. Menteng No. 258, Jakarta"},
     ]
     
-    client_ids = []
+    db_manager.create_klien_many([Klien(**client_data) for client_data in clients])
+    client_ids = newest_ids(db_manager.get_all_klien(), 'id_klien', len(clients))
     for client_data in clients:
-        klien = Klien(**client_data)
-        klien_id = db_manager.create_klien(klien)
-        client_ids.append(klien_id)
         print(f"  Added client: {client_data['nama']}")
     
     # Sample photographers
@@ -55,11 +57,9 @@ def add_sample_data():
         {"nama": "Rina Moments", "spesialisasi": "Prewedding", "nomor_hp": "082134567896"},
     ]
     
-    photographer_ids = []
+    db_manager.create_fotografer_many([Fotografer(**photographer_data) for photographer_data in photographers])
+    photographer_ids = newest_ids(db_manager.get_all_fotografer(), 'id_fotografer', len(photographers))
     for photographer_data in photographers:
-        fotografer = Fotografer(**photographer_data)
-        fotografer_id = db_manager.create_fotografer(fotografer)
-        photographer_ids.append(fotografer_id)
         print(f"  Added photographer: {photographer_data['nama']} ({photographer_data['spesialisasi']})")
     
     # Sample studios
@@ -73,11 +73,9 @@ def add_sample_data():
         {"nama_studio": "Studio Modern", "lokasi": "Tangerang", "kapasitas": 25},
     ]
     
-    studio_ids = []
+    db_manager.create_studio_many([Studio(**studio_data) for studio_data in studios])
+    studio_ids = newest_ids(db_manager.get_all_studio(), 'id_studio', len(studios))
     for studio_data in studios:
-        studio = Studio(**studio_data)
-        studio_id = db_manager.create_studio(studio)
-        studio_ids.append(studio_id)
         print(f"  Added studio: {studio_data['nama_studio']} - {studio_data['lokasi']} ({studio_data['kapasitas']} capacity)")
     
     # Sample schedules
@@ -132,19 +130,21 @@ def add_sample_data():
             "catatan": "Sesi foto mendatang - pastikan semua peralatan siap"
         })
     
-    # Add schedules to database
-    for schedule_data in schedules:
-        jadwal = Jadwal(**schedule_data)
-        success, message = db_manager.create_jadwal(jadwal)
+    # Add schedules to database in one batch
+    results = db_manager.create_jadwal_many([Jadwal(**schedule_data) for schedule_data in schedules])
+    retry = []
+    for schedule_data, (success, message) in zip(schedules, results):
         if success:
             print(f"  Added schedule: {schedule_data['jenis_paket']} on {schedule_data['tanggal_waktu'].strftime('%d/%m/%Y %H:%M')} - {schedule_data['status']}")
         else:
             # Try with different time if conflict
             schedule_data['tanggal_waktu'] += timedelta(hours=2)
-            jadwal = Jadwal(**schedule_data)
-            success, message = db_manager.create_jadwal(jadwal)
-            if success:
-                print(f"  Added schedule (adjusted): {schedule_data['jenis_paket']} on {schedule_data['tanggal_waktu'].strftime('%d/%m/%Y %H:%M')} - {schedule_data['status']}")
+            retry.append(schedule_data)
+    
+    retry_results = db_manager.create_jadwal_many([Jadwal(**schedule_data) for schedule_data in retry])
+    for schedule_data, (success, message) in zip(retry, retry_results):
+        if success:
+            print(f"  Added schedule (adjusted): {schedule_data['jenis_paket']} on {schedule_data['tanggal_waktu'].strftime('%d/%m/%Y %H:%M')} - {schedule_data['status']}")
     
     print(f"\n✅ Sample data added successfully!")
     print(f"   - {len(clients)} clients")
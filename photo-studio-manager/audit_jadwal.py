@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Audit the Photo Studio Management System schedule for double bookings
+Finds every pair of overlapping Booked sessions on a photographer or studio and writes a report
+"""
+
+import sys
+import os
+import argparse
+import csv
+from datetime import datetime
+
+# Add current directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from database.repository import BACKENDS, create_repository
+
+try:
+    import openpyxl
+    from openpyxl.styles import Font, PatternFill
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+REPORT_COLUMNS = [
+    ("resource", "Jenis"),
+    ("id_resource", "ID"),
+    ("nama_resource", "Fotografer/Studio"),
+    ("id_sesi_1", "Sesi 1"),
+    ("tanggal_waktu_1", "Tanggal/Waktu 1"),
+    ("waktu_selesai_1", "Selesai 1"),
+    ("nama_klien_1", "Klien 1"),
+    ("id_sesi_2", "Sesi 2"),
+    ("tanggal_waktu_2", "Tanggal/Waktu 2"),
+    ("waktu_selesai_2", "Selesai 2"),
+    ("nama_klien_2", "Klien 2"),
+]
+
+
+def format_value(value):
+    """Format a report value for display"""
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y %H:%M')
+    return value
+
+
+def write_csv(conflicts, output_path):
+    """Write the conflict report as CSV"""
+    with open(output_path, "w", newline="", encoding="utf-8") as report:
+        writer = csv.writer(report)
+        writer.writerow([header for _, header in REPORT_COLUMNS])
+        for conflict in conflicts:
+            writer.writerow([format_value(conflict[key]) for key, _ in REPORT_COLUMNS])
+
+
+def write_excel(conflicts, output_path):
+    """Write the conflict report as an Excel workbook"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Jadwal Bentrok"
+    for col, (_, header) in enumerate(REPORT_COLUMNS, 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
+    for row, conflict in enumerate(conflicts, 2):
+        for col, (key, _) in enumerate(REPORT_COLUMNS, 1):
+            ws.cell(row=row, column=col, value=format_value(conflict[key]))
+    for col in ws.columns:
+        width = max(len(str(cell.value or "")) for cell in col)
+        ws.column_dimensions[col[0].column_letter].width = min(width + 2, 50)
+    wb.save(output_path)
+
+
+def write_report(conflicts, output_path):
+    """Write the report as Excel for .xlsx paths, otherwise as CSV"""
+    if output_path.lower().endswith(".xlsx"):
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("OpenPyXL tidak tersedia. Install dengan: pip install openpyxl")
+        write_excel(conflicts, output_path)
+    else:
+        write_csv(conflicts, output_path)
+
+
+def main():
+    """Audit entry point; exits with status 1 when double bookings are found"""
+    parser = argparse.ArgumentParser(description="Find double-booked photographers and studios")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="database backend, default from config/database.py")
+    parser.add_argument("--db-path", default=None, help="SQLite database file")
+    parser.add_argument("--output", default=None,
+                        help="report file (.xlsx or .csv), default jadwal_bentrok_<date>.xlsx")
+    args = parser.parse_args()
+
+    options = {"db_path": args.db_path} if args.db_path else {}
+    db_manager = create_repository(args.backend, **options)
+    try:
+        conflicts = db_manager.audit_double_bookings()
+    finally:
+        db_manager.close()
+
+    if not conflicts:
+        print("✅ Tidak ada jadwal bentrok")
+        return
+
+    extension = "xlsx" if OPENPYXL_AVAILABLE else "csv"
+    output_path = args.output or f"jadwal_bentrok_{datetime.now().strftime('%Y%m%d')}.{extension}"
+    try:
+        write_report(conflicts, output_path)
+    except (RuntimeError, OSError) as e:
+        print(f"❌ {len(conflicts)} jadwal bentrok, laporan gagal ditulis: {e}")
+        sys.exit(2)
+    fotografer_count = sum(1 for conflict in conflicts if conflict['resource'] == 'fotografer')
+    print(f"❌ {len(conflicts)} jadwal bentrok ({fotografer_count} fotografer, "
+          f"{len(conflicts) - fotografer_count} studio), laporan: {output_path}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ Configure MySQL connection settings for Laragon
 
 import os
 
+# Database backend used by the application: 'mysql' (Laragon) or 'sqlite' (single desk)
+DATABASE_BACKEND = os.environ.get('PHOTO_STUDIO_DB_BACKEND', 'mysql')
+
 # MySQL Database Configuration for Laragon
 DATABASE_CONFIG = {
     'host': 'localhost',
@@ -36,6 +39,68 @@ DATABASE_CONFIG = {
 }
 """
 
+# Connection pool settings used by MySQLDatabaseManager
+POOL_CONFIG = {
+    'pool_size': 5,             # Connections kept open while idle
+    'max_overflow': 5,          # Extra connections allowed under load
+    'idle_timeout': 300,        # Seconds before an idle connection is recycled
+    'checkout_timeout': 30,     # Seconds to wait for a free connection
+    'health_check_after': 1.0,  # Ping connections idle longer than this on checkout
+    'reconnect_attempts': 3,    # Retries when opening a connection fails
+    'reconnect_backoff': 0.5,   # Initial retry delay in seconds (doubles each retry)
+}
+
+# Prepared statements cached per pooled MySQL connection (0 disables the cache)
+PREPARED_STATEMENT_CACHE_SIZE = 32
+
+# In-memory index of Booked sessions answering check_schedule_conflict
+SCHEDULE_INDEX_CONFIG = {
+    'enabled': True,
+    'max_age': 60,              # Seconds before reloading, to see other desks' bookings
+}
+
+# Rows per executemany() call in the bulk create_*_many APIs
+BULK_BATCH_SIZE = 500
+
+# Most clients returned by one search_klien() call
+KLIEN_SEARCH_LIMIT = 200
+
+# In-memory trigram index of client names answering fuzzy_search_klien
+KLIEN_NAME_INDEX_CONFIG = {
+    'enabled': True,
+    'max_age': 30,              # Seconds before fetching other desks' new and renamed clients
+    'settle': 10,               # Seconds a rename may take to commit; newer ones are fetched again
+    'preload': True,            # Load every name on a background thread at startup
+}
+
+# Candidates returned by one fuzzy_search_klien() call
+KLIEN_FUZZY_LIMIT = 10
+
+# SQLite engine settings used by DatabaseManager (single-desk mode)
+SQLITE_CONFIG = {
+    'persistent': True,         # Keep one writer and a pool of reader connections open
+    'reader_pool_size': 3,      # Reader connections (dashboard timer, tables, reports)
+    'busy_timeout': 5.0,        # Seconds to wait on a locked database
+}
+
+# PRAGMAs applied to every persistent SQLite connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',      # Readers never block the writer and vice versa
+    'synchronous': 'NORMAL',    # Safe with WAL, avoids an fsync per commit
+    'foreign_keys': 'ON',
+    'cache_size': -16000,       # Negative value = KiB, so 16 MB page cache
+    'mmap_size': 268435456,     # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+}
+
+# Query timing collected by both database managers
+INSTRUMENTATION_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 100,       # Log statements slower than this (with parameters)
+    'dump_path': None,          # JSON lines file for periodic stats dumps, e.g. 'query_stats.jsonl'
+    'dump_interval': 60,        # Seconds between dumps
+}
+
 # Test connection function
 def test_connection():
     """Test the database connection"""
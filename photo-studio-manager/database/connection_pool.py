@@ -0,0 +1,225 @@
+"""
+Connection Pool for Photo Studio Management System
+Keeps long-lived database connections and hands them out to the managers
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable DB-API connections
+
+    The pool keeps up to ``pool_size`` idle connections open. When all of
+    them are checked out it opens up to ``max_overflow`` extra connections,
+    which are closed again on release instead of being kept idle.
+    """
+
+    def __init__(self, factory: Callable[[], Any], pool_size: int = 5,
+                 max_overflow: int = 5, idle_timeout: float = 300,
+                 checkout_timeout: float = 30,
+                 health_check: Optional[Callable[[Any], bool]] = None,
+                 health_check_after: float = 0,
+                 reconnect_attempts: int = 3, reconnect_backoff: float = 0.5,
+                 reconnect_backoff_max: float = 8.0):
+        """Initialize pool with a connection factory and sizing options"""
+        self.factory = factory
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check = health_check
+        self.health_check_after = health_check_after
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self.reconnect_backoff_max = reconnect_backoff_max
+
+        self._idle = deque()  # (connection, last_released_at)
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Counters
+        self._checkouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._created = 0
+        self._reconnects = 0
+        self._discarded = 0
+        self._timeouts = 0
+
+    def acquire(self):
+        """Check out a healthy connection, waiting if the pool is exhausted"""
+        started = time.perf_counter()
+        deadline = started + self.checkout_timeout
+
+        while True:
+            connection = None
+            idle_for = 0.0
+            must_create = False
+
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                while self._idle:
+                    candidate, released_at = self._idle.pop()
+                    idle_for = time.monotonic() - released_at
+                    if self.idle_timeout and idle_for > self.idle_timeout:
+                        self._close_quietly(candidate)
+                        self._open -= 1
+                        continue
+                    connection = candidate
+                    break
+
+                if connection is None:
+                    if self._open < self.pool_size + self.max_overflow:
+                        self._open += 1
+                        must_create = True
+                    else:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f"No database connection available after {self.checkout_timeout}s"
+                            )
+                        self._cond.wait(remaining)
+                        continue
+
+            if must_create:
+                try:
+                    connection = self._create_connection()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            elif idle_for >= self.health_check_after and not self._is_healthy(connection):
+                # Stale connection (server restart, network drop): replace it
+                self._close_quietly(connection)
+                try:
+                    connection = self._create_connection()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._reconnects += 1
+
+            waited = time.perf_counter() - started
+            with self._cond:
+                self._checkouts += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            return connection
+
+    def release(self, connection, discard: bool = False):
+        """Return a connection to the pool, or close it if it is broken or overflow
+
+        A connection still inside a transaction is rolled back first, so its
+        locks and uncommitted writes never reach the next borrower; one that
+        cannot be rolled back is closed instead.
+        """
+        if not discard and getattr(connection, 'in_transaction', False):
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            keep = (not discard and not self._closed
+                    and len(self._idle) < self.pool_size)
+            if keep:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._open -= 1
+                if discard:
+                    self._discarded += 1
+            self._cond.notify()
+
+        if not keep:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and back in"""
+        connection = self.acquire()
+        discard = False
+        try:
+            yield connection
+        except Exception:
+            discard = not self._is_healthy(connection)
+            raise
+        finally:
+            self.release(connection, discard)
+
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool counters"""
+        with self._cond:
+            return {
+                'checkouts': self._checkouts,
+                'wait_time_total': self._wait_time_total,
+                'wait_time_max': self._wait_time_max,
+                'wait_time_avg': (self._wait_time_total / self._checkouts
+                                  if self._checkouts else 0.0),
+                'connections_created': self._created,
+                'reconnects': self._reconnects,
+                'discarded': self._discarded,
+                'timeouts': self._timeouts,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+            }
+
+    def _create_connection(self):
+        """Open a new connection, retrying with exponential backoff"""
+        attempt = 0
+        while True:
+            try:
+                connection = self.factory()
+                with self._cond:
+                    self._created += 1
+                return connection
+            except Exception:
+                attempt += 1
+                if attempt > self.reconnect_attempts:
+                    raise
+                delay = min(self.reconnect_backoff * (2 ** (attempt - 1)),
+                            self.reconnect_backoff_max)
+                time.sleep(delay)
+
+    def _is_healthy(self, connection) -> bool:
+        """Run the health check on a connection"""
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(connection))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        """Close a connection, ignoring errors from dead sockets"""
+        try:
+            connection.close()
+        except Exception:
+            pass
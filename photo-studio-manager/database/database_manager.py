@@ -5,28 +5,117 @@ Handles SQLite database operations and CRUD functionality
 
 import sqlite3
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 
-from models.database_models import Klien, Fotografer, Studio, Jadwal
+from config.database import (SQLITE_CONFIG, SQLITE_PRAGMAS, BULK_BATCH_SIZE, INSTRUMENTATION_CONFIG,
+                             KLIEN_FUZZY_LIMIT, KLIEN_NAME_INDEX_CONFIG, KLIEN_SEARCH_LIMIT,
+                             SCHEDULE_INDEX_CONFIG)
+from database.connection_pool import ConnectionPool
+from database.instrumentation import InstrumentedConnection, QueryStats
+from database.repository import DATA_VERSION_TABLES, VERSIONED_TABLES, StaleDataError
+from models.database_models import Klien, Fotografer, Studio, Jadwal, PAKET_DURASI_MENIT
+from services.schedule_conflicts import (DEFAULT_DURATION, FOTOGRAFER_CONFLICT_MSG,
+                                         FREE_SLOT_STEP, MAX_DURATION, STUDIO_CONFLICT_MSG,
+                                         detect_batch_conflicts, detect_series_conflicts,
+                                         find_overlapping_pairs, free_slots, to_datetime)
+from services.schedule_index import ScheduleIndex
+from services.availability import ALL_SLOTS, AvailabilityStore, busy_mask, start_mask
+from services.assignment import assign_resources
+from services.text_search import fts5_prefix_query
+from services.name_index import DEFAULT_THRESHOLD, FuzzyNameIndex
+from services.phone_numbers import looks_like_phone, normalize_phone, phone_prefix_range
 
 class DatabaseManager:
     """Manages all database operations for the photo studio system"""
     
-    def __init__(self, db_path: str = "photo_studio.db"):
-        """Initialize database manager with database path"""
+    def __init__(self, db_path: str = "photo_studio.db", persistent: Optional[bool] = None,
+                 pragmas: Optional[Dict[str, Any]] = None, reader_pool_size: Optional[int] = None,
+                 instrumentation: Optional[Dict[str, Any]] = None):
+        """Initialize database manager with database path
+        
+        In persistent (single-desk) mode one writer connection and a small
+        pool of reader connections stay open for the lifetime of the manager.
+        Otherwise a new connection is opened for every operation.
+        """
         self.db_path = db_path
+        self.persistent = SQLITE_CONFIG['persistent'] if persistent is None else persistent
+        self.pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+        self.busy_timeout = SQLITE_CONFIG['busy_timeout']
+        self.instrumentation = dict(INSTRUMENTATION_CONFIG, **(instrumentation or {}))
+        self.query_stats = QueryStats(self.instrumentation['slow_query_ms'])
+        if self.instrumentation['dump_path']:
+            self.query_stats.start_periodic_dump(self.instrumentation['dump_path'],
+                                                 self.instrumentation['dump_interval'])
+        
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._readers = None
+        if self.persistent:
+            self._writer = self._open_connection()
+            pool_size = SQLITE_CONFIG['reader_pool_size'] if reader_pool_size is None else reader_pool_size
+            # An in-memory database is private to its connection, so reads share the writer
+            if pool_size > 0 and db_path != ":memory:":
+                self._readers = ConnectionPool(
+                    lambda: self._open_connection(readonly=True),
+                    pool_size=pool_size, max_overflow=0, idle_timeout=0
+                )
+        
+        self.schedule_index = None
+        self.availability = None
+        if SCHEDULE_INDEX_CONFIG['enabled']:
+            self.schedule_index = ScheduleIndex(self._load_booked_sessions,
+                                                SCHEDULE_INDEX_CONFIG['max_age'])
+            self.availability = AvailabilityStore(self.schedule_index)
+        self.klien_names = None
+        if KLIEN_NAME_INDEX_CONFIG['enabled']:
+            self.klien_names = FuzzyNameIndex(self._load_klien_names,
+                                              KLIEN_NAME_INDEX_CONFIG['max_age'])
+        self.klien_fts = False
         self.init_database()
+        if self.klien_names is not None and KLIEN_NAME_INDEX_CONFIG['preload']:
+            self.klien_names.start_loading()
+    
+    def _open_connection(self, readonly: bool = False) -> sqlite3.Connection:
+        """Open a persistent connection and apply the configured PRAGMAs"""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    def _instrument(self, conn, acquire_started: float):
+        """Record connection acquisition time and wrap the connection for query timing"""
+        if not self.instrumentation['enabled']:
+            return conn
+        self.query_stats.record_acquire(time.perf_counter() - acquire_started)
+        return InstrumentedConnection(conn, self.query_stats)
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
+        """Context manager for database connections (the writer in persistent mode)"""
+        started = time.perf_counter()
+        if self.persistent:
+            with self._writer_lock:
+                try:
+                    yield self._instrument(self._writer, started)
+                except Exception as e:
+                    # Never leave a transaction open on the shared writer
+                    self._writer.rollback()
+                    raise e
+            return
+        
         conn = None
         try:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row  # Enable column access by name
-            yield conn
+            yield self._instrument(conn, started)
         except sqlite3.Error as e:
             if conn:
                 conn.rollback()
@@ -35,6 +124,38 @@ class DatabaseManager:
             if conn:
                 conn.close()
     
+    @contextmanager
+    def get_read_connection(self):
+        """Context manager for read-only queries (a pooled reader in persistent mode)"""
+        if self._readers is None:
+            with self.get_connection() as conn:
+                yield conn
+            return
+        
+        started = time.perf_counter()
+        with self._readers.connection() as conn:
+            yield self._instrument(conn, started)
+    
+    def get_query_stats(self) -> Dict[str, Any]:
+        """Get per-statement latency histograms, row counts and connection wait times"""
+        return self.query_stats.snapshot()
+    
+    def reset_query_stats(self):
+        """Clear collected query statistics"""
+        self.query_stats.reset()
+    
+    def close(self):
+        """Close persistent connections"""
+        self.query_stats.stop_periodic_dump()
+        if self.klien_names is not None:
+            self.klien_names.stop_loading()
+        if self._readers is not None:
+            self._readers.close_all()
+        if self._writer is not None:
+            with self._writer_lock:
+                self._writer.close()
+                self._writer = None
+    
     def init_database(self):
         """Initialize database and create tables"""
         try:
@@ -46,8 +167,22 @@ class DatabaseManager:
                 cursor.execute(Fotografer.get_table_schema())
                 cursor.execute(Studio.get_table_schema())
                 cursor.execute(Jadwal.get_table_schema())
+                self._add_version_columns(cursor)
+                self._add_duration_columns(cursor)
+                self._add_phone_column(cursor)
+                self.klien_fts = self._add_klien_search_index(cursor)
+                self._add_change_counters(cursor)
                 
                 # Create indexes for better performance
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_klien_nomor_hp_e164 
+                    ON klien(nomor_hp_e164)
+                """)
+                # Other desks' renames for the fuzzy name index
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_klien_updated_at 
+                    ON klien(updated_at)
+                """)
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_jadwal_tanggal 
                     ON jadwal(tanggal_waktu)
@@ -64,6 +199,23 @@ class DatabaseManager:
                     CREATE INDEX IF NOT EXISTS idx_jadwal_studio 
                     ON jadwal(id_studio)
                 """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jadwal_fotografer_tanggal 
+                    ON jadwal(id_fotografer, tanggal_waktu)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jadwal_studio_tanggal 
+                    ON jadwal(id_studio, tanggal_waktu)
+                """)
+                # Covering indexes for the interval-overlap conflict check
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jadwal_fotografer_waktu 
+                    ON jadwal(id_fotografer, status, tanggal_waktu, waktu_selesai)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jadwal_studio_waktu 
+                    ON jadwal(id_studio, status, tanggal_waktu, waktu_selesai)
+                """)
                 
                 conn.commit()
                 print(f"Database initialized at: {os.path.abspath(self.db_path)}")
@@ -72,44 +224,184 @@ class DatabaseManager:
             print(f"Error initializing database: {e}")
             raise e
     
+    def _add_version_columns(self, cursor):
+        """Add the optimistic concurrency version column to databases created before it"""
+        for table in VERSIONED_TABLES:
+            cursor.execute(f"PRAGMA table_info({table})")
+            if 'version' not in [column[1] for column in cursor.fetchall()]:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    
+    def _add_duration_columns(self, cursor):
+        """Add session duration and end time to databases created before them
+        
+        Existing sessions get their package's default duration; waktu_selesai
+        is filled in batches of BULK_BATCH_SIZE.
+        """
+        cursor.execute("PRAGMA table_info(jadwal)")
+        if 'durasi_menit' in [column[1] for column in cursor.fetchall()]:
+            return
+        cursor.execute("ALTER TABLE jadwal ADD COLUMN durasi_menit INTEGER NOT NULL DEFAULT 60")
+        cursor.execute("ALTER TABLE jadwal ADD COLUMN waktu_selesai TIMESTAMP")
+        cursor.executemany("UPDATE jadwal SET durasi_menit = ? WHERE jenis_paket = ?",
+                           [(durasi, paket) for paket, durasi in PAKET_DURASI_MENIT.items()])
+        while True:
+            cursor.execute("""
+                SELECT id_sesi, tanggal_waktu, durasi_menit FROM jadwal
+                WHERE waktu_selesai IS NULL LIMIT ?
+            """, (BULK_BATCH_SIZE,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany("UPDATE jadwal SET waktu_selesai = ? WHERE id_sesi = ?", [
+                (to_datetime(row[1]) + timedelta(minutes=row[2]), row[0]) for row in rows
+            ])
+    
+    def _add_phone_column(self, cursor):
+        """Add the normalised phone column to a klien table created before it
+        
+        Existing clients are filled in batches of BULK_BATCH_SIZE, walking
+        the primary key so each batch is one index range.
+        """
+        cursor.execute("PRAGMA table_info(klien)")
+        if 'nomor_hp_e164' in [column[1] for column in cursor.fetchall()]:
+            return
+        cursor.execute("ALTER TABLE klien ADD COLUMN nomor_hp_e164 TEXT")
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT id_klien, nomor_hp FROM klien
+                WHERE id_klien > ? ORDER BY id_klien LIMIT ?
+            """, (last_id, BULK_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany("UPDATE klien SET nomor_hp_e164 = ? WHERE id_klien = ?",
+                               [(normalize_phone(row[1]), row[0]) for row in rows])
+            last_id = rows[-1][0]
+    
+    def _add_klien_search_index(self, cursor) -> bool:
+        """Create the FTS5 index behind search_klien, kept in sync with klien by triggers
+        
+        Returns False when this SQLite build has no FTS5; search_klien then
+        falls back to LIKE.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'klien_fts'")
+        created = cursor.fetchone() is None
+        if created:
+            try:
+                # External content: the index stores tokens only, rows stay in klien
+                cursor.execute("""
+                    CREATE VIRTUAL TABLE klien_fts USING fts5(
+                        nama, nomor_hp, content='klien', content_rowid='id_klien',
+                        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                    )
+                """)
+            except sqlite3.OperationalError as e:
+                print(f"FTS5 not available, client search uses LIKE: {e}")
+                return False
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS klien_fts_insert AFTER INSERT ON klien BEGIN
+                INSERT INTO klien_fts (rowid, nama, nomor_hp)
+                VALUES (new.id_klien, new.nama, new.nomor_hp);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS klien_fts_delete AFTER DELETE ON klien BEGIN
+                INSERT INTO klien_fts (klien_fts, rowid, nama, nomor_hp)
+                VALUES ('delete', old.id_klien, old.nama, old.nomor_hp);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS klien_fts_update AFTER UPDATE OF nama, nomor_hp ON klien BEGIN
+                INSERT INTO klien_fts (klien_fts, rowid, nama, nomor_hp)
+                VALUES ('delete', old.id_klien, old.nama, old.nomor_hp);
+                INSERT INTO klien_fts (rowid, nama, nomor_hp)
+                VALUES (new.id_klien, new.nama, new.nomor_hp);
+            END
+        """)
+        if created:
+            # Index the clients stored before the index existed
+            cursor.execute("INSERT INTO klien_fts (klien_fts) VALUES ('rebuild')")
+        return True
+    
+    def _add_change_counters(self, cursor):
+        """Count the writes to each table shown in the schedule, for get_jadwal_data_version
+        
+        Triggers bump the table's versi_data row on every insert, update and
+        delete, whichever desk or tool writes.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS versi_data (
+                nama_tabel TEXT PRIMARY KEY,
+                versi INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        for table in DATA_VERSION_TABLES:
+            cursor.execute("INSERT OR IGNORE INTO versi_data (nama_tabel) VALUES (?)", (table,))
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_versi_{event.lower()}
+                    AFTER {event} ON {table} BEGIN
+                        UPDATE versi_data SET versi = versi + 1 WHERE nama_tabel = '{table}';
+                    END
+                """)
+    
+    def _raise_stale(self, conn, table: str, key_column: str, key: int, version: int):
+        """Roll back a versioned update that matched no row and report the current row"""
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM {table} WHERE {key_column} = ?", (key,))
+        row = cursor.fetchone()
+        raise StaleDataError(table, key, version, dict(row) if row else None)
+    
     # KLIEN CRUD OPERATIONS
     def create_klien(self, klien: Klien) -> int:
         """Create a new client and return the ID"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO klien (nama, nomor_hp, email, alamat)
-                VALUES (?, ?, ?, ?)
-            """, (klien.nama, klien.nomor_hp, klien.email, klien.alamat))
+                INSERT INTO klien (nama, nomor_hp, nomor_hp_e164, email, alamat)
+                VALUES (?, ?, ?, ?, ?)
+            """, (klien.nama, klien.nomor_hp, normalize_phone(klien.nomor_hp), klien.email,
+                  klien.alamat))
             conn.commit()
-            return cursor.lastrowid
+            id_klien = cursor.lastrowid
+        if self.klien_names is not None:
+            self.klien_names.upsert(id_klien, klien.nama)
+        return id_klien
     
     def get_all_klien(self) -> List[Dict[str, Any]]:
         """Get all clients"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM klien ORDER BY nama")
             return [dict(row) for row in cursor.fetchall()]
     
     def get_klien_by_id(self, id_klien: int) -> Optional[Dict[str, Any]]:
         """Get client by ID"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM klien WHERE id_klien = ?", (id_klien,))
             row = cursor.fetchone()
             return dict(row) if row else None
     
     def update_klien(self, id_klien: int, klien: Klien) -> bool:
-        """Update client information"""
+        """Update client information (StaleDataError on a version mismatch)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                UPDATE klien SET nama = ?, nomor_hp = ?, email = ?, 
-                alamat = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id_klien = ?
-            """, (klien.nama, klien.nomor_hp, klien.email, klien.alamat, id_klien))
+                UPDATE klien SET nama = ?, nomor_hp = ?, nomor_hp_e164 = ?, email = ?, 
+                alamat = ?, version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id_klien = ? AND (? IS NULL OR version = ?)
+            """, (klien.nama, klien.nomor_hp, normalize_phone(klien.nomor_hp), klien.email,
+                  klien.alamat, id_klien, klien.version, klien.version))
+            if cursor.rowcount == 0 and klien.version is not None:
+                self._raise_stale(conn, "klien", "id_klien", id_klien, klien.version)
             conn.commit()
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated and self.klien_names is not None:
+            self.klien_names.upsert(id_klien, klien.nama)
+        return updated
     
     def delete_klien(self, id_klien: int) -> bool:
         """Delete client (only if no scheduled sessions)"""
@@ -122,19 +414,140 @@ class DatabaseManager:
             
             cursor.execute("DELETE FROM klien WHERE id_klien = ?", (id_klien,))
             conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted and self.klien_names is not None:
+            self.klien_names.remove(id_klien)
+        return deleted
     
-    def search_klien(self, search_term: str) -> List[Dict[str, Any]]:
-        """Search clients by name or phone"""
-        with self.get_connection() as conn:
+    def search_klien(self, search_term: str,
+                     limit: int = KLIEN_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Search clients by name or phone, at most limit rows ordered by name
+        
+        Every search word must start a word of the name or the phone number;
+        the klien_fts index finds them without scanning the table. A search
+        that looks like a phone number is first matched as the start of the
+        normalised number, so "0812..." also finds "+62 812...".
+        """
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
+            if looks_like_phone(search_term):
+                cursor.execute("""
+                    SELECT * FROM klien
+                    WHERE nomor_hp_e164 >= ? AND nomor_hp_e164 < ?
+                    ORDER BY nama
+                    LIMIT ?
+                """, (*phone_prefix_range(search_term), limit))
+                rows = cursor.fetchall()
+                if rows:
+                    return [dict(row) for row in rows]
+            
+            if not self.klien_fts:
+                cursor.execute("""
+                    SELECT * FROM klien 
+                    WHERE nama LIKE ? OR nomor_hp LIKE ?
+                    ORDER BY nama
+                    LIMIT ?
+                """, (f"%{search_term}%", f"%{search_term}%", limit))
+                return [dict(row) for row in cursor.fetchall()]
+            
+            query = fts5_prefix_query(search_term)
+            if not query:
+                return []
             cursor.execute("""
-                SELECT * FROM klien 
-                WHERE nama LIKE ? OR nomor_hp LIKE ?
-                ORDER BY nama
-            """, (f"%{search_term}%", f"%{search_term}%"))
+                SELECT k.* FROM klien_fts
+                JOIN klien k ON k.id_klien = klien_fts.rowid
+                WHERE klien_fts MATCH ?
+                ORDER BY k.nama
+                LIMIT ?
+            """, (query, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def find_klien_by_phone(self, nomor_hp: str) -> List[Dict[str, Any]]:
+        """Get the clients with this phone number, however either number was written
+        
+        One equality lookup on the nomor_hp_e164 index; usually one row,
+        more when family members share a number.
+        """
+        normalized = normalize_phone(nomor_hp)
+        if normalized is None:
+            return []
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM klien WHERE nomor_hp_e164 = ? ORDER BY nama", (normalized,))
             return [dict(row) for row in cursor.fetchall()]
     
+    def fuzzy_search_klien(self, search_term: str, limit: int = KLIEN_FUZZY_LIMIT,
+                           threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+        """Find clients whose name resembles search_term despite typos, best first
+        
+        Each row gets a 'kemiripan' key with its trigram similarity (0-1);
+        only names at least threshold similar are returned.
+        """
+        index = self.klien_names or FuzzyNameIndex(self._load_klien_names, max_age=None)
+        matches = index.search(search_term, limit, threshold)
+        if not matches:
+            return []
+        ids = [id_klien for id_klien, _ in matches]
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT * FROM klien WHERE id_klien IN ({','.join('?' * len(ids))})", ids)
+            rows = {row['id_klien']: dict(row) for row in cursor.fetchall()}
+        # Clients deleted at another desk are skipped and dropped from the index
+        for id_klien, _ in matches:
+            if id_klien not in rows:
+                index.remove(id_klien)
+        return [dict(rows[id_klien], kemiripan=score)
+                for id_klien, score in matches if id_klien in rows]
+    
+    def _load_klien_names(self, last_id: Optional[int] = None,
+                          settled_at: Optional[str] = None) -> Tuple[List[Dict[str, Any]], str]:
+        """Get client names for the fuzzy name index, all or those changed since a fetch
+        
+        Returns the rows and the database time settle seconds ago; renames
+        stamped after it are fetched again next time in case one was still
+        uncommitted.
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT datetime('now', ?)",
+                           (f"-{KLIEN_NAME_INDEX_CONFIG['settle']} seconds",))
+            settled = cursor.fetchone()[0]
+            if last_id is None:
+                cursor.execute("SELECT id_klien, nama FROM klien")
+            else:
+                cursor.execute("""
+                    SELECT id_klien, nama FROM klien
+                    WHERE id_klien > ? OR updated_at > ?
+                """, (last_id, settled_at))
+            return [dict(row) for row in cursor.fetchall()], settled
+    
+    def create_klien_many(self, klien_list: List[Klien],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Create many clients in one transaction and return the number inserted"""
+        rows = [(klien.nama, klien.nomor_hp, normalize_phone(klien.nomor_hp), klien.email,
+                 klien.alamat) for klien in klien_list]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT COALESCE(MAX(id_klien), 0) FROM klien")
+            last_id = cursor.fetchone()[0]
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    "INSERT INTO klien (nama, nomor_hp, nomor_hp_e164, email, alamat) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows[offset:offset + batch_size]
+                )
+            # AUTOINCREMENT ids only grow and the write lock keeps other desks out
+            cursor.execute("SELECT id_klien, nama FROM klien WHERE id_klien > ?", (last_id,))
+            created = [dict(row) for row in cursor.fetchall()]
+            conn.commit()
+        if self.klien_names is not None:
+            self.klien_names.upsert_many(created)
+        return len(rows)
+    
     # FOTOGRAFER CRUD OPERATIONS
     def create_fotografer(self, fotografer: Fotografer) -> int:
         """Create a new photographer and return the ID"""
@@ -149,20 +562,32 @@ class DatabaseManager:
     
     def get_all_fotografer(self) -> List[Dict[str, Any]]:
         """Get all photographers"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM fotografer ORDER BY nama")
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_fotografer_by_id(self, id_fotografer: int) -> Optional[Dict[str, Any]]:
+        """Get photographer by ID"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM fotografer WHERE id_fotografer = ?", (id_fotografer,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
     def update_fotografer(self, id_fotografer: int, fotografer: Fotografer) -> bool:
-        """Update photographer information"""
+        """Update photographer information (StaleDataError on a version mismatch)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE fotografer SET nama = ?, spesialisasi = ?, nomor_hp = ?,
-                updated_at = CURRENT_TIMESTAMP
-                WHERE id_fotografer = ?
-            """, (fotografer.nama, fotografer.spesialisasi, fotografer.nomor_hp, id_fotografer))
+                version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id_fotografer = ? AND (? IS NULL OR version = ?)
+            """, (fotografer.nama, fotografer.spesialisasi, fotografer.nomor_hp, id_fotografer,
+                  fotografer.version, fotografer.version))
+            if cursor.rowcount == 0 and fotografer.version is not None:
+                self._raise_stale(conn, "fotografer", "id_fotografer", id_fotografer,
+                                  fotografer.version)
             conn.commit()
             return cursor.rowcount > 0
     
@@ -178,6 +603,24 @@ class DatabaseManager:
             conn.commit()
             return cursor.rowcount > 0
     
+    def create_fotografer_many(self, fotografer_list: List[Fotografer],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Create many photographers in one transaction and return the number inserted"""
+        rows = [(fotografer.nama, fotografer.spesialisasi, fotografer.nomor_hp) for fotografer in fotografer_list]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    "INSERT INTO fotografer (nama, spesialisasi, nomor_hp) VALUES (?, ?, ?)",
+                    rows[offset:offset + batch_size]
+                )
+            conn.commit()
+            return len(rows)
+    
     # STUDIO CRUD OPERATIONS
     def create_studio(self, studio: Studio) -> int:
         """Create a new studio and return the ID"""
@@ -192,20 +635,31 @@ class DatabaseManager:
     
     def get_all_studio(self) -> List[Dict[str, Any]]:
         """Get all studios"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM studio ORDER BY nama_studio")
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_studio_by_id(self, id_studio: int) -> Optional[Dict[str, Any]]:
+        """Get studio by ID"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM studio WHERE id_studio = ?", (id_studio,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
     def update_studio(self, id_studio: int, studio: Studio) -> bool:
-        """Update studio information"""
+        """Update studio information (StaleDataError on a version mismatch)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE studio SET nama_studio = ?, lokasi = ?, kapasitas = ?,
-                updated_at = CURRENT_TIMESTAMP
-                WHERE id_studio = ?
-            """, (studio.nama_studio, studio.lokasi, studio.kapasitas, id_studio))
+                version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id_studio = ? AND (? IS NULL OR version = ?)
+            """, (studio.nama_studio, studio.lokasi, studio.kapasitas, id_studio,
+                  studio.version, studio.version))
+            if cursor.rowcount == 0 and studio.version is not None:
+                self._raise_stale(conn, "studio", "id_studio", id_studio, studio.version)
             conn.commit()
             return cursor.rowcount > 0
     
@@ -221,75 +675,417 @@ class DatabaseManager:
             conn.commit()
             return cursor.rowcount > 0
     
+    def create_studio_many(self, studio_list: List[Studio],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Create many studios in one transaction and return the number inserted"""
+        rows = [(studio.nama_studio, studio.lokasi, studio.kapasitas) for studio in studio_list]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    "INSERT INTO studio (nama_studio, lokasi, kapasitas) VALUES (?, ?, ?)",
+                    rows[offset:offset + batch_size]
+                )
+            conn.commit()
+            return len(rows)
+    
     # JADWAL CRUD OPERATIONS
     def create_jadwal(self, jadwal: Jadwal) -> Tuple[bool, str]:
-        """Create a new schedule with conflict checking"""
-        # Check for conflicts
-        conflict_msg = self.check_schedule_conflict(
-            jadwal.id_fotografer, jadwal.id_studio, 
-            jadwal.tanggal_waktu, jadwal.id_sesi
-        )
-        
-        if conflict_msg:
-            return False, conflict_msg
+        """Create a new schedule with conflict checking
         
+        The conflict check and the insert run in one transaction, so two
+        desks cannot book the same slot concurrently.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Take the write lock up front so no other booking can slip in
+            # between the conflict check and the insert
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            conflict_msg = self._find_schedule_conflict(
+                cursor, jadwal.id_fotografer, jadwal.id_studio,
+                jadwal.tanggal_waktu, jadwal.durasi_menit, jadwal.id_sesi
+            )
+            if conflict_msg:
+                conn.rollback()
+                return False, conflict_msg
+            
             cursor.execute("""
                 INSERT INTO jadwal (id_klien, id_fotografer, id_studio, 
-                tanggal_waktu, jenis_paket, status, catatan)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                tanggal_waktu, jenis_paket, status, catatan, durasi_menit, waktu_selesai)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio,
-                  jadwal.tanggal_waktu, jadwal.jenis_paket, jadwal.status, jadwal.catatan))
+                  jadwal.tanggal_waktu, jadwal.jenis_paket, jadwal.status, jadwal.catatan,
+                  jadwal.durasi_menit, jadwal.waktu_selesai))
             conn.commit()
-            return True, "Schedule created successfully"
+            id_sesi = cursor.lastrowid
+        jadwal.id_sesi = id_sesi
+        
+        # Outside the connection block: the index may need a connection to load
+        if self.schedule_index is not None:
+            self.schedule_index.upsert(id_sesi, jadwal.id_fotografer, jadwal.id_studio,
+                                       jadwal.tanggal_waktu, jadwal.status,
+                                       timedelta(minutes=jadwal.durasi_menit))
+        return True, "Schedule created successfully"
     
-    def check_schedule_conflict(self, id_fotografer: int, id_studio: int, 
-                              tanggal_waktu: datetime, exclude_session: int = None) -> str:
-        """Check for scheduling conflicts"""
+    def create_jadwal_many(self, jadwal_list: List[Jadwal],
+                           batch_size: int = BULK_BATCH_SIZE) -> List[Tuple[bool, str]]:
+        """Create many schedules in one transaction with batched conflict checking
+        
+        Conflicts are checked against the database with one range query per
+        resource type and within the batch in memory, where earlier rows win.
+        Non-conflicting rows are inserted; conflicting rows are skipped.
+        
+        Returns:
+            One (success, message) tuple per input row, like create_jadwal
+        """
+        if not jadwal_list:
+            return []
+        
+        times = [to_datetime(jadwal.tanggal_waktu) for jadwal in jadwal_list]
+        # Sessions starting up to MAX_DURATION before the batch may still run into it
+        range_start = min(times) - MAX_DURATION
+        range_end = max(start + timedelta(minutes=jadwal.durasi_menit)
+                        for start, jadwal in zip(times, jadwal_list))
+        fotografer_ids = sorted({jadwal.id_fotografer for jadwal in jadwal_list})
+        studio_ids = sorted({jadwal.id_studio for jadwal in jadwal_list})
+        fotografer_marks = ", ".join(["?"] * len(fotografer_ids))
+        studio_marks = ", ".join(["?"] * len(studio_ids))
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
             
-            # Check photographer availability (2-hour buffer)
-            time_start = tanggal_waktu - timedelta(hours=1)
-            time_end = tanggal_waktu + timedelta(hours=1)
-            
-            query = """
-                SELECT COUNT(*) FROM jadwal 
-                WHERE id_fotografer = ? AND status = 'Booked'
-                AND tanggal_waktu BETWEEN ? AND ?
-            """
-            params = [id_fotografer, time_start, time_end]
+            existing = []
+            cursor.execute(f"""
+                SELECT id_fotografer, tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE status = 'Booked' AND id_fotografer IN ({fotografer_marks})
+                AND tanggal_waktu > ? AND tanggal_waktu < ?
+            """, fotografer_ids + [range_start, range_end])
+            existing += [{'id_fotografer': row[0], 'tanggal_waktu': row[1],
+                          'waktu_selesai': row[2]} for row in cursor.fetchall()]
+            cursor.execute(f"""
+                SELECT id_studio, tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE status = 'Booked' AND id_studio IN ({studio_marks})
+                AND tanggal_waktu > ? AND tanggal_waktu < ?
+            """, studio_ids + [range_start, range_end])
+            existing += [{'id_studio': row[0], 'tanggal_waktu': row[1],
+                          'waktu_selesai': row[2]} for row in cursor.fetchall()]
             
-            if exclude_session:
-                query += " AND id_sesi != ?"
-                params.append(exclude_session)
-            
-            cursor.execute(query, params)
-            if cursor.fetchone()[0] > 0:
-                return "Fotografer sudah memiliki jadwal pada waktu tersebut"
-            
-            # Check studio availability
-            query = """
-                SELECT COUNT(*) FROM jadwal 
-                WHERE id_studio = ? AND status = 'Booked'
-                AND tanggal_waktu BETWEEN ? AND ?
-            """
-            params = [id_studio, time_start, time_end]
-            
-            if exclude_session:
-                query += " AND id_sesi != ?"
-                params.append(exclude_session)
+            conflicts = detect_batch_conflicts(jadwal_list, existing)
+            rows = [
+                (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio, jadwal.tanggal_waktu,
+                 jadwal.jenis_paket, jadwal.status, jadwal.catatan, jadwal.durasi_menit,
+                 jadwal.waktu_selesai)
+                for jadwal, conflict in zip(jadwal_list, conflicts) if not conflict
+            ]
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany("""
+                    INSERT INTO jadwal (id_klien, id_fotografer, id_studio,
+                    tanggal_waktu, jenis_paket, status, catatan, durasi_menit, waktu_selesai)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows[offset:offset + batch_size])
+            conn.commit()
+        
+        if self.schedule_index is not None and rows:
+            # executemany does not report the new IDs, so reload on next use
+            self.schedule_index.invalidate()
+        
+        return [(False, conflict) if conflict else (True, "Schedule created successfully")
+                for conflict in conflicts]
+    
+    def create_jadwal_series(self, jadwal: Jadwal, occurrences: List[datetime],
+                             batch_size: int = BULK_BATCH_SIZE
+                             ) -> List[Tuple[datetime, bool, str, Optional[int]]]:
+        """Create a recurring series of one session in a single transaction
+        
+        Every occurrence is checked against the photographer's and the
+        studio's bookings in one sorted merge pass per resource; the
+        non-conflicting occurrences are inserted, the others skipped.
+        
+        Args:
+            jadwal: template session (client, resources, package, status, notes)
+            occurrences: start times, e.g. from services.recurrence.expand_recurrence
+        
+        Returns:
+            One (tanggal_waktu, success, message, id_sesi) tuple per occurrence,
+            in time order; id_sesi is None for a skipped occurrence
+        """
+        times = sorted({to_datetime(when) for when in occurrences})
+        if not times:
+            return []
+        duration = timedelta(minutes=jadwal.durasi_menit)
+        range_start = times[0] - MAX_DURATION
+        range_end = times[-1] + duration
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT COALESCE(MAX(id_sesi), 0) FROM jadwal")
+            last_id = cursor.fetchone()[0]
             
-            cursor.execute(query, params)
-            if cursor.fetchone()[0] > 0:
-                return "Studio sudah digunakan pada waktu tersebut"
+            booked = {}
+            for column, value in (("id_fotografer", jadwal.id_fotografer),
+                                  ("id_studio", jadwal.id_studio)):
+                cursor.execute(f"""
+                    SELECT tanggal_waktu, waktu_selesai FROM jadwal
+                    WHERE {column} = ? AND status = 'Booked'
+                    AND tanggal_waktu > ? AND tanggal_waktu < ?
+                """, (value, range_start, range_end))
+                booked[column] = sorted((to_datetime(row[0]), to_datetime(row[1]))
+                                        for row in cursor.fetchall())
             
-            return ""  # No conflict
+            conflicts = detect_series_conflicts(times, duration, booked["id_fotografer"],
+                                                booked["id_studio"],
+                                                blocks_later=jadwal.status == 'Booked')
+            rows = [
+                (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio, when,
+                 jadwal.jenis_paket, jadwal.status, jadwal.catatan, jadwal.durasi_menit,
+                 when + duration)
+                for when, conflict in zip(times, conflicts) if not conflict
+            ]
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany("""
+                    INSERT INTO jadwal (id_klien, id_fotografer, id_studio,
+                    tanggal_waktu, jenis_paket, status, catatan, durasi_menit, waktu_selesai)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows[offset:offset + batch_size])
+            # AUTOINCREMENT ids only grow and the write lock keeps other desks out
+            cursor.execute("SELECT id_sesi FROM jadwal WHERE id_sesi > ? ORDER BY id_sesi",
+                           (last_id,))
+            created = iter([row[0] for row in cursor.fetchall()])
+            conn.commit()
+        
+        if self.schedule_index is not None and rows:
+            self.schedule_index.invalidate()
+        
+        # Rows were inserted in time order, so ascending ids follow the times
+        return [(when, False, conflict, None) if conflict
+                else (when, True, "Schedule created successfully", next(created))
+                for when, conflict in zip(times, conflicts)]
+    
+    def check_schedule_conflict(self, id_fotografer: int, id_studio: int, 
+                              tanggal_waktu: datetime, exclude_session: int = None,
+                              durasi_menit: Optional[int] = None) -> str:
+        """Check for scheduling conflicts
+        
+        The session occupies [tanggal_waktu, tanggal_waktu + durasi_menit),
+        by default DEFAULT_DURATION. Answered from the in-memory schedule
+        index when it is enabled; the database is checked again when the
+        schedule is saved.
+        """
+        if self.schedule_index is not None:
+            duration = timedelta(minutes=durasi_menit) if durasi_menit else DEFAULT_DURATION
+            return self.schedule_index.find_conflict(
+                id_fotografer, id_studio, tanggal_waktu, exclude_session, duration
+            )
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            return self._find_schedule_conflict(
+                cursor, id_fotografer, id_studio, tanggal_waktu, durasi_menit,
+                exclude_session
+            )
+    
+    def find_free_slots(self, id_fotografer: Optional[int] = None,
+                        id_studio: Optional[int] = None, *, start: datetime, end: datetime,
+                        duration: timedelta = DEFAULT_DURATION, step: timedelta = FREE_SLOT_STEP,
+                        exclude_session: int = None) -> List[Tuple[datetime, datetime]]:
+        """Get the slots in [start, end) where the photographer and/or studio are free
+        
+        Computed in one pass over the sorted bookings of the given resources.
+        
+        Returns:
+            (slot_start, slot_end) tuples in time order
+        """
+        if id_fotografer is None and id_studio is None:
+            raise ValueError("find_free_slots needs a photographer or a studio")
+        
+        if self.schedule_index is not None:
+            booked = self.schedule_index.booked_sessions(id_fotografer, id_studio,
+                                                         start, end, exclude_session)
+        else:
+            booked = self._booked_sessions(id_fotografer, id_studio, start, end, exclude_session)
+        return free_slots(booked, start, end, duration, step)
+    
+    # ASSIGNMENT
+    def assign_jadwal_requests(self, requests: List[Dict[str, Any]]
+                               ) -> List[Optional[Tuple[int, int]]]:
+        """Pick a photographer and a studio for each pending session request
+        
+        Packages are matched to photographer specialisations, groups to
+        studio capacity, and the Booked sessions around the requests are
+        respected; see services.assignment.assign_resources. Nothing is
+        written: book the results with create_jadwal_many, which checks
+        conflicts again.
+        
+        Args:
+            requests: dicts with tanggal_waktu, jenis_paket, jumlah_orang and
+                optionally durasi_menit (default per package)
+        
+        Returns:
+            One (id_fotografer, id_studio) tuple per request, None when unfulfilled
+        """
+        if not requests:
+            return []
+        times = [to_datetime(request['tanggal_waktu']) for request in requests]
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id_fotografer, id_studio, tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE status = 'Booked' AND tanggal_waktu > ? AND tanggal_waktu < ?
+            """, (min(times) - MAX_DURATION, max(times) + MAX_DURATION))
+            booked = [dict(row) for row in cursor.fetchall()]
+        return assign_resources(requests, self.get_all_fotografer(), self.get_all_studio(), booked)
+    
+    # AVAILABILITY
+    def get_day_availability(self, day: date, kind: str = "studio",
+                             resource_ids: Optional[List[int]] = None,
+                             duration: Optional[timedelta] = None) -> Dict[int, int]:
+        """Get a free-slot bitmask per photographer or studio for one day
+        
+        Bit i stands for the 15 minutes from 00:00 + i * 15 minutes and is set
+        when no Booked session overlaps them. With a duration, bit i is set
+        when a session of that length may start there instead.
+        
+        Args:
+            day: the day to look at
+            kind: "studio" or "fotografer"
+            resource_ids: resources to include, default all of that kind
+            duration: length of the session to place, if any
+        """
+        if kind not in ("studio", "fotografer"):
+            raise ValueError("kind must be 'studio' or 'fotografer'")
+        if resource_ids is None:
+            resources = self.get_all_studio() if kind == "studio" else self.get_all_fotografer()
+            resource_ids = [row[f"id_{kind}"] for row in resources]
+        
+        if self.availability is not None:
+            return self.availability.free_masks(kind, resource_ids, day, duration)
+        return {resource_id: self._free_mask_from_db(kind, resource_id, day, duration)
+                for resource_id in resource_ids}
+    
+    def query_availability(self, day: date, all_of: List[Tuple[str, int]] = (),
+                           any_of: List[Tuple[str, int]] = (),
+                           duration: Optional[timedelta] = None) -> int:
+        """Get the slots where every resource in all_of AND any resource in any_of is free
+        
+        Resources are ("fotografer", id) or ("studio", id) pairs; the result
+        is a bitmask like get_day_availability.
+        """
+        if self.availability is not None:
+            return self.availability.query(day, all_of, any_of, duration)
+        
+        mask = ALL_SLOTS
+        for kind, resource_id in all_of:
+            mask &= self._free_mask_from_db(kind, resource_id, day, duration)
+        if any_of:
+            any_mask = 0
+            for kind, resource_id in any_of:
+                any_mask |= self._free_mask_from_db(kind, resource_id, day, duration)
+            mask &= any_mask
+        return mask
+    
+    def _free_mask_from_db(self, kind: str, resource_id: int, day: date,
+                           duration: Optional[timedelta] = None) -> int:
+        """Build a free-slot bitmask from the database (schedule index disabled)"""
+        day_start = datetime.combine(day, datetime.min.time())
+        # The next day is needed for sessions that run past midnight
+        resources = {"id_fotografer": None, "id_studio": None, f"id_{kind}": resource_id}
+        sessions = self._booked_sessions(**resources, start=day_start,
+                                         end=day_start + timedelta(days=2))
+        free_today = ALL_SLOTS & ~busy_mask(sessions, day)
+        if duration is None:
+            return free_today
+        free_tomorrow = ALL_SLOTS & ~busy_mask(sessions, day + timedelta(days=1))
+        return start_mask(free_today, free_tomorrow, duration)
+    
+    def _booked_sessions(self, id_fotografer: Optional[int], id_studio: Optional[int],
+                         start: datetime, end: datetime,
+                         exclude_session: int = None) -> List[Tuple[datetime, datetime]]:
+        """Get sorted (start, end) of Booked sessions on either resource overlapping [start, end)"""
+        queries = []
+        params = []
+        for column, value in (("id_fotografer", id_fotografer), ("id_studio", id_studio)):
+            if value is None:
+                continue
+            # One indexed range query per resource instead of an OR across both
+            queries.append(f"""
+                SELECT tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE {column} = ? AND status = 'Booked'
+                AND tanggal_waktu > ? AND tanggal_waktu < ? AND waktu_selesai > ?
+                AND id_sesi != ?
+            """)
+            params += [value, start - MAX_DURATION, end, start, exclude_session or 0]
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(" UNION ALL ".join(queries), params)
+            return sorted((to_datetime(row[0]), to_datetime(row[1]))
+                          for row in cursor.fetchall())
+    
+    def _load_booked_sessions(self) -> List[Dict[str, Any]]:
+        """Get every Booked session for the schedule index"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id_sesi, id_fotografer, id_studio, tanggal_waktu, waktu_selesai
+                FROM jadwal WHERE status = 'Booked'
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _schedule_conflict_query(id_fotografer: int, id_studio: int, tanggal_waktu: datetime,
+                                 durasi_menit: Optional[int] = None,
+                                 exclude_session: int = None) -> Tuple[str, list]:
+        """Build the overlap query for check_schedule_conflict
+        
+        Overlap is start < other_end AND end > other_start. Only sessions
+        starting less than MAX_DURATION earlier can overlap, which bounds the
+        range scan on the (resource, status, tanggal_waktu, waktu_selesai)
+        index and lets it answer without reading table rows.
+        """
+        start = to_datetime(tanggal_waktu)
+        end = start + (timedelta(minutes=durasi_menit) if durasi_menit else DEFAULT_DURATION)
+        
+        exclude_sql = " AND id_sesi != ?" if exclude_session else ""
+        query = f"""
+            SELECT
+                EXISTS(SELECT 1 FROM jadwal
+                       WHERE id_fotografer = ? AND status = 'Booked'
+                       AND tanggal_waktu > ? AND tanggal_waktu < ?
+                       AND waktu_selesai > ?{exclude_sql}),
+                EXISTS(SELECT 1 FROM jadwal
+                       WHERE id_studio = ? AND status = 'Booked'
+                       AND tanggal_waktu > ? AND tanggal_waktu < ?
+                       AND waktu_selesai > ?{exclude_sql})
+        """
+        fotografer_params = [id_fotografer, start - MAX_DURATION, end, start]
+        studio_params = [id_studio, start - MAX_DURATION, end, start]
+        if exclude_session:
+            fotografer_params.append(exclude_session)
+            studio_params.append(exclude_session)
+        return query, fotografer_params + studio_params
+    
+    def _find_schedule_conflict(self, cursor, id_fotografer: int, id_studio: int,
+                                tanggal_waktu: datetime, durasi_menit: Optional[int] = None,
+                                exclude_session: int = None) -> str:
+        """Check photographer and studio availability in a single query"""
+        cursor.execute(*self._schedule_conflict_query(id_fotografer, id_studio, tanggal_waktu,
+                                                      durasi_menit, exclude_session))
+        fotografer_busy, studio_busy = cursor.fetchone()
+        if fotografer_busy:
+            return FOTOGRAFER_CONFLICT_MSG
+        if studio_busy:
+            return STUDIO_CONFLICT_MSG
+        
+        return ""  # No conflict
     
     def get_all_jadwal_with_details(self) -> List[Dict[str, Any]]:
         """Get all schedules with client, photographer, and studio details"""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
@@ -302,28 +1098,67 @@ class DatabaseManager:
             """)
             return [dict(row) for row in cursor.fetchall()]
     
-    def update_jadwal(self, id_sesi: int, jadwal: Jadwal) -> Tuple[bool, str]:
-        """Update schedule with conflict checking"""
-        conflict_msg = self.check_schedule_conflict(
-            jadwal.id_fotografer, jadwal.id_studio, 
-            jadwal.tanggal_waktu, id_sesi
-        )
+    def get_jadwal_details_by_id(self, id_sesi: int) -> Optional[Dict[str, Any]]:
+        """Get one schedule with client, photographer, and studio details"""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"{self._JADWAL_DETAILS_SQL} WHERE j.id_sesi = ?", (id_sesi,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_jadwal_data_version(self) -> Tuple[int, ...]:
+        """Get a fingerprint of the schedule data
         
-        if conflict_msg:
-            return False, conflict_msg
+        It changes when a schedule, or a client, photographer or studio
+        shown with one, is created, updated or deleted. The versi_data
+        counters are kept by triggers, so polling reads four rows by key
+        before reusing rows loaded by get_all_jadwal_with_details().
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT versi FROM versi_data ORDER BY nama_tabel")
+            return tuple(row[0] for row in cursor.fetchall())
+    
+    def update_jadwal(self, id_sesi: int, jadwal: Jadwal) -> Tuple[bool, str]:
+        """Update schedule with conflict checking in a single transaction
         
+        Raises StaleDataError when jadwal.version is set and the session has
+        been changed or deleted since that version was loaded.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Take the write lock up front so no other booking can slip in
+            # between the conflict check and the update
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            conflict_msg = self._find_schedule_conflict(
+                cursor, jadwal.id_fotografer, jadwal.id_studio,
+                jadwal.tanggal_waktu, jadwal.durasi_menit, id_sesi
+            )
+            if conflict_msg:
+                conn.rollback()
+                return False, conflict_msg
+            
             cursor.execute("""
                 UPDATE jadwal SET id_klien = ?, id_fotografer = ?, id_studio = ?,
                 tanggal_waktu = ?, jenis_paket = ?, status = ?, catatan = ?,
-                updated_at = CURRENT_TIMESTAMP
-                WHERE id_sesi = ?
+                durasi_menit = ?, waktu_selesai = ?,
+                version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id_sesi = ? AND (? IS NULL OR version = ?)
             """, (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio,
                   jadwal.tanggal_waktu, jadwal.jenis_paket, jadwal.status,
-                  jadwal.catatan, id_sesi))
+                  jadwal.catatan, jadwal.durasi_menit, jadwal.waktu_selesai,
+                  id_sesi, jadwal.version, jadwal.version))
+            if cursor.rowcount == 0 and jadwal.version is not None:
+                self._raise_stale(conn, "jadwal", "id_sesi", id_sesi, jadwal.version)
             conn.commit()
-            return cursor.rowcount > 0, "Schedule updated successfully"
+            updated = cursor.rowcount > 0
+        
+        if updated and self.schedule_index is not None:
+            self.schedule_index.upsert(id_sesi, jadwal.id_fotografer, jadwal.id_studio,
+                                       jadwal.tanggal_waktu, jadwal.status,
+                                       timedelta(minutes=jadwal.durasi_menit))
+        return updated, "Schedule updated successfully"
     
     def delete_jadwal(self, id_sesi: int) -> bool:
         """Delete schedule"""
@@ -331,12 +1166,17 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM jadwal WHERE id_sesi = ?", (id_sesi,))
             conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        
+        if deleted and self.schedule_index is not None:
+            self.schedule_index.remove(id_sesi)
+        return deleted
     
-    def get_upcoming_sessions(self, hours: int = 1) -> List[Dict[str, Any]]:
+    def get_upcoming_sessions(self, hours: int = 24) -> List[Dict[str, Any]]:
         """Get sessions starting within specified hours"""
-        cutoff_time = datetime.now() + timedelta(hours=hours)
-        with self.get_connection() as conn:
+        now = datetime.now()
+        cutoff_time = now + timedelta(hours=hours)
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
@@ -346,63 +1186,246 @@ class DatabaseManager:
                 JOIN fotografer f ON j.id_fotografer = f.id_fotografer
                 JOIN studio s ON j.id_studio = s.id_studio
                 WHERE j.tanggal_waktu <= ? AND j.status = 'Booked'
-                AND j.tanggal_waktu >= datetime('now')
+                AND j.tanggal_waktu >= ?
                 ORDER BY j.tanggal_waktu
-            """, (cutoff_time,))
+            """, (cutoff_time, now))
             return [dict(row) for row in cursor.fetchall()]
     
     # DASHBOARD AND REPORTING
     def get_dashboard_stats(self) -> Dict[str, int]:
         """Get dashboard statistics"""
-        with self.get_connection() as conn:
+        return self.get_dashboard_snapshot(recent_limit=0)['stats']
+    
+    def get_dashboard_snapshot(self, recent_limit: int = 10) -> Dict[str, Any]:
+        """Get all dashboard counters and the most recent sessions
+        
+        The counters come from one conditional-aggregation query and the
+        recent sessions from one LIMITed query, on a single connection.
+        
+        Returns:
+            {'stats': {...counters...}, 'recent_sessions': [...]}
+        """
+        month_start, month_end = self._month_bounds(datetime.now().year, datetime.now().month)
+        month_sql, month_params = self._jadwal_range_filter(month_start, month_end)
+        
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT
+                    (SELECT COUNT(*) FROM klien) AS total_klien,
+                    (SELECT COUNT(*) FROM fotografer) AS total_fotografer,
+                    (SELECT COUNT(*) FROM studio) AS total_studio,
+                    COALESCE(SUM(CASE WHEN status = 'Booked' THEN 1 ELSE 0 END), 0) AS sesi_booked,
+                    COALESCE(SUM(CASE WHEN status = 'Selesai' THEN 1 ELSE 0 END), 0) AS sesi_selesai,
+                    COALESCE(SUM(CASE WHEN status = 'Batal' THEN 1 ELSE 0 END), 0) AS sesi_batal,
+                    (SELECT COUNT(*) FROM jadwal j WHERE {month_sql}) AS sesi_bulan_ini
+                FROM jadwal
+            """, month_params)
+            stats = {key: int(value) for key, value in dict(cursor.fetchone()).items()}
             
-            stats = {}
-            
-            # Total clients
-            cursor.execute("SELECT COUNT(*) FROM klien")
-            stats['total_klien'] = cursor.fetchone()[0]
-            
-            # Total photographers
-            cursor.execute("SELECT COUNT(*) FROM fotografer")
-            stats['total_fotografer'] = cursor.fetchone()[0]
-            
-            # Total studios
-            cursor.execute("SELECT COUNT(*) FROM studio")
-            stats['total_studio'] = cursor.fetchone()[0]
-            
-            # Sessions by status
-            cursor.execute("SELECT COUNT(*) FROM jadwal WHERE status = 'Booked'")
-            stats['sesi_booked'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM jadwal WHERE status = 'Selesai'")
-            stats['sesi_selesai'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM jadwal WHERE status = 'Batal'")
-            stats['sesi_batal'] = cursor.fetchone()[0]
-            
-            # This month's sessions
-            cursor.execute("""
-                SELECT COUNT(*) FROM jadwal 
-                WHERE strftime('%Y-%m', tanggal_waktu) = strftime('%Y-%m', 'now')
-            """)
-            stats['sesi_bulan_ini'] = cursor.fetchone()[0]
-            
-            return stats
+            recent_sessions = []
+            if recent_limit > 0:
+                cursor.execute(f"{self._JADWAL_DETAILS_SQL} "
+                               "ORDER BY j.tanggal_waktu DESC, j.id_sesi DESC LIMIT ?",
+                               (recent_limit,))
+                recent_sessions = [dict(row) for row in cursor.fetchall()]
+        
+        return {'stats': stats, 'recent_sessions': recent_sessions}
     
     def get_monthly_report(self, year: int, month: int) -> List[Dict[str, Any]]:
         """Get monthly schedule report"""
-        with self.get_connection() as conn:
+        month_start, month_end = self._month_bounds(year, month)
+        return self.get_jadwal_between(month_start, month_end)
+    
+    def audit_double_bookings(self) -> List[Dict[str, Any]]:
+        """Find every pair of overlapping Booked sessions on a photographer or studio
+        
+        Booked sessions are streamed per resource in (resource, tanggal_waktu)
+        index order and checked in one sweep, instead of one conflict check
+        per row.
+        
+        Returns:
+            One dict per overlapping pair: resource ("fotografer"/"studio"),
+            id_resource, nama_resource and id_sesi, tanggal_waktu, waktu_selesai,
+            nama_klien of the earlier (_1) and later (_2) session
+        """
+        conflicts = []
+        with self.get_read_connection() as conn:
+            for resource, name_sql, join_sql in (
+                    ("fotografer", "f.nama", "JOIN fotografer f ON j.id_fotografer = f.id_fotografer"),
+                    ("studio", "s.nama_studio", "JOIN studio s ON j.id_studio = s.id_studio")):
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT j.id_sesi, j.id_{resource} AS id_resource, {name_sql} AS nama_resource,
+                           j.tanggal_waktu, j.waktu_selesai, k.nama AS nama_klien
+                    FROM jadwal j
+                    {join_sql}
+                    JOIN klien k ON j.id_klien = k.id_klien
+                    WHERE j.status = 'Booked'
+                    ORDER BY j.id_{resource}, j.tanggal_waktu, j.id_sesi
+                """)
+                rows = (dict(row) for row in cursor)
+                for first, second in find_overlapping_pairs(rows, 'id_resource'):
+                    conflicts.append({
+                        'resource': resource,
+                        'id_resource': first['id_resource'],
+                        'nama_resource': first['nama_resource'],
+                        'id_sesi_1': first['id_sesi'],
+                        'tanggal_waktu_1': to_datetime(first['tanggal_waktu']),
+                        'waktu_selesai_1': to_datetime(first['waktu_selesai']),
+                        'nama_klien_1': first['nama_klien'],
+                        'id_sesi_2': second['id_sesi'],
+                        'tanggal_waktu_2': to_datetime(second['tanggal_waktu']),
+                        'waktu_selesai_2': to_datetime(second['waktu_selesai']),
+                        'nama_klien_2': second['nama_klien'],
+                    })
+        return conflicts
+    
+    # DATE RANGE QUERIES
+    _JADWAL_DETAILS_SQL = """
+        SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
+               s.nama_studio, s.lokasi
+        FROM jadwal j
+        JOIN klien k ON j.id_klien = k.id_klien
+        JOIN fotografer f ON j.id_fotografer = f.id_fotografer
+        JOIN studio s ON j.id_studio = s.id_studio
+    """
+    
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+        """Get the half-open [first day, first day of next month) range for a month"""
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+        return start, end
+    
+    @staticmethod
+    def _jadwal_filter(status: Optional[str] = None, id_klien: Optional[int] = None,
+                       id_fotografer: Optional[int] = None,
+                       id_studio: Optional[int] = None) -> Tuple[List[str], list]:
+        """Build equality conditions on jadwal j for the optional filters"""
+        conditions = []
+        params = []
+        for column, value in (("status", status), ("id_klien", id_klien),
+                              ("id_fotografer", id_fotografer), ("id_studio", id_studio)):
+            if value:
+                conditions.append(f"j.{column} = ?")
+                params.append(value)
+        return conditions, params
+    
+    @classmethod
+    def _jadwal_range_filter(cls, start: datetime, end: datetime, status: Optional[str] = None,
+                             id_fotografer: Optional[int] = None,
+                             id_studio: Optional[int] = None) -> Tuple[str, list]:
+        """Build a WHERE clause on jadwal j with a half-open range on tanggal_waktu
+        
+        Comparing the bare column (instead of wrapping it in date functions)
+        lets the database use the tanggal_waktu indexes.
+        """
+        # Plain dates cover the whole day, so widen them to midnight datetimes
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, datetime.min.time())
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, datetime.min.time())
+        
+        conditions = ["j.tanggal_waktu >= ?", "j.tanggal_waktu < ?"]
+        params = [start, end]
+        filter_conditions, filter_params = cls._jadwal_filter(status, id_fotografer=id_fotografer,
+                                                              id_studio=id_studio)
+        conditions += filter_conditions
+        params += filter_params
+        return " AND ".join(conditions), params
+    
+    def get_jadwal_between(self, start: datetime, end: datetime, status: Optional[str] = None,
+                           id_fotografer: Optional[int] = None,
+                           id_studio: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get schedules with details where start <= tanggal_waktu < end"""
+        where_sql, params = self._jadwal_range_filter(start, end, status, id_fotografer, id_studio)
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
-                       s.nama_studio, s.lokasi
-                FROM jadwal j
-                JOIN klien k ON j.id_klien = k.id_klien
-                JOIN fotografer f ON j.id_fotografer = f.id_fotografer
-                JOIN studio s ON j.id_studio = s.id_studio
-                WHERE strftime('%Y', j.tanggal_waktu) = ? 
-                AND strftime('%m', j.tanggal_waktu) = ?
-                ORDER BY j.tanggal_waktu
-            """, (str(year), f"{month:02d}"))
-            return [dict(row) for row in cursor.fetchall()]
\ No newline at end of file
+            cursor.execute(f"{self._JADWAL_DETAILS_SQL} WHERE {where_sql} "
+                           "ORDER BY j.tanggal_waktu", params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def count_jadwal_between(self, start: datetime, end: datetime, status: Optional[str] = None,
+                             id_fotografer: Optional[int] = None,
+                             id_studio: Optional[int] = None) -> int:
+        """Count schedules where start <= tanggal_waktu < end"""
+        where_sql, params = self._jadwal_range_filter(start, end, status, id_fotografer, id_studio)
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM jadwal j WHERE {where_sql}", params)
+            return cursor.fetchone()[0]
+    
+    # PAGINATED LISTING
+    def get_jadwal_page(self, cursor: Optional[Tuple[Any, int]] = None, page_size: int = 50,
+                        direction: str = "next", status: Optional[str] = None,
+                        id_klien: Optional[int] = None, id_fotografer: Optional[int] = None,
+                        id_studio: Optional[int] = None
+                        ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+        """Get one page of schedules with details, newest first
+        
+        Uses keyset pagination on (tanggal_waktu, id_sesi), so every page
+        costs the same regardless of how much history precedes it.
+        
+        Args:
+            cursor: (tanggal_waktu, id_sesi) of the row the page starts after,
+                or None for the first (newest) page
+            page_size: maximum number of rows in the page
+            direction: "next" for older rows, "prev" for newer rows
+        
+        Returns:
+            (rows, next_cursor) where rows are always ordered newest first and
+            next_cursor continues in the same direction, or None at the end
+        """
+        if direction not in ("next", "prev"):
+            raise ValueError("direction must be 'next' or 'prev'")
+        
+        conditions, params = self._jadwal_filter(status, id_klien, id_fotografer, id_studio)
+        if cursor is not None:
+            tanggal_waktu, id_sesi = cursor
+            op = "<" if direction == "next" else ">"
+            # The redundant inclusive bound lets the index seek to the cursor
+            # instead of scanning from the newest row
+            conditions.append(f"j.tanggal_waktu {op}= ?")
+            conditions.append(f"(j.tanggal_waktu {op} ? OR "
+                              f"(j.tanggal_waktu = ? AND j.id_sesi {op} ?))")
+            params += [tanggal_waktu, tanggal_waktu, tanggal_waktu, id_sesi]
+        
+        order = "DESC" if direction == "next" else "ASC"
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (f"{self._JADWAL_DETAILS_SQL} {where_sql} "
+                 f"ORDER BY j.tanggal_waktu {order}, j.id_sesi {order} LIMIT ?")
+        
+        with self.get_read_connection() as conn:
+            db_cursor = conn.cursor()
+            # Fetch one extra row to know whether another page exists
+            db_cursor.execute(query, params + [page_size + 1])
+            rows = [dict(row) for row in db_cursor.fetchall()]
+        
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]['tanggal_waktu'], rows[-1]['id_sesi']) if has_more else None
+        if direction == "prev":
+            rows.reverse()
+        return rows, next_cursor
+    
+    def explain_jadwal_between(self, start: datetime, end: datetime,
+                               status: Optional[str] = None) -> List[str]:
+        """Get the query plan lines for get_jadwal_between"""
+        where_sql, params = self._jadwal_range_filter(start, end, status)
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {self._JADWAL_DETAILS_SQL} WHERE {where_sql} "
+                           "ORDER BY j.tanggal_waktu", params)
+            return [row['detail'] for row in cursor.fetchall()]
+    
+    def explain_schedule_conflict(self, id_fotografer: int, id_studio: int,
+                                  tanggal_waktu: datetime,
+                                  durasi_menit: Optional[int] = None) -> List[str]:
+        """Get the query plan lines for the database conflict check"""
+        query, params = self._schedule_conflict_query(id_fotografer, id_studio, tanggal_waktu,
+                                                      durasi_menit)
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+            return [row['detail'] for row in cursor.fetchall()]
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Query Instrumentation for Photo Studio Management System
+Records statement latency, rows returned and connection acquisition time
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(sql: str) -> str:
+    """Collapse whitespace so the same statement always maps to one key"""
+    return " ".join(sql.split())
+
+
+class _Histogram:
+    """Latency histogram with fixed millisecond buckets"""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms: float):
+        self.counts[bisect_left(HISTOGRAM_BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Approximate a percentile as the upper bound of its bucket"""
+        total = sum(self.counts)
+        if not total:
+            return 0.0
+        threshold = total * fraction
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= threshold:
+                if index < len(HISTOGRAM_BUCKETS_MS):
+                    return float(HISTOGRAM_BUCKETS_MS[index])
+                return float('inf')
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, int]:
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS]
+        labels.append(f">{HISTOGRAM_BUCKETS_MS[-1]}ms")
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+class _StatementStats:
+    """Aggregated numbers for one normalized SQL statement"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = _Histogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.histogram.percentile(0.50),
+            'p95_ms': self.histogram.percentile(0.95),
+            'rows': self.rows,
+            'histogram': self.histogram.to_dict(),
+        }
+
+
+class QueryStats:
+    """Thread-safe collector for query and connection timings"""
+
+    def __init__(self, slow_query_ms: float = 100.0):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._acquire = _StatementStats()
+        self._dump_thread: Optional[threading.Thread] = None
+        self._dump_stop = threading.Event()
+
+    def record_query(self, sql: str, params: Any, elapsed: float, rows: int):
+        """Record one statement execution (elapsed in seconds)"""
+        statement = normalize_statement(sql)
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = _StatementStats()
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += rows
+            stats.histogram.add(elapsed_ms)
+
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            logger.warning("Slow query (%.1f ms, %d rows): %s params=%r",
+                           elapsed_ms, rows, statement, params)
+
+    def record_acquire(self, elapsed: float):
+        """Record the time spent waiting for a connection (seconds)"""
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            self._acquire.count += 1
+            self._acquire.total_ms += elapsed_ms
+            self._acquire.max_ms = max(self._acquire.max_ms, elapsed_ms)
+            self._acquire.histogram.add(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-serializable copy of all collected numbers"""
+        with self._lock:
+            statements = {sql: stats.to_dict() for sql, stats in self._statements.items()}
+            acquire = self._acquire.to_dict()
+        acquire.pop('rows', None)
+        return {'statements': statements, 'connection_acquire': acquire}
+
+    def slowest(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the statements with the highest total time"""
+        statements = self.snapshot()['statements']
+        ranked = sorted(statements.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        return [dict(stats, statement=sql) for sql, stats in ranked[:limit]]
+
+    def reset(self):
+        """Clear all collected numbers"""
+        with self._lock:
+            self._statements.clear()
+            self._acquire = _StatementStats()
+
+    def dump_jsonl(self, path: str):
+        """Append the current snapshot as one JSON line"""
+        record = {'timestamp': datetime.now().isoformat(timespec='seconds')}
+        record.update(self.snapshot())
+        with open(path, 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(record, default=str) + "\n")
+
+    def start_periodic_dump(self, path: str, interval: float = 60.0):
+        """Dump a snapshot to a JSON lines file every interval seconds"""
+        self.stop_periodic_dump()
+        self._dump_stop.clear()
+
+        def run():
+            while not self._dump_stop.wait(interval):
+                try:
+                    self.dump_jsonl(path)
+                except OSError as e:
+                    logger.error("Could not write query stats to %s: %s", path, e)
+
+        self._dump_thread = threading.Thread(target=run, name="query-stats-dump", daemon=True)
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        """Stop the periodic dump thread"""
+        if self._dump_thread is not None:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_thread = None
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times statements and counts fetched rows
+
+    A statement's sample covers execute() plus the fetches that follow it,
+    and is recorded when the next statement runs or the cursor goes away.
+    """
+
+    def __init__(self, cursor, stats: QueryStats):
+        self._cursor = cursor
+        self._stats = stats
+        self._pending = None  # [sql, params, elapsed, rows]
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            if params is None:
+                result = self._cursor.execute(sql, *args, **kwargs)
+            else:
+                result = self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            self._pending = [sql, params, time.perf_counter() - started, 0]
+        return result
+
+    def executemany(self, sql, seq_of_params, *args, **kwargs):
+        self._finish()
+        seq_of_params = list(seq_of_params)
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_params, *args, **kwargs)
+        finally:
+            self._pending = [sql, f"<{len(seq_of_params)} rows>",
+                             time.perf_counter() - started, 0]
+            self._finish()
+
+    def fetchone(self):
+        row = self._timed_fetch(self._cursor.fetchone)
+        if row is not None:
+            self._add_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._timed_fetch(lambda: self._cursor.fetchmany(*args, **kwargs))
+        self._add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        self._add_rows(len(rows))
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _timed_fetch(self, fetch):
+        started = time.perf_counter()
+        try:
+            return fetch()
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - started
+
+    def _add_rows(self, count: int):
+        if self._pending is not None:
+            self._pending[3] += count
+
+    def _finish(self):
+        if self._pending is not None:
+            sql, params, elapsed, rows = self._pending
+            self._pending = None
+            self._stats.record_query(sql, params, elapsed, rows)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented"""
+
+    def __init__(self, connection, stats: QueryStats):
+        self._connection = connection
+        self._stats = stats
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._stats)
+
+    def execute(self, sql, params=None):
+        """Shortcut for SQLite-style connection.execute()"""
+        cursor = self.cursor()
+        cursor.execute(sql, params)
+        return cursor
+
+    @property
+    def raw_connection(self):
+        """The wrapped driver connection"""
+        return self._connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
@@ -7,7 +7,8 @@ import mysql.connector
 from mysql.connector import Error
 import os
 import sys
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 
@@ -16,31 +17,128 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-from config.database import DATABASE_CONFIG
-from models.database_models import Klien, Fotografer, Studio, Jadwal
+from config.database import (DATABASE_CONFIG, POOL_CONFIG, BULK_BATCH_SIZE, INSTRUMENTATION_CONFIG,
+                             KLIEN_FUZZY_LIMIT, KLIEN_NAME_INDEX_CONFIG, KLIEN_SEARCH_LIMIT,
+                             PREPARED_STATEMENT_CACHE_SIZE, SCHEDULE_INDEX_CONFIG)
+from database.connection_pool import ConnectionPool
+from database.instrumentation import InstrumentedConnection, QueryStats
+from database.repository import DATA_VERSION_TABLES, VERSIONED_TABLES, StaleDataError
+from database.statement_cache import PreparedStatementCache
+from models.database_models import Klien, Fotografer, Studio, Jadwal, PAKET_DURASI_MENIT
+from services.schedule_conflicts import (DEFAULT_DURATION, FOTOGRAFER_CONFLICT_MSG,
+                                         FREE_SLOT_STEP, MAX_DURATION, STUDIO_CONFLICT_MSG,
+                                         detect_batch_conflicts, detect_series_conflicts,
+                                         find_overlapping_pairs, free_slots, to_datetime)
+from services.schedule_index import ScheduleIndex
+from services.availability import ALL_SLOTS, AvailabilityStore, busy_mask, start_mask
+from services.assignment import assign_resources
+from services.text_search import ngram_boolean_query
+from services.name_index import DEFAULT_THRESHOLD, FuzzyNameIndex
+from services.phone_numbers import looks_like_phone, normalize_phone, phone_prefix_range
 
 class MySQLDatabaseManager:
     """Manages all MySQL database operations for the photo studio system"""
     
-    def __init__(self):
-        """Initialize MySQL database manager"""
-        self.config = DATABASE_CONFIG
+    def __init__(self, pool_config: Optional[Dict[str, Any]] = None,
+                 instrumentation: Optional[Dict[str, Any]] = None,
+                 prepared_cache_size: Optional[int] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        """Initialize MySQL database manager with a connection pool
+        
+        config overrides DATABASE_CONFIG entries, e.g. {'database': ...}
+        to work on another schema of the same server.
+        """
+        self.config = dict(DATABASE_CONFIG, **(config or {}))
+        self.pool_config = dict(POOL_CONFIG, **(pool_config or {}))
+        self.instrumentation = dict(INSTRUMENTATION_CONFIG, **(instrumentation or {}))
+        self.query_stats = QueryStats(self.instrumentation['slow_query_ms'])
+        if self.instrumentation['dump_path']:
+            self.query_stats.start_periodic_dump(self.instrumentation['dump_path'],
+                                                 self.instrumentation['dump_interval'])
+        self.pool = ConnectionPool(
+            self._open_connection,
+            health_check=lambda connection: connection.is_connected(),
+            **self.pool_config
+        )
+        self.statements = PreparedStatementCache(
+            PREPARED_STATEMENT_CACHE_SIZE if prepared_cache_size is None else prepared_cache_size
+        )
+        self.schedule_index = None
+        self.availability = None
+        if SCHEDULE_INDEX_CONFIG['enabled']:
+            self.schedule_index = ScheduleIndex(self._load_booked_sessions,
+                                                SCHEDULE_INDEX_CONFIG['max_age'])
+            self.availability = AvailabilityStore(self.schedule_index)
+        self.klien_names = None
+        if KLIEN_NAME_INDEX_CONFIG['enabled']:
+            self.klien_names = FuzzyNameIndex(self._load_klien_names,
+                                              KLIEN_NAME_INDEX_CONFIG['max_age'])
         self.init_database()
+        if self.klien_names is not None and KLIEN_NAME_INDEX_CONFIG['preload']:
+            self.klien_names.start_loading()
+    
+    def _open_connection(self):
+        """Open a new MySQL connection for the pool"""
+        # Buffered cursors so a partially read result never blocks
+        # the next statement on a reused connection
+        return mysql.connector.connect(**dict(self.config, buffered=True))
     
     @contextmanager
     def get_connection(self):
-        """Context manager for MySQL database connections"""
-        connection = None
+        """Context manager that checks a MySQL connection out of the pool"""
+        started = time.perf_counter()
+        connection = self.pool.acquire()
+        discard = False
         try:
-            connection = mysql.connector.connect(**self.config)
-            yield connection
-        except Error as e:
-            if connection:
+            if self.instrumentation['enabled']:
+                self.query_stats.record_acquire(time.perf_counter() - started)
+                yield InstrumentedConnection(connection, self.query_stats)
+            else:
+                yield connection
+        except BaseException as e:
+            # Never hand a connection with an open transaction (and the row
+            # locks of SELECT ... FOR UPDATE) back to the pool, whatever
+            # interrupted the caller. A failed statement may also leave a
+            # prepared cursor with unread results.
+            self.statements.discard(connection)
+            try:
                 connection.rollback()
+            except Exception:
+                discard = True
             raise e
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            if discard:
+                self.statements.discard(connection)
+            self.pool.release(connection, discard)
+    
+    @contextmanager
+    def get_read_connection(self):
+        """Context manager for read-only queries (same pool as writes for MySQL)"""
+        with self.get_connection() as connection:
+            yield connection
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool counters (checkouts, wait time, reconnects)"""
+        return self.pool.get_stats()
+    
+    def get_statement_cache_stats(self) -> Dict[str, Any]:
+        """Get prepared statement cache counters (hits, misses, evictions)"""
+        return self.statements.get_stats()
+    
+    def get_query_stats(self) -> Dict[str, Any]:
+        """Get per-statement latency histograms, row counts and connection wait times"""
+        return self.query_stats.snapshot()
+    
+    def reset_query_stats(self):
+        """Clear collected query statistics"""
+        self.query_stats.reset()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.query_stats.stop_periodic_dump()
+        if self.klien_names is not None:
+            self.klien_names.stop_loading()
+        self.pool.close_all()
     
     def init_database(self):
         """Initialize MySQL database and create tables"""
@@ -53,6 +151,11 @@ class MySQLDatabaseManager:
                 self.create_fotografer_table(cursor)
                 self.create_studio_table(cursor)
                 self.create_jadwal_table(cursor)
+                self.add_version_columns(cursor)
+                self.add_duration_columns(cursor)
+                self.add_phone_column(cursor)
+                self.add_klien_search_index(cursor)
+                self.add_change_counters(cursor)
                 
                 # Create indexes for better performance
                 self.create_indexes(cursor)
@@ -72,12 +175,16 @@ class MySQLDatabaseManager:
                 id_klien INT AUTO_INCREMENT PRIMARY KEY,
                 nama VARCHAR(255) NOT NULL,
                 nomor_hp VARCHAR(20) NOT NULL,
+                nomor_hp_e164 VARCHAR(20) CHARACTER SET ascii COLLATE ascii_bin,
                 email VARCHAR(255),
                 alamat TEXT,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_nama (nama),
-                INDEX idx_nomor_hp (nomor_hp)
+                INDEX idx_nomor_hp (nomor_hp),
+                INDEX idx_nomor_hp_e164 (nomor_hp_e164),
+                INDEX idx_klien_updated_at (updated_at)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """)
     
@@ -89,6 +196,7 @@ class MySQLDatabaseManager:
                 nama VARCHAR(255) NOT NULL,
                 spesialisasi VARCHAR(100) NOT NULL,
                 nomor_hp VARCHAR(20) NOT NULL,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_nama (nama),
@@ -104,6 +212,7 @@ class MySQLDatabaseManager:
                 nama_studio VARCHAR(255) NOT NULL,
                 lokasi VARCHAR(255) NOT NULL,
                 kapasitas INT NOT NULL,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_nama_studio (nama_studio),
@@ -123,6 +232,9 @@ class MySQLDatabaseManager:
                 jenis_paket VARCHAR(100) NOT NULL,
                 status ENUM('Booked', 'Selesai', 'Batal') NOT NULL DEFAULT 'Booked',
                 catatan TEXT,
+                durasi_menit INT NOT NULL DEFAULT 60,
+                waktu_selesai DATETIME,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 FOREIGN KEY (id_klien) REFERENCES klien(id_klien) ON DELETE CASCADE,
@@ -132,24 +244,166 @@ class MySQLDatabaseManager:
                 INDEX idx_status (status),
                 INDEX idx_klien (id_klien),
                 INDEX idx_fotografer (id_fotografer),
-                INDEX idx_studio (id_studio)
+                INDEX idx_studio (id_studio),
+                -- Covering indexes for the interval-overlap conflict check
+                INDEX idx_jadwal_photographer_time (id_fotografer, status, tanggal_waktu, waktu_selesai),
+                INDEX idx_jadwal_studio_time (id_studio, status, tanggal_waktu, waktu_selesai)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+    
+    def add_version_columns(self, cursor):
+        """Add the optimistic concurrency version column to tables created before it"""
+        cursor.execute("""
+            SELECT TABLE_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME = 'version'
+        """)
+        versioned = {row[0] for row in cursor.fetchall()}
+        for table in VERSIONED_TABLES:
+            if table not in versioned:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN version INT NOT NULL DEFAULT 1")
+    
+    def add_duration_columns(self, cursor):
+        """Add session duration and end time to a jadwal table created before them
+        
+        Existing sessions get their package's default duration; waktu_selesai
+        is filled in batches of BULK_BATCH_SIZE rows.
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jadwal'
+            AND COLUMN_NAME = 'durasi_menit'
+        """)
+        if cursor.fetchone()[0]:
+            return
+        cursor.execute("""
+            ALTER TABLE jadwal ADD COLUMN durasi_menit INT NOT NULL DEFAULT 60,
+            ADD COLUMN waktu_selesai DATETIME
+        """)
+        cursor.executemany("UPDATE jadwal SET durasi_menit = %s WHERE jenis_paket = %s",
+                           [(durasi, paket) for paket, durasi in PAKET_DURASI_MENIT.items()])
+        while True:
+            cursor.execute("""
+                UPDATE jadwal SET waktu_selesai = tanggal_waktu + INTERVAL durasi_menit MINUTE
+                WHERE waktu_selesai IS NULL LIMIT %s
+            """, (BULK_BATCH_SIZE,))
+            if cursor.rowcount == 0:
+                break
+    
+    def add_phone_column(self, cursor):
+        """Add the normalised phone column and its index to a klien table created before them
+        
+        The column is binary ASCII so the "+digits" values sort bytewise, as
+        the prefix ranges of search_klien expect. Existing clients are filled
+        in batches of BULK_BATCH_SIZE rows, walking the primary key.
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'klien'
+            AND COLUMN_NAME = 'nomor_hp_e164'
+        """)
+        if cursor.fetchone()[0]:
+            return
+        cursor.execute("""
+            ALTER TABLE klien
+            ADD COLUMN nomor_hp_e164 VARCHAR(20) CHARACTER SET ascii COLLATE ascii_bin AFTER nomor_hp,
+            ADD INDEX idx_nomor_hp_e164 (nomor_hp_e164)
+        """)
+        last_id = 0
+        while True:
+            cursor.execute("""
+                SELECT id_klien, nomor_hp FROM klien
+                WHERE id_klien > %s ORDER BY id_klien LIMIT %s
+            """, (last_id, BULK_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany("UPDATE klien SET nomor_hp_e164 = %s WHERE id_klien = %s",
+                               [(normalize_phone(row[1]), row[0]) for row in rows])
+            last_id = rows[-1][0]
+    
+    def add_klien_search_index(self, cursor):
+        """Add the n-gram FULLTEXT index behind search_klien
+        
+        InnoDB updates it on every klien write. Stopwords are disabled while
+        it is built, because the ngram parser drops every n-gram containing
+        one and names would lose most of theirs to words like "a".
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'klien'
+            AND INDEX_NAME = 'ft_klien_search'
+        """)
+        if cursor.fetchone()[0]:
+            return
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        try:
+            cursor.execute("""
+                ALTER TABLE klien
+                ADD FULLTEXT INDEX ft_klien_search (nama, nomor_hp) WITH PARSER ngram
+            """)
+        finally:
+            cursor.execute("SET SESSION innodb_ft_enable_stopword = DEFAULT")
+    
+    def _raise_stale(self, connection, table: str, key_column: str, key: int, version: int):
+        """Roll back a versioned update that matched no row and report the current row"""
+        connection.rollback()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(f"SELECT * FROM {table} WHERE {key_column} = %s", (key,))
+        raise StaleDataError(table, key, version, cursor.fetchone())
+    
+    def add_change_counters(self, cursor):
+        """Count the writes to each table shown in the schedule, for get_jadwal_data_version
+        
+        Triggers bump the table's versi_data row on every insert, update and
+        delete, whichever desk or tool writes. The row stays locked until the
+        writing transaction ends, which serializes writes per table.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS versi_data (
+                nama_tabel VARCHAR(32) PRIMARY KEY,
+                versi BIGINT NOT NULL DEFAULT 0
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """)
+        cursor.execute("""
+            SELECT TRIGGER_NAME FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE()
+        """)
+        existing = {row[0] for row in cursor.fetchall()}
+        for table in DATA_VERSION_TABLES:
+            cursor.execute("INSERT IGNORE INTO versi_data (nama_tabel) VALUES (%s)", (table,))
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                name = f"{table}_versi_{event.lower()}"
+                if name not in existing:
+                    cursor.execute(f"""
+                        CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW
+                        UPDATE versi_data SET versi = versi + 1 WHERE nama_tabel = '{table}'
+                    """)
     
     def create_indexes(self, cursor):
-        """Create additional indexes for performance"""
+        """Create the indexes missing from tables created before them
+        
+        MySQL has no CREATE INDEX IF NOT EXISTS, so existing indexes are
+        looked up in information_schema first and failures are raised.
+        """
         indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_jadwal_date_status ON jadwal(tanggal_waktu, status)",
-            "CREATE INDEX IF NOT EXISTS idx_jadwal_photographer_date ON jadwal(id_fotografer, tanggal_waktu)",
-            "CREATE INDEX IF NOT EXISTS idx_jadwal_studio_date ON jadwal(id_studio, tanggal_waktu)"
+            ("jadwal", "idx_jadwal_date_status", "(tanggal_waktu, status)"),
+            ("jadwal", "idx_jadwal_photographer_date", "(id_fotografer, tanggal_waktu)"),
+            ("jadwal", "idx_jadwal_studio_date", "(id_studio, tanggal_waktu)"),
+            # Covering indexes for the interval-overlap conflict check
+            ("jadwal", "idx_jadwal_photographer_time",
+             "(id_fotografer, status, tanggal_waktu, waktu_selesai)"),
+            ("jadwal", "idx_jadwal_studio_time", "(id_studio, status, tanggal_waktu, waktu_selesai)"),
+            # Other desks' renames for the fuzzy name index
+            ("klien", "idx_klien_updated_at", "(updated_at)"),
         ]
-        
-        for index_sql in indexes:
-            try:
-                cursor.execute(index_sql)
-            except Error:
-                # Index might already exist, ignore error
-                pass
+        cursor.execute("""
+            SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('jadwal', 'klien')
+        """)
+        existing = {(row[0], row[1]) for row in cursor.fetchall()}
+        for table, name, columns in indexes:
+            if (table, name) not in existing:
+                cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
     
     # KLIEN CRUD OPERATIONS
     def create_klien(self, klien: Klien) -> int:
@@ -157,11 +411,15 @@ class MySQLDatabaseManager:
         with self.get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                INSERT INTO klien (nama, nomor_hp, email, alamat)
-                VALUES (%s, %s, %s, %s)
-            """, (klien.nama, klien.nomor_hp, klien.email, klien.alamat))
+                INSERT INTO klien (nama, nomor_hp, nomor_hp_e164, email, alamat)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (klien.nama, klien.nomor_hp, normalize_phone(klien.nomor_hp), klien.email,
+                  klien.alamat))
             connection.commit()
-            return cursor.lastrowid
+            id_klien = cursor.lastrowid
+        if self.klien_names is not None:
+            self.klien_names.upsert(id_klien, klien.nama)
+        return id_klien
     
     def get_all_klien(self) -> List[Dict[str, Any]]:
         """Get all clients"""
@@ -178,15 +436,22 @@ class MySQLDatabaseManager:
             return cursor.fetchone()
     
     def update_klien(self, id_klien: int, klien: Klien) -> bool:
-        """Update client information"""
+        """Update client information (StaleDataError on a version mismatch)"""
         with self.get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                UPDATE klien SET nama = %s, nomor_hp = %s, email = %s, 
-                alamat = %s WHERE id_klien = %s
-            """, (klien.nama, klien.nomor_hp, klien.email, klien.alamat, id_klien))
+                UPDATE klien SET nama = %s, nomor_hp = %s, nomor_hp_e164 = %s, email = %s, 
+                alamat = %s, version = version + 1
+                WHERE id_klien = %s AND (%s IS NULL OR version = %s)
+            """, (klien.nama, klien.nomor_hp, normalize_phone(klien.nomor_hp), klien.email,
+                  klien.alamat, id_klien, klien.version, klien.version))
+            if cursor.rowcount == 0 and klien.version is not None:
+                self._raise_stale(connection, "klien", "id_klien", id_klien, klien.version)
             connection.commit()
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated and self.klien_names is not None:
+            self.klien_names.upsert(id_klien, klien.nama)
+        return updated
     
     def delete_klien(self, id_klien: int) -> bool:
         """Delete client (only if no scheduled sessions)"""
@@ -199,19 +464,133 @@ class MySQLDatabaseManager:
             
             cursor.execute("DELETE FROM klien WHERE id_klien = %s", (id_klien,))
             connection.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted and self.klien_names is not None:
+            self.klien_names.remove(id_klien)
+        return deleted
     
-    def search_klien(self, search_term: str) -> List[Dict[str, Any]]:
-        """Search clients by name or phone"""
-        with self.get_connection() as connection:
+    def search_klien(self, search_term: str,
+                     limit: int = KLIEN_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Search clients by name or phone, at most limit rows ordered by name
+        
+        Every search word must occur in the name or the phone number; the
+        ft_klien_search n-gram index finds them without scanning the table.
+        A search that looks like a phone number is first matched as the
+        start of the normalised number, so "0812..." also finds "+62 812...".
+        """
+        query = ngram_boolean_query(search_term)
+        with self.get_read_connection() as connection:
             cursor = connection.cursor(dictionary=True)
+            if looks_like_phone(search_term):
+                cursor.execute("""
+                    SELECT * FROM klien
+                    WHERE nomor_hp_e164 >= %s AND nomor_hp_e164 < %s
+                    ORDER BY nama
+                    LIMIT %s
+                """, (*phone_prefix_range(search_term), limit))
+                rows = cursor.fetchall()
+                if rows:
+                    return rows
+            
+            if not query:
+                return []
             cursor.execute("""
-                SELECT * FROM klien 
-                WHERE nama LIKE %s OR nomor_hp LIKE %s
+                SELECT * FROM klien
+                WHERE MATCH(nama, nomor_hp) AGAINST (%s IN BOOLEAN MODE)
                 ORDER BY nama
-            """, (f"%{search_term}%", f"%{search_term}%"))
+                LIMIT %s
+            """, (query, limit))
+            return cursor.fetchall()
+    
+    def find_klien_by_phone(self, nomor_hp: str) -> List[Dict[str, Any]]:
+        """Get the clients with this phone number, however either number was written
+        
+        One equality lookup on the idx_nomor_hp_e164 index; usually one row,
+        more when family members share a number.
+        """
+        normalized = normalize_phone(nomor_hp)
+        if normalized is None:
+            return []
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM klien WHERE nomor_hp_e164 = %s ORDER BY nama",
+                           (normalized,))
             return cursor.fetchall()
     
+    def fuzzy_search_klien(self, search_term: str, limit: int = KLIEN_FUZZY_LIMIT,
+                           threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+        """Find clients whose name resembles search_term despite typos, best first
+        
+        Each row gets a 'kemiripan' key with its trigram similarity (0-1);
+        only names at least threshold similar are returned.
+        """
+        index = self.klien_names or FuzzyNameIndex(self._load_klien_names, max_age=None)
+        matches = index.search(search_term, limit, threshold)
+        if not matches:
+            return []
+        ids = [id_klien for id_klien, _ in matches]
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"SELECT * FROM klien WHERE id_klien IN ({','.join(['%s'] * len(ids))})",
+                           ids)
+            rows = {row['id_klien']: row for row in cursor.fetchall()}
+        # Clients deleted at another desk are skipped and dropped from the index
+        for id_klien, _ in matches:
+            if id_klien not in rows:
+                index.remove(id_klien)
+        return [dict(rows[id_klien], kemiripan=score)
+                for id_klien, score in matches if id_klien in rows]
+    
+    def _load_klien_names(self, last_id: Optional[int] = None,
+                          settled_at: Optional[datetime] = None
+                          ) -> Tuple[List[Dict[str, Any]], datetime]:
+        """Get client names for the fuzzy name index, all or those changed since a fetch
+        
+        Returns the rows and the server time settle seconds ago; renames
+        stamped after it are fetched again next time in case one was still
+        uncommitted.
+        """
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT CURRENT_TIMESTAMP - INTERVAL %s SECOND AS settled",
+                           (KLIEN_NAME_INDEX_CONFIG['settle'],))
+            settled = cursor.fetchone()['settled']
+            if last_id is None:
+                cursor.execute("SELECT id_klien, nama FROM klien")
+            else:
+                cursor.execute("""
+                    SELECT id_klien, nama FROM klien
+                    WHERE id_klien > %s OR updated_at > %s
+                """, (last_id, settled_at))
+            return cursor.fetchall(), settled
+    
+    def create_klien_many(self, klien_list: List[Klien],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Create many clients in one transaction and return the number inserted"""
+        rows = [(klien.nama, klien.nomor_hp, normalize_phone(klien.nomor_hp), klien.email,
+                 klien.alamat) for klien in klien_list]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as connection:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            cursor.execute("SELECT COALESCE(MAX(id_klien), 0) FROM klien")
+            last_id = cursor.fetchone()[0]
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    "INSERT INTO klien (nama, nomor_hp, nomor_hp_e164, email, alamat) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    rows[offset:offset + batch_size]
+                )
+            # New AUTO_INCREMENT ids are above every id visible before the inserts
+            cursor.execute("SELECT id_klien, nama FROM klien WHERE id_klien > %s", (last_id,))
+            created = [{'id_klien': row[0], 'nama': row[1]} for row in cursor.fetchall()]
+            connection.commit()
+        if self.klien_names is not None:
+            self.klien_names.upsert_many(created)
+        return len(rows)
+    
     # FOTOGRAFER CRUD OPERATIONS
     def create_fotografer(self, fotografer: Fotografer) -> int:
         """Create a new photographer and return the ID"""
@@ -231,14 +610,26 @@ class MySQLDatabaseManager:
             cursor.execute("SELECT * FROM fotografer ORDER BY nama")
             return cursor.fetchall()
     
+    def get_fotografer_by_id(self, id_fotografer: int) -> Optional[Dict[str, Any]]:
+        """Get photographer by ID"""
+        with self.get_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM fotografer WHERE id_fotografer = %s", (id_fotografer,))
+            return cursor.fetchone()
+    
     def update_fotografer(self, id_fotografer: int, fotografer: Fotografer) -> bool:
-        """Update photographer information"""
+        """Update photographer information (StaleDataError on a version mismatch)"""
         with self.get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                UPDATE fotografer SET nama = %s, spesialisasi = %s, nomor_hp = %s
-                WHERE id_fotografer = %s
-            """, (fotografer.nama, fotografer.spesialisasi, fotografer.nomor_hp, id_fotografer))
+                UPDATE fotografer SET nama = %s, spesialisasi = %s, nomor_hp = %s,
+                version = version + 1
+                WHERE id_fotografer = %s AND (%s IS NULL OR version = %s)
+            """, (fotografer.nama, fotografer.spesialisasi, fotografer.nomor_hp, id_fotografer,
+                  fotografer.version, fotografer.version))
+            if cursor.rowcount == 0 and fotografer.version is not None:
+                self._raise_stale(connection, "fotografer", "id_fotografer", id_fotografer,
+                                  fotografer.version)
             connection.commit()
             return cursor.rowcount > 0
     
@@ -254,6 +645,24 @@ class MySQLDatabaseManager:
             connection.commit()
             return cursor.rowcount > 0
     
+    def create_fotografer_many(self, fotografer_list: List[Fotografer],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Create many photographers in one transaction and return the number inserted"""
+        rows = [(fotografer.nama, fotografer.spesialisasi, fotografer.nomor_hp) for fotografer in fotografer_list]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as connection:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    "INSERT INTO fotografer (nama, spesialisasi, nomor_hp) VALUES (%s, %s, %s)",
+                    rows[offset:offset + batch_size]
+                )
+            connection.commit()
+            return len(rows)
+    
     # STUDIO CRUD OPERATIONS
     def create_studio(self, studio: Studio) -> int:
         """Create a new studio and return the ID"""
@@ -273,14 +682,25 @@ class MySQLDatabaseManager:
             cursor.execute("SELECT * FROM studio ORDER BY nama_studio")
             return cursor.fetchall()
     
+    def get_studio_by_id(self, id_studio: int) -> Optional[Dict[str, Any]]:
+        """Get studio by ID"""
+        with self.get_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT * FROM studio WHERE id_studio = %s", (id_studio,))
+            return cursor.fetchone()
+    
     def update_studio(self, id_studio: int, studio: Studio) -> bool:
-        """Update studio information"""
+        """Update studio information (StaleDataError on a version mismatch)"""
         with self.get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                UPDATE studio SET nama_studio = %s, lokasi = %s, kapasitas = %s
-                WHERE id_studio = %s
-            """, (studio.nama_studio, studio.lokasi, studio.kapasitas, id_studio))
+                UPDATE studio SET nama_studio = %s, lokasi = %s, kapasitas = %s,
+                version = version + 1
+                WHERE id_studio = %s AND (%s IS NULL OR version = %s)
+            """, (studio.nama_studio, studio.lokasi, studio.kapasitas, id_studio,
+                  studio.version, studio.version))
+            if cursor.rowcount == 0 and studio.version is not None:
+                self._raise_stale(connection, "studio", "id_studio", id_studio, studio.version)
             connection.commit()
             return cursor.rowcount > 0
     
@@ -296,108 +716,517 @@ class MySQLDatabaseManager:
             connection.commit()
             return cursor.rowcount > 0
     
+    def create_studio_many(self, studio_list: List[Studio],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Create many studios in one transaction and return the number inserted"""
+        rows = [(studio.nama_studio, studio.lokasi, studio.kapasitas) for studio in studio_list]
+        if not rows:
+            return 0
+        
+        with self.get_connection() as connection:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany(
+                    "INSERT INTO studio (nama_studio, lokasi, kapasitas) VALUES (%s, %s, %s)",
+                    rows[offset:offset + batch_size]
+                )
+            connection.commit()
+            return len(rows)
+    
     # JADWAL CRUD OPERATIONS
     def create_jadwal(self, jadwal: Jadwal) -> Tuple[bool, str]:
-        """Create a new schedule with conflict checking"""
-        # Check for conflicts
-        conflict_msg = self.check_schedule_conflict(
-            jadwal.id_fotografer, jadwal.id_studio, 
-            jadwal.tanggal_waktu, jadwal.id_sesi
-        )
-        
-        if conflict_msg:
-            return False, conflict_msg
+        """Create a new schedule with conflict checking
         
+        The conflict check and the insert run in one transaction, so two
+        desks cannot book the same slot concurrently.
+        """
         with self.get_connection() as connection:
             cursor = connection.cursor()
+            connection.start_transaction()
+            # Lock the photographer and studio rows so bookings that touch
+            # either resource serialize until this transaction ends
+            cursor.execute("""
+                SELECT f.id_fotografer, s.id_studio
+                FROM fotografer f JOIN studio s ON s.id_studio = %s
+                WHERE f.id_fotografer = %s
+                FOR UPDATE
+            """, (jadwal.id_studio, jadwal.id_fotografer))
+            cursor.fetchall()
+            
+            conflict_msg = self._find_schedule_conflict(
+                connection, jadwal.id_fotografer, jadwal.id_studio,
+                jadwal.tanggal_waktu, jadwal.durasi_menit, jadwal.id_sesi
+            )
+            if conflict_msg:
+                connection.rollback()
+                return False, conflict_msg
+            
             cursor.execute("""
                 INSERT INTO jadwal (id_klien, id_fotografer, id_studio, 
-                tanggal_waktu, jenis_paket, status, catatan)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                tanggal_waktu, jenis_paket, status, catatan, durasi_menit, waktu_selesai)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio,
-                  jadwal.tanggal_waktu, jadwal.jenis_paket, jadwal.status, jadwal.catatan))
+                  jadwal.tanggal_waktu, jadwal.jenis_paket, jadwal.status, jadwal.catatan,
+                  jadwal.durasi_menit, jadwal.waktu_selesai))
             connection.commit()
-            return True, "Schedule created successfully"
+            id_sesi = cursor.lastrowid
+        jadwal.id_sesi = id_sesi
+        
+        # Outside the connection block: the index may need a connection to load
+        if self.schedule_index is not None:
+            self.schedule_index.upsert(id_sesi, jadwal.id_fotografer, jadwal.id_studio,
+                                       jadwal.tanggal_waktu, jadwal.status,
+                                       timedelta(minutes=jadwal.durasi_menit))
+        return True, "Schedule created successfully"
     
-    def check_schedule_conflict(self, id_fotografer: int, id_studio: int, 
-                              tanggal_waktu: datetime, exclude_session: int = None) -> str:
-        """Check for scheduling conflicts"""
+    def create_jadwal_many(self, jadwal_list: List[Jadwal],
+                           batch_size: int = BULK_BATCH_SIZE) -> List[Tuple[bool, str]]:
+        """Create many schedules in one transaction with batched conflict checking
+        
+        Conflicts are checked against the database with one range query per
+        resource type and within the batch in memory, where earlier rows win.
+        Non-conflicting rows are inserted; conflicting rows are skipped.
+        
+        Returns:
+            One (success, message) tuple per input row, like create_jadwal
+        """
+        if not jadwal_list:
+            return []
+        
+        times = [to_datetime(jadwal.tanggal_waktu) for jadwal in jadwal_list]
+        # Sessions starting up to MAX_DURATION before the batch may still run into it
+        range_start = min(times) - MAX_DURATION
+        range_end = max(start + timedelta(minutes=jadwal.durasi_menit)
+                        for start, jadwal in zip(times, jadwal_list))
+        fotografer_ids = sorted({jadwal.id_fotografer for jadwal in jadwal_list})
+        studio_ids = sorted({jadwal.id_studio for jadwal in jadwal_list})
+        fotografer_marks = ", ".join(["%s"] * len(fotografer_ids))
+        studio_marks = ", ".join(["%s"] * len(studio_ids))
+        
         with self.get_connection() as connection:
             cursor = connection.cursor()
+            connection.start_transaction()
+            # Lock every photographer and studio in the batch, like create_jadwal
+            cursor.execute(
+                f"SELECT id_fotografer FROM fotografer WHERE id_fotografer IN ({fotografer_marks}) "
+                "FOR UPDATE", fotografer_ids
+            )
+            cursor.fetchall()
+            cursor.execute(
+                f"SELECT id_studio FROM studio WHERE id_studio IN ({studio_marks}) FOR UPDATE",
+                studio_ids
+            )
+            cursor.fetchall()
             
-            # Check photographer availability (2-hour buffer)
-            time_start = tanggal_waktu - timedelta(hours=1)
-            time_end = tanggal_waktu + timedelta(hours=1)
-            
-            query = """
-                SELECT COUNT(*) FROM jadwal 
-                WHERE id_fotografer = %s AND status = 'Booked'
-                AND tanggal_waktu BETWEEN %s AND %s
-            """
-            params = [id_fotografer, time_start, time_end]
-            
-            if exclude_session:
-                query += " AND id_sesi != %s"
-                params.append(exclude_session)
-            
-            cursor.execute(query, params)
-            if cursor.fetchone()[0] > 0:
-                return "Fotografer sudah memiliki jadwal pada waktu tersebut"
-            
-            # Check studio availability
-            query = """
-                SELECT COUNT(*) FROM jadwal 
-                WHERE id_studio = %s AND status = 'Booked'
-                AND tanggal_waktu BETWEEN %s AND %s
-            """
-            params = [id_studio, time_start, time_end]
+            existing = []
+            cursor.execute(f"""
+                SELECT id_fotografer, tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE status = 'Booked' AND id_fotografer IN ({fotografer_marks})
+                AND tanggal_waktu > %s AND tanggal_waktu < %s
+            """, fotografer_ids + [range_start, range_end])
+            existing += [{'id_fotografer': row[0], 'tanggal_waktu': row[1],
+                          'waktu_selesai': row[2]} for row in cursor.fetchall()]
+            cursor.execute(f"""
+                SELECT id_studio, tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE status = 'Booked' AND id_studio IN ({studio_marks})
+                AND tanggal_waktu > %s AND tanggal_waktu < %s
+            """, studio_ids + [range_start, range_end])
+            existing += [{'id_studio': row[0], 'tanggal_waktu': row[1],
+                          'waktu_selesai': row[2]} for row in cursor.fetchall()]
             
-            if exclude_session:
-                query += " AND id_sesi != %s"
-                params.append(exclude_session)
+            conflicts = detect_batch_conflicts(jadwal_list, existing)
+            rows = [
+                (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio, jadwal.tanggal_waktu,
+                 jadwal.jenis_paket, jadwal.status, jadwal.catatan, jadwal.durasi_menit,
+                 jadwal.waktu_selesai)
+                for jadwal, conflict in zip(jadwal_list, conflicts) if not conflict
+            ]
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany("""
+                    INSERT INTO jadwal (id_klien, id_fotografer, id_studio,
+                    tanggal_waktu, jenis_paket, status, catatan, durasi_menit, waktu_selesai)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, rows[offset:offset + batch_size])
+            connection.commit()
+        
+        if self.schedule_index is not None and rows:
+            # executemany does not report the new IDs, so reload on next use
+            self.schedule_index.invalidate()
+        
+        return [(False, conflict) if conflict else (True, "Schedule created successfully")
+                for conflict in conflicts]
+    
+    def create_jadwal_series(self, jadwal: Jadwal, occurrences: List[datetime],
+                             batch_size: int = BULK_BATCH_SIZE
+                             ) -> List[Tuple[datetime, bool, str, Optional[int]]]:
+        """Create a recurring series of one session in a single transaction
+        
+        Every occurrence is checked against the photographer's and the
+        studio's bookings in one sorted merge pass per resource; the
+        non-conflicting occurrences are inserted, the others skipped.
+        
+        Args:
+            jadwal: template session (client, resources, package, status, notes)
+            occurrences: start times, e.g. from services.recurrence.expand_recurrence
+        
+        Returns:
+            One (tanggal_waktu, success, message, id_sesi) tuple per occurrence,
+            in time order; id_sesi is None for a skipped occurrence
+        """
+        times = sorted({to_datetime(when) for when in occurrences})
+        if not times:
+            return []
+        duration = timedelta(minutes=jadwal.durasi_menit)
+        range_start = times[0] - MAX_DURATION
+        range_end = times[-1] + duration
+        
+        with self.get_connection() as connection:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            cursor.execute("""
+                SELECT f.id_fotografer, s.id_studio
+                FROM fotografer f JOIN studio s ON s.id_studio = %s
+                WHERE f.id_fotografer = %s
+                FOR UPDATE
+            """, (jadwal.id_studio, jadwal.id_fotografer))
+            cursor.fetchall()
             
-            cursor.execute(query, params)
-            if cursor.fetchone()[0] > 0:
-                return "Studio sudah digunakan pada waktu tersebut"
+            booked = {}
+            for column, value in (("id_fotografer", jadwal.id_fotografer),
+                                  ("id_studio", jadwal.id_studio)):
+                cursor.execute(f"""
+                    SELECT tanggal_waktu, waktu_selesai FROM jadwal
+                    WHERE {column} = %s AND status = 'Booked'
+                    AND tanggal_waktu > %s AND tanggal_waktu < %s
+                """, (value, range_start, range_end))
+                booked[column] = sorted((to_datetime(row[0]), to_datetime(row[1]))
+                                        for row in cursor.fetchall())
             
-            return ""  # No conflict
+            conflicts = detect_series_conflicts(times, duration, booked["id_fotografer"],
+                                                booked["id_studio"],
+                                                blocks_later=jadwal.status == 'Booked')
+            # Read after the snapshot of the SELECTs above, so only this
+            # transaction's inserts can have a higher id
+            cursor.execute("SELECT COALESCE(MAX(id_sesi), 0) FROM jadwal")
+            last_id = cursor.fetchone()[0]
+            rows = [
+                (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio, when,
+                 jadwal.jenis_paket, jadwal.status, jadwal.catatan, jadwal.durasi_menit,
+                 when + duration)
+                for when, conflict in zip(times, conflicts) if not conflict
+            ]
+            for offset in range(0, len(rows), batch_size):
+                cursor.executemany("""
+                    INSERT INTO jadwal (id_klien, id_fotografer, id_studio,
+                    tanggal_waktu, jenis_paket, status, catatan, durasi_menit, waktu_selesai)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, rows[offset:offset + batch_size])
+            cursor.execute("""
+                SELECT id_sesi FROM jadwal WHERE id_sesi > %s AND id_fotografer = %s
+                ORDER BY id_sesi
+            """, (last_id, jadwal.id_fotografer))
+            created = iter([row[0] for row in cursor.fetchall()])
+            connection.commit()
+        
+        if self.schedule_index is not None and rows:
+            self.schedule_index.invalidate()
+        
+        # Rows were inserted in time order, so ascending ids follow the times
+        return [(when, False, conflict, None) if conflict
+                else (when, True, "Schedule created successfully", next(created))
+                for when, conflict in zip(times, conflicts)]
     
-    def get_all_jadwal_with_details(self) -> List[Dict[str, Any]]:
-        """Get all schedules with client, photographer, and studio details"""
-        with self.get_connection() as connection:
+    def check_schedule_conflict(self, id_fotografer: int, id_studio: int, 
+                              tanggal_waktu: datetime, exclude_session: int = None,
+                              durasi_menit: Optional[int] = None) -> str:
+        """Check for scheduling conflicts
+        
+        The session occupies [tanggal_waktu, tanggal_waktu + durasi_menit),
+        by default DEFAULT_DURATION. Answered from the in-memory schedule
+        index when it is enabled; the database is checked again when the
+        schedule is saved.
+        """
+        if self.schedule_index is not None:
+            duration = timedelta(minutes=durasi_menit) if durasi_menit else DEFAULT_DURATION
+            return self.schedule_index.find_conflict(
+                id_fotografer, id_studio, tanggal_waktu, exclude_session, duration
+            )
+        with self.get_read_connection() as connection:
+            return self._find_schedule_conflict(
+                connection, id_fotografer, id_studio, tanggal_waktu, durasi_menit,
+                exclude_session
+            )
+    
+    def find_free_slots(self, id_fotografer: Optional[int] = None,
+                        id_studio: Optional[int] = None, *, start: datetime, end: datetime,
+                        duration: timedelta = DEFAULT_DURATION, step: timedelta = FREE_SLOT_STEP,
+                        exclude_session: int = None) -> List[Tuple[datetime, datetime]]:
+        """Get the slots in [start, end) where the photographer and/or studio are free
+        
+        Computed in one pass over the sorted bookings of the given resources.
+        
+        Returns:
+            (slot_start, slot_end) tuples in time order
+        """
+        if id_fotografer is None and id_studio is None:
+            raise ValueError("find_free_slots needs a photographer or a studio")
+        
+        if self.schedule_index is not None:
+            booked = self.schedule_index.booked_sessions(id_fotografer, id_studio,
+                                                         start, end, exclude_session)
+        else:
+            booked = self._booked_sessions(id_fotografer, id_studio, start, end, exclude_session)
+        return free_slots(booked, start, end, duration, step)
+    
+    # ASSIGNMENT
+    def assign_jadwal_requests(self, requests: List[Dict[str, Any]]
+                               ) -> List[Optional[Tuple[int, int]]]:
+        """Pick a photographer and a studio for each pending session request
+        
+        Packages are matched to photographer specialisations, groups to
+        studio capacity, and the Booked sessions around the requests are
+        respected; see services.assignment.assign_resources. Nothing is
+        written: book the results with create_jadwal_many, which checks
+        conflicts again.
+        
+        Args:
+            requests: dicts with tanggal_waktu, jenis_paket, jumlah_orang and
+                optionally durasi_menit (default per package)
+        
+        Returns:
+            One (id_fotografer, id_studio) tuple per request, None when unfulfilled
+        """
+        if not requests:
+            return []
+        times = [to_datetime(request['tanggal_waktu']) for request in requests]
+        with self.get_read_connection() as connection:
             cursor = connection.cursor(dictionary=True)
             cursor.execute("""
-                SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
-                       s.nama_studio, s.lokasi
-                FROM jadwal j
-                JOIN klien k ON j.id_klien = k.id_klien
-                JOIN fotografer f ON j.id_fotografer = f.id_fotografer
-                JOIN studio s ON j.id_studio = s.id_studio
-                ORDER BY j.tanggal_waktu DESC
+                SELECT id_fotografer, id_studio, tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE status = 'Booked' AND tanggal_waktu > %s AND tanggal_waktu < %s
+            """, (min(times) - MAX_DURATION, max(times) + MAX_DURATION))
+            booked = cursor.fetchall()
+        return assign_resources(requests, self.get_all_fotografer(), self.get_all_studio(), booked)
+    
+    # AVAILABILITY
+    def get_day_availability(self, day: date, kind: str = "studio",
+                             resource_ids: Optional[List[int]] = None,
+                             duration: Optional[timedelta] = None) -> Dict[int, int]:
+        """Get a free-slot bitmask per photographer or studio for one day
+        
+        Bit i stands for the 15 minutes from 00:00 + i * 15 minutes and is set
+        when no Booked session overlaps them. With a duration, bit i is set
+        when a session of that length may start there instead.
+        
+        Args:
+            day: the day to look at
+            kind: "studio" or "fotografer"
+            resource_ids: resources to include, default all of that kind
+            duration: length of the session to place, if any
+        """
+        if kind not in ("studio", "fotografer"):
+            raise ValueError("kind must be 'studio' or 'fotografer'")
+        if resource_ids is None:
+            resources = self.get_all_studio() if kind == "studio" else self.get_all_fotografer()
+            resource_ids = [row[f"id_{kind}"] for row in resources]
+        
+        if self.availability is not None:
+            return self.availability.free_masks(kind, resource_ids, day, duration)
+        return {resource_id: self._free_mask_from_db(kind, resource_id, day, duration)
+                for resource_id in resource_ids}
+    
+    def query_availability(self, day: date, all_of: List[Tuple[str, int]] = (),
+                           any_of: List[Tuple[str, int]] = (),
+                           duration: Optional[timedelta] = None) -> int:
+        """Get the slots where every resource in all_of AND any resource in any_of is free
+        
+        Resources are ("fotografer", id) or ("studio", id) pairs; the result
+        is a bitmask like get_day_availability.
+        """
+        if self.availability is not None:
+            return self.availability.query(day, all_of, any_of, duration)
+        
+        mask = ALL_SLOTS
+        for kind, resource_id in all_of:
+            mask &= self._free_mask_from_db(kind, resource_id, day, duration)
+        if any_of:
+            any_mask = 0
+            for kind, resource_id in any_of:
+                any_mask |= self._free_mask_from_db(kind, resource_id, day, duration)
+            mask &= any_mask
+        return mask
+    
+    def _free_mask_from_db(self, kind: str, resource_id: int, day: date,
+                           duration: Optional[timedelta] = None) -> int:
+        """Build a free-slot bitmask from the database (schedule index disabled)"""
+        day_start = datetime.combine(day, datetime.min.time())
+        # The next day is needed for sessions that run past midnight
+        resources = {"id_fotografer": None, "id_studio": None, f"id_{kind}": resource_id}
+        sessions = self._booked_sessions(**resources, start=day_start,
+                                         end=day_start + timedelta(days=2))
+        free_today = ALL_SLOTS & ~busy_mask(sessions, day)
+        if duration is None:
+            return free_today
+        free_tomorrow = ALL_SLOTS & ~busy_mask(sessions, day + timedelta(days=1))
+        return start_mask(free_today, free_tomorrow, duration)
+    
+    def _booked_sessions(self, id_fotografer: Optional[int], id_studio: Optional[int],
+                         start: datetime, end: datetime,
+                         exclude_session: int = None) -> List[Tuple[datetime, datetime]]:
+        """Get sorted (start, end) of Booked sessions on either resource overlapping [start, end)"""
+        queries = []
+        params = []
+        for column, value in (("id_fotografer", id_fotografer), ("id_studio", id_studio)):
+            if value is None:
+                continue
+            # One indexed range query per resource instead of an OR across both
+            queries.append(f"""
+                SELECT tanggal_waktu, waktu_selesai FROM jadwal
+                WHERE {column} = %s AND status = 'Booked'
+                AND tanggal_waktu > %s AND tanggal_waktu < %s AND waktu_selesai > %s
+                AND id_sesi != %s
+            """)
+            params += [value, start - MAX_DURATION, end, start, exclude_session or 0]
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(" UNION ALL ".join(queries), params)
+            return sorted((to_datetime(row[0]), to_datetime(row[1]))
+                          for row in cursor.fetchall())
+    
+    def _load_booked_sessions(self) -> List[Dict[str, Any]]:
+        """Get every Booked session for the schedule index"""
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id_sesi, id_fotografer, id_studio, tanggal_waktu, waktu_selesai
+                FROM jadwal WHERE status = 'Booked'
             """)
             return cursor.fetchall()
     
-    def update_jadwal(self, id_sesi: int, jadwal: Jadwal) -> Tuple[bool, str]:
-        """Update schedule with conflict checking"""
-        conflict_msg = self.check_schedule_conflict(
-            jadwal.id_fotografer, jadwal.id_studio, 
-            jadwal.tanggal_waktu, id_sesi
-        )
+    @staticmethod
+    def _schedule_conflict_query(id_fotografer: int, id_studio: int, tanggal_waktu: datetime,
+                                 durasi_menit: Optional[int] = None,
+                                 exclude_session: int = None) -> Tuple[str, list]:
+        """Build the overlap query for check_schedule_conflict
+        
+        Overlap is start < other_end AND end > other_start. Only sessions
+        starting less than MAX_DURATION earlier can overlap, which bounds the
+        range scan on the (resource, status, tanggal_waktu, waktu_selesai)
+        index and lets it answer without reading table rows.
+        """
+        start = to_datetime(tanggal_waktu)
+        end = start + (timedelta(minutes=durasi_menit) if durasi_menit else DEFAULT_DURATION)
+        
+        exclude_sql = " AND id_sesi != %s" if exclude_session else ""
+        query = f"""
+            SELECT
+                EXISTS(SELECT 1 FROM jadwal
+                       WHERE id_fotografer = %s AND status = 'Booked'
+                       AND tanggal_waktu > %s AND tanggal_waktu < %s
+                       AND waktu_selesai > %s{exclude_sql}),
+                EXISTS(SELECT 1 FROM jadwal
+                       WHERE id_studio = %s AND status = 'Booked'
+                       AND tanggal_waktu > %s AND tanggal_waktu < %s
+                       AND waktu_selesai > %s{exclude_sql})
+        """
+        fotografer_params = [id_fotografer, start - MAX_DURATION, end, start]
+        studio_params = [id_studio, start - MAX_DURATION, end, start]
+        if exclude_session:
+            fotografer_params.append(exclude_session)
+            studio_params.append(exclude_session)
+        return query, fotografer_params + studio_params
+    
+    def _find_schedule_conflict(self, connection, id_fotografer: int, id_studio: int,
+                                tanggal_waktu: datetime, durasi_menit: Optional[int] = None,
+                                exclude_session: int = None) -> str:
+        """Check photographer and studio availability in a single query"""
+        query, params = self._schedule_conflict_query(id_fotografer, id_studio, tanggal_waktu,
+                                                     durasi_menit, exclude_session)
+        fotografer_busy, studio_busy = self.statements.execute(connection, query, params)[0]
+        if fotografer_busy:
+            return FOTOGRAFER_CONFLICT_MSG
+        if studio_busy:
+            return STUDIO_CONFLICT_MSG
+        
+        return ""  # No conflict
+    
+    def get_all_jadwal_with_details(self) -> List[Dict[str, Any]]:
+        """Get all schedules with client, photographer, and studio details"""
+        with self.get_read_connection() as connection:
+            return self.statements.execute(
+                connection, f"{self._JADWAL_DETAILS_SQL} ORDER BY j.tanggal_waktu DESC",
+                dictionary=True
+            )
+    
+    def get_jadwal_details_by_id(self, id_sesi: int) -> Optional[Dict[str, Any]]:
+        """Get one schedule with client, photographer, and studio details"""
+        with self.get_read_connection() as connection:
+            rows = self.statements.execute(
+                connection, f"{self._JADWAL_DETAILS_SQL} WHERE j.id_sesi = %s", (id_sesi,),
+                dictionary=True
+            )
+            return rows[0] if rows else None
+    
+    def get_jadwal_data_version(self) -> Tuple[int, ...]:
+        """Get a fingerprint of the schedule data
         
-        if conflict_msg:
-            return False, conflict_msg
+        It changes when a schedule, or a client, photographer or studio
+        shown with one, is created, updated or deleted. The versi_data
+        counters are kept by triggers, so polling reads four rows by key
+        before reusing rows loaded by get_all_jadwal_with_details().
+        """
+        with self.get_read_connection() as connection:
+            rows = self.statements.execute(
+                connection, "SELECT versi FROM versi_data ORDER BY nama_tabel")
+            return tuple(int(row[0]) for row in rows)
+    
+    def update_jadwal(self, id_sesi: int, jadwal: Jadwal) -> Tuple[bool, str]:
+        """Update schedule with conflict checking in a single transaction
         
+        Raises StaleDataError when jadwal.version is set and the session has
+        been changed or deleted since that version was loaded.
+        """
         with self.get_connection() as connection:
             cursor = connection.cursor()
+            connection.start_transaction()
+            # Lock the photographer and studio rows so bookings that touch
+            # either resource serialize until this transaction ends
+            cursor.execute("""
+                SELECT f.id_fotografer, s.id_studio
+                FROM fotografer f JOIN studio s ON s.id_studio = %s
+                WHERE f.id_fotografer = %s
+                FOR UPDATE
+            """, (jadwal.id_studio, jadwal.id_fotografer))
+            cursor.fetchall()
+            
+            conflict_msg = self._find_schedule_conflict(
+                connection, jadwal.id_fotografer, jadwal.id_studio,
+                jadwal.tanggal_waktu, jadwal.durasi_menit, id_sesi
+            )
+            if conflict_msg:
+                connection.rollback()
+                return False, conflict_msg
+            
             cursor.execute("""
                 UPDATE jadwal SET id_klien = %s, id_fotografer = %s, id_studio = %s,
-                tanggal_waktu = %s, jenis_paket = %s, status = %s, catatan = %s
-                WHERE id_sesi = %s
+                tanggal_waktu = %s, jenis_paket = %s, status = %s, catatan = %s,
+                durasi_menit = %s, waktu_selesai = %s, version = version + 1
+                WHERE id_sesi = %s AND (%s IS NULL OR version = %s)
             """, (jadwal.id_klien, jadwal.id_fotografer, jadwal.id_studio,
                   jadwal.tanggal_waktu, jadwal.jenis_paket, jadwal.status,
-                  jadwal.catatan, id_sesi))
+                  jadwal.catatan, jadwal.durasi_menit, jadwal.waktu_selesai,
+                  id_sesi, jadwal.version, jadwal.version))
+            if cursor.rowcount == 0 and jadwal.version is not None:
+                self._raise_stale(connection, "jadwal", "id_sesi", id_sesi, jadwal.version)
             connection.commit()
-            return cursor.rowcount > 0, "Schedule updated successfully"
+            updated = cursor.rowcount > 0
+        
+        if updated and self.schedule_index is not None:
+            self.schedule_index.upsert(id_sesi, jadwal.id_fotografer, jadwal.id_studio,
+                                       jadwal.tanggal_waktu, jadwal.status,
+                                       timedelta(minutes=jadwal.durasi_menit))
+        return updated, "Schedule updated successfully"
     
     def delete_jadwal(self, id_sesi: int) -> bool:
         """Delete schedule"""
@@ -405,12 +1234,17 @@ class MySQLDatabaseManager:
             cursor = connection.cursor()
             cursor.execute("DELETE FROM jadwal WHERE id_sesi = %s", (id_sesi,))
             connection.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        
+        if deleted and self.schedule_index is not None:
+            self.schedule_index.remove(id_sesi)
+        return deleted
     
     def get_upcoming_sessions(self, hours: int = 24) -> List[Dict[str, Any]]:
         """Get sessions starting within specified hours"""
-        cutoff_time = datetime.now() + timedelta(hours=hours)
-        with self.get_connection() as connection:
+        now = datetime.now()
+        cutoff_time = now + timedelta(hours=hours)
+        with self.get_read_connection() as connection:
             cursor = connection.cursor(dictionary=True)
             cursor.execute("""
                 SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
@@ -420,64 +1254,244 @@ class MySQLDatabaseManager:
                 JOIN fotografer f ON j.id_fotografer = f.id_fotografer
                 JOIN studio s ON j.id_studio = s.id_studio
                 WHERE j.tanggal_waktu <= %s AND j.status = 'Booked'
-                AND j.tanggal_waktu >= NOW()
+                AND j.tanggal_waktu >= %s
                 ORDER BY j.tanggal_waktu
-            """, (cutoff_time,))
+            """, (cutoff_time, now))
             return cursor.fetchall()
     
     # DASHBOARD AND REPORTING
     def get_dashboard_stats(self) -> Dict[str, int]:
         """Get dashboard statistics"""
-        with self.get_connection() as connection:
-            cursor = connection.cursor()
-            
-            stats = {}
-            
-            # Total clients
-            cursor.execute("SELECT COUNT(*) FROM klien")
-            stats['total_klien'] = cursor.fetchone()[0]
-            
-            # Total photographers
-            cursor.execute("SELECT COUNT(*) FROM fotografer")
-            stats['total_fotografer'] = cursor.fetchone()[0]
-            
-            # Total studios
-            cursor.execute("SELECT COUNT(*) FROM studio")
-            stats['total_studio'] = cursor.fetchone()[0]
-            
-            # Sessions by status
-            cursor.execute("SELECT COUNT(*) FROM jadwal WHERE status = 'Booked'")
-            stats['sesi_booked'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM jadwal WHERE status = 'Selesai'")
-            stats['sesi_selesai'] = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM jadwal WHERE status = 'Batal'")
-            stats['sesi_batal'] = cursor.fetchone()[0]
-            
-            # This month's sessions
-            cursor.execute("""
-                SELECT COUNT(*) FROM jadwal 
-                WHERE YEAR(tanggal_waktu) = YEAR(NOW()) 
-                AND MONTH(tanggal_waktu) = MONTH(NOW())
-            """)
-            stats['sesi_bulan_ini'] = cursor.fetchone()[0]
+        return self.get_dashboard_snapshot(recent_limit=0)['stats']
+    
+    def get_dashboard_snapshot(self, recent_limit: int = 10) -> Dict[str, Any]:
+        """Get all dashboard counters and the most recent sessions
+        
+        The counters come from one conditional-aggregation query and the
+        recent sessions from one LIMITed query, on a single connection.
+        
+        Returns:
+            {'stats': {...counters...}, 'recent_sessions': [...]}
+        """
+        month_start, month_end = self._month_bounds(datetime.now().year, datetime.now().month)
+        month_sql, month_params = self._jadwal_range_filter(month_start, month_end)
+        
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"""
+                SELECT
+                    (SELECT COUNT(*) FROM klien) AS total_klien,
+                    (SELECT COUNT(*) FROM fotografer) AS total_fotografer,
+                    (SELECT COUNT(*) FROM studio) AS total_studio,
+                    COALESCE(SUM(CASE WHEN status = 'Booked' THEN 1 ELSE 0 END), 0) AS sesi_booked,
+                    COALESCE(SUM(CASE WHEN status = 'Selesai' THEN 1 ELSE 0 END), 0) AS sesi_selesai,
+                    COALESCE(SUM(CASE WHEN status = 'Batal' THEN 1 ELSE 0 END), 0) AS sesi_batal,
+                    (SELECT COUNT(*) FROM jadwal j WHERE {month_sql}) AS sesi_bulan_ini
+                FROM jadwal
+            """, month_params)
+            stats = {key: int(value) for key, value in cursor.fetchone().items()}
             
-            return stats
+            recent_sessions = []
+            if recent_limit > 0:
+                cursor.execute(f"{self._JADWAL_DETAILS_SQL} "
+                               "ORDER BY j.tanggal_waktu DESC, j.id_sesi DESC LIMIT %s",
+                               (recent_limit,))
+                recent_sessions = cursor.fetchall()
+        
+        return {'stats': stats, 'recent_sessions': recent_sessions}
     
     def get_monthly_report(self, year: int, month: int) -> List[Dict[str, Any]]:
         """Get monthly schedule report"""
-        with self.get_connection() as connection:
+        month_start, month_end = self._month_bounds(year, month)
+        return self.get_jadwal_between(month_start, month_end)
+    
+    def audit_double_bookings(self) -> List[Dict[str, Any]]:
+        """Find every pair of overlapping Booked sessions on a photographer or studio
+        
+        Booked sessions are streamed per resource in (resource, tanggal_waktu)
+        index order and checked in one sweep, instead of one conflict check
+        per row.
+        
+        Returns:
+            One dict per overlapping pair: resource ("fotografer"/"studio"),
+            id_resource, nama_resource and id_sesi, tanggal_waktu, waktu_selesai,
+            nama_klien of the earlier (_1) and later (_2) session
+        """
+        conflicts = []
+        with self.get_read_connection() as connection:
+            for resource, name_sql, join_sql in (
+                    ("fotografer", "f.nama", "JOIN fotografer f ON j.id_fotografer = f.id_fotografer"),
+                    ("studio", "s.nama_studio", "JOIN studio s ON j.id_studio = s.id_studio")):
+                cursor = connection.cursor(dictionary=True)
+                cursor.execute(f"""
+                    SELECT j.id_sesi, j.id_{resource} AS id_resource, {name_sql} AS nama_resource,
+                           j.tanggal_waktu, j.waktu_selesai, k.nama AS nama_klien
+                    FROM jadwal j
+                    {join_sql}
+                    JOIN klien k ON j.id_klien = k.id_klien
+                    WHERE j.status = 'Booked'
+                    ORDER BY j.id_{resource}, j.tanggal_waktu, j.id_sesi
+                """)
+                for first, second in find_overlapping_pairs(cursor, 'id_resource'):
+                    conflicts.append({
+                        'resource': resource,
+                        'id_resource': first['id_resource'],
+                        'nama_resource': first['nama_resource'],
+                        'id_sesi_1': first['id_sesi'],
+                        'tanggal_waktu_1': to_datetime(first['tanggal_waktu']),
+                        'waktu_selesai_1': to_datetime(first['waktu_selesai']),
+                        'nama_klien_1': first['nama_klien'],
+                        'id_sesi_2': second['id_sesi'],
+                        'tanggal_waktu_2': to_datetime(second['tanggal_waktu']),
+                        'waktu_selesai_2': to_datetime(second['waktu_selesai']),
+                        'nama_klien_2': second['nama_klien'],
+                    })
+        return conflicts
+    
+    # DATE RANGE QUERIES
+    _JADWAL_DETAILS_SQL = """
+        SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
+               s.nama_studio, s.lokasi
+        FROM jadwal j
+        JOIN klien k ON j.id_klien = k.id_klien
+        JOIN fotografer f ON j.id_fotografer = f.id_fotografer
+        JOIN studio s ON j.id_studio = s.id_studio
+    """
+    
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+        """Get the half-open [first day, first day of next month) range for a month"""
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+        return start, end
+    
+    @staticmethod
+    def _jadwal_filter(status: Optional[str] = None, id_klien: Optional[int] = None,
+                       id_fotografer: Optional[int] = None,
+                       id_studio: Optional[int] = None) -> Tuple[List[str], list]:
+        """Build equality conditions on jadwal j for the optional filters"""
+        conditions = []
+        params = []
+        for column, value in (("status", status), ("id_klien", id_klien),
+                              ("id_fotografer", id_fotografer), ("id_studio", id_studio)):
+            if value:
+                conditions.append(f"j.{column} = %s")
+                params.append(value)
+        return conditions, params
+    
+    @classmethod
+    def _jadwal_range_filter(cls, start: datetime, end: datetime, status: Optional[str] = None,
+                             id_fotografer: Optional[int] = None,
+                             id_studio: Optional[int] = None) -> Tuple[str, list]:
+        """Build a WHERE clause on jadwal j with a half-open range on tanggal_waktu
+        
+        Comparing the bare column (instead of wrapping it in date functions)
+        lets the database use the tanggal_waktu indexes.
+        """
+        # Plain dates cover the whole day, so widen them to midnight datetimes
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, datetime.min.time())
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, datetime.min.time())
+        
+        conditions = ["j.tanggal_waktu >= %s", "j.tanggal_waktu < %s"]
+        params = [start, end]
+        filter_conditions, filter_params = cls._jadwal_filter(status, id_fotografer=id_fotografer,
+                                                              id_studio=id_studio)
+        conditions += filter_conditions
+        params += filter_params
+        return " AND ".join(conditions), params
+    
+    def get_jadwal_between(self, start: datetime, end: datetime, status: Optional[str] = None,
+                           id_fotografer: Optional[int] = None,
+                           id_studio: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get schedules with details where start <= tanggal_waktu < end"""
+        where_sql, params = self._jadwal_range_filter(start, end, status, id_fotografer, id_studio)
+        with self.get_read_connection() as connection:
+            return self.statements.execute(
+                connection, f"{self._JADWAL_DETAILS_SQL} WHERE {where_sql} ORDER BY j.tanggal_waktu",
+                params, dictionary=True
+            )
+    
+    def count_jadwal_between(self, start: datetime, end: datetime, status: Optional[str] = None,
+                             id_fotografer: Optional[int] = None,
+                             id_studio: Optional[int] = None) -> int:
+        """Count schedules where start <= tanggal_waktu < end"""
+        where_sql, params = self._jadwal_range_filter(start, end, status, id_fotografer, id_studio)
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM jadwal j WHERE {where_sql}", params)
+            return cursor.fetchone()[0]
+    
+    # PAGINATED LISTING
+    def get_jadwal_page(self, cursor: Optional[Tuple[Any, int]] = None, page_size: int = 50,
+                        direction: str = "next", status: Optional[str] = None,
+                        id_klien: Optional[int] = None, id_fotografer: Optional[int] = None,
+                        id_studio: Optional[int] = None
+                        ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+        """Get one page of schedules with details, newest first
+        
+        Uses keyset pagination on (tanggal_waktu, id_sesi), so every page
+        costs the same regardless of how much history precedes it.
+        
+        Args:
+            cursor: (tanggal_waktu, id_sesi) of the row the page starts after,
+                or None for the first (newest) page
+            page_size: maximum number of rows in the page
+            direction: "next" for older rows, "prev" for newer rows
+        
+        Returns:
+            (rows, next_cursor) where rows are always ordered newest first and
+            next_cursor continues in the same direction, or None at the end
+        """
+        if direction not in ("next", "prev"):
+            raise ValueError("direction must be 'next' or 'prev'")
+        
+        conditions, params = self._jadwal_filter(status, id_klien, id_fotografer, id_studio)
+        if cursor is not None:
+            tanggal_waktu, id_sesi = cursor
+            op = "<" if direction == "next" else ">"
+            # The redundant inclusive bound lets the index seek to the cursor
+            # instead of scanning from the newest row
+            conditions.append(f"j.tanggal_waktu {op}= %s")
+            conditions.append(f"(j.tanggal_waktu {op} %s OR "
+                              f"(j.tanggal_waktu = %s AND j.id_sesi {op} %s))")
+            params += [tanggal_waktu, tanggal_waktu, tanggal_waktu, id_sesi]
+        
+        order = "DESC" if direction == "next" else "ASC"
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (f"{self._JADWAL_DETAILS_SQL} {where_sql} "
+                 f"ORDER BY j.tanggal_waktu {order}, j.id_sesi {order} LIMIT %s")
+        
+        with self.get_read_connection() as connection:
+            # Fetch one extra row to know whether another page exists
+            rows = self.statements.execute(connection, query, params + [page_size + 1],
+                                           dictionary=True)
+        
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]['tanggal_waktu'], rows[-1]['id_sesi']) if has_more else None
+        if direction == "prev":
+            rows.reverse()
+        return rows, next_cursor
+    
+    def explain_jadwal_between(self, start: datetime, end: datetime,
+                               status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the EXPLAIN plan rows for get_jadwal_between (one dict per table)"""
+        where_sql, params = self._jadwal_range_filter(start, end, status)
+        with self.get_read_connection() as connection:
             cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT j.*, k.nama as nama_klien, f.nama as nama_fotografer,
-                       s.nama_studio, s.lokasi
-                FROM jadwal j
-                JOIN klien k ON j.id_klien = k.id_klien
-                JOIN fotografer f ON j.id_fotografer = f.id_fotografer
-                JOIN studio s ON j.id_studio = s.id_studio
-                WHERE YEAR(j.tanggal_waktu) = %s 
-                AND MONTH(j.tanggal_waktu) = %s
-                ORDER BY j.tanggal_waktu
-            """, (year, month))
+            cursor.execute(f"EXPLAIN {self._JADWAL_DETAILS_SQL} WHERE {where_sql} "
+                           "ORDER BY j.tanggal_waktu", params)
+            return cursor.fetchall()
+    
+    def explain_schedule_conflict(self, id_fotografer: int, id_studio: int,
+                                  tanggal_waktu: datetime,
+                                  durasi_menit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the EXPLAIN plan rows for the database conflict check"""
+        query, params = self._schedule_conflict_query(id_fotografer, id_studio, tanggal_waktu,
+                                                      durasi_menit)
+        with self.get_read_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"EXPLAIN {query}", params)
             return cursor.fetchall()
\ No newline at end of file
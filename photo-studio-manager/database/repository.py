@@ -0,0 +1,152 @@
+"""
+Repository Interface for Photo Studio Management System
+Backend-neutral contract shared by the SQLite and MySQL database managers
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Protocol, Tuple, runtime_checkable
+
+from config.database import DATABASE_BACKEND
+from models.database_models import Klien, Fotografer, Studio, Jadwal
+
+BACKENDS = ("mysql", "sqlite")
+
+# Tables whose rows carry a version column for optimistic concurrency
+VERSIONED_TABLES = ("klien", "fotografer", "studio", "jadwal")
+
+# Tables whose writes change get_jadwal_data_version: jadwal and the rows shown with it
+DATA_VERSION_TABLES = ("klien", "fotografer", "studio", "jadwal")
+
+
+class StaleDataError(Exception):
+    """Raised when a versioned update finds the row changed or deleted by another desk
+
+    ``current`` is the row as it is now (None if it was deleted), so the
+    caller can re-fetch and merge instead of overwriting someone else's edit.
+    """
+
+    def __init__(self, table: str, key: int, expected_version: int,
+                 current: Optional[Dict[str, Any]]):
+        self.table = table
+        self.key = key
+        self.expected_version = expected_version
+        self.current = current
+        state = "deleted" if current is None else f"now at version {current.get('version')}"
+        super().__init__(f"{table} {key} was changed by another user "
+                         f"(expected version {expected_version}, {state})")
+
+
+@runtime_checkable
+class StudioRepository(Protocol):
+    """Operations the views and scripts may rely on, whatever the backend
+
+    Rows are plain dicts keyed by column name. tanggal_waktu comes back as a
+    datetime from MySQL and as an ISO string from SQLite; use
+    services.schedule_conflicts.to_datetime when comparing. Rows carry a
+    ``version``; passing it back on the model makes update_* raise
+    StaleDataError instead of overwriting a newer row.
+    """
+
+    # CONNECTIONS AND DIAGNOSTICS
+    def get_connection(self): ...
+    def get_read_connection(self): ...
+    def get_query_stats(self) -> Dict[str, Any]: ...
+    def reset_query_stats(self): ...
+    def close(self): ...
+
+    # KLIEN
+    def create_klien(self, klien: Klien) -> int: ...
+    def create_klien_many(self, klien_list: List[Klien], batch_size: int = ...) -> int: ...
+    def get_all_klien(self) -> List[Dict[str, Any]]: ...
+    def get_klien_by_id(self, id_klien: int) -> Optional[Dict[str, Any]]: ...
+    def update_klien(self, id_klien: int, klien: Klien) -> bool: ...
+    def delete_klien(self, id_klien: int) -> bool: ...
+    def search_klien(self, search_term: str, limit: int = ...) -> List[Dict[str, Any]]: ...
+    def find_klien_by_phone(self, nomor_hp: str) -> List[Dict[str, Any]]: ...
+    def fuzzy_search_klien(self, search_term: str, limit: int = ...,
+                           threshold: float = ...) -> List[Dict[str, Any]]: ...
+
+    # FOTOGRAFER
+    def create_fotografer(self, fotografer: Fotografer) -> int: ...
+    def create_fotografer_many(self, fotografer_list: List[Fotografer],
+                               batch_size: int = ...) -> int: ...
+    def get_all_fotografer(self) -> List[Dict[str, Any]]: ...
+    def get_fotografer_by_id(self, id_fotografer: int) -> Optional[Dict[str, Any]]: ...
+    def update_fotografer(self, id_fotografer: int, fotografer: Fotografer) -> bool: ...
+    def delete_fotografer(self, id_fotografer: int) -> bool: ...
+
+    # STUDIO
+    def create_studio(self, studio: Studio) -> int: ...
+    def create_studio_many(self, studio_list: List[Studio], batch_size: int = ...) -> int: ...
+    def get_all_studio(self) -> List[Dict[str, Any]]: ...
+    def get_studio_by_id(self, id_studio: int) -> Optional[Dict[str, Any]]: ...
+    def update_studio(self, id_studio: int, studio: Studio) -> bool: ...
+    def delete_studio(self, id_studio: int) -> bool: ...
+
+    # JADWAL
+    def create_jadwal(self, jadwal: Jadwal) -> Tuple[bool, str]: ...
+    def create_jadwal_many(self, jadwal_list: List[Jadwal],
+                           batch_size: int = ...) -> List[Tuple[bool, str]]: ...
+    def create_jadwal_series(self, jadwal: Jadwal, occurrences: List[datetime],
+                             batch_size: int = ...
+                             ) -> List[Tuple[datetime, bool, str, Optional[int]]]: ...
+    def check_schedule_conflict(self, id_fotografer: int, id_studio: int,
+                                tanggal_waktu: datetime, exclude_session: int = None,
+                                durasi_menit: Optional[int] = None) -> str: ...
+    def find_free_slots(self, id_fotografer: Optional[int] = None,
+                        id_studio: Optional[int] = None, *, start: datetime, end: datetime,
+                        duration: timedelta = ..., step: timedelta = ...,
+                        exclude_session: int = None) -> List[Tuple[datetime, datetime]]: ...
+    def assign_jadwal_requests(self, requests: List[Dict[str, Any]]
+                               ) -> List[Optional[Tuple[int, int]]]: ...
+    def get_day_availability(self, day: date, kind: str = "studio",
+                             resource_ids: Optional[List[int]] = None,
+                             duration: Optional[timedelta] = None) -> Dict[int, int]: ...
+    def query_availability(self, day: date, all_of: List[Tuple[str, int]] = (),
+                           any_of: List[Tuple[str, int]] = (),
+                           duration: Optional[timedelta] = None) -> int: ...
+    def update_jadwal(self, id_sesi: int, jadwal: Jadwal) -> Tuple[bool, str]: ...
+    def delete_jadwal(self, id_sesi: int) -> bool: ...
+    def get_all_jadwal_with_details(self) -> List[Dict[str, Any]]: ...
+    def get_jadwal_details_by_id(self, id_sesi: int) -> Optional[Dict[str, Any]]: ...
+    def get_jadwal_data_version(self) -> Tuple[int, ...]: ...
+    def get_upcoming_sessions(self, hours: int = 24) -> List[Dict[str, Any]]: ...
+    def get_jadwal_between(self, start: datetime, end: datetime, status: Optional[str] = None,
+                           id_fotografer: Optional[int] = None,
+                           id_studio: Optional[int] = None) -> List[Dict[str, Any]]: ...
+    def count_jadwal_between(self, start: datetime, end: datetime, status: Optional[str] = None,
+                             id_fotografer: Optional[int] = None,
+                             id_studio: Optional[int] = None) -> int: ...
+    def get_jadwal_page(self, cursor: Optional[Tuple[Any, int]] = None, page_size: int = 50,
+                        direction: str = "next", status: Optional[str] = None,
+                        id_klien: Optional[int] = None, id_fotografer: Optional[int] = None,
+                        id_studio: Optional[int] = None
+                        ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]: ...
+    def explain_jadwal_between(self, start: datetime, end: datetime,
+                               status: Optional[str] = None) -> List[Any]: ...
+    def explain_schedule_conflict(self, id_fotografer: int, id_studio: int,
+                                  tanggal_waktu: datetime,
+                                  durasi_menit: Optional[int] = None) -> List[Any]: ...
+
+    # DASHBOARD AND REPORTING
+    def get_dashboard_stats(self) -> Dict[str, int]: ...
+    def get_dashboard_snapshot(self, recent_limit: int = 10) -> Dict[str, Any]: ...
+    def get_monthly_report(self, year: int, month: int) -> List[Dict[str, Any]]: ...
+    def audit_double_bookings(self) -> List[Dict[str, Any]]: ...
+
+
+def create_repository(backend: Optional[str] = None, **options) -> StudioRepository:
+    """Create the database manager for a backend
+
+    Args:
+        backend: "mysql" or "sqlite"; defaults to DATABASE_BACKEND from config
+        options: passed to the manager constructor (e.g. db_path for SQLite)
+    """
+    backend = (backend or DATABASE_BACKEND).lower()
+    if backend == "mysql":
+        from database.mysql_database_manager import MySQLDatabaseManager
+        return MySQLDatabaseManager(**options)
+    if backend == "sqlite":
+        from database.database_manager import DatabaseManager
+        return DatabaseManager(**options)
+    raise ValueError(f"Unknown database backend '{backend}', expected one of {BACKENDS}")
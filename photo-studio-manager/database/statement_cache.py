@@ -0,0 +1,108 @@
+"""
+Prepared Statement Cache for Photo Studio Management System
+Keeps server-side prepared MySQL cursors per pooled connection
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence
+
+
+class PreparedStatementCache:
+    """LRU cache of prepared cursors, one set per pooled connection
+
+    mysql.connector only skips the PREPARE round trip when a prepared cursor
+    is executed again with the very same statement object, so each cached
+    entry keeps the first copy of the SQL text next to its cursor.
+    """
+
+    def __init__(self, max_statements: int = 32):
+        """Initialize cache; max_statements is the limit per connection (0 disables)"""
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._connections = weakref.WeakKeyDictionary()  # raw connection -> OrderedDict
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_statements > 0
+
+    def execute(self, connection, sql: str, params: Sequence[Any] = (),
+                dictionary: bool = False) -> List[Any]:
+        """Execute a statement on a cached prepared cursor and fetch all rows
+
+        Args:
+            connection: pooled connection (may be an instrumented wrapper)
+            sql: statement with %s placeholders
+            params: statement parameters
+            dictionary: return rows as dicts instead of tuples
+        """
+        if not self.enabled:
+            cursor = connection.cursor(dictionary=dictionary)
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+        key = (sql, dictionary)
+        raw = getattr(connection, 'raw_connection', connection)
+        evicted = []
+        with self._lock:
+            statements = self._connections.get(raw)
+            if statements is None:
+                statements = self._connections[raw] = OrderedDict()
+            entry = statements.get(key)
+            if entry is not None:
+                statements.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if entry is None:
+            # Prepared cursors cannot be buffered; rows are fetched right away below
+            cursor = connection.cursor(prepared=True, dictionary=dictionary, buffered=False)
+            entry = (sql, cursor)
+            with self._lock:
+                statements[key] = entry
+                while len(statements) > self.max_statements:
+                    evicted.append(statements.popitem(last=False)[1][1])
+                    self._evictions += 1
+            for old_cursor in evicted:
+                self._close_quietly(old_cursor)
+
+        statement, cursor = entry
+        cursor.execute(statement, tuple(params))
+        return cursor.fetchall()
+
+    def discard(self, connection):
+        """Drop all cached statements of a connection (after an error)"""
+        raw = getattr(connection, 'raw_connection', connection)
+        with self._lock:
+            statements = self._connections.pop(raw, None)
+        for _, cursor in (statements or {}).values():
+            self._close_quietly(cursor)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        with self._lock:
+            cached = sum(len(statements) for statements in self._connections.values())
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'connections': len(self._connections),
+                'statements': cached,
+            }
+
+    @staticmethod
+    def _close_quietly(cursor):
+        """Close a prepared cursor, ignoring errors from dead connections"""
+        try:
+            cursor.close()
+        except Exception:
+            pass
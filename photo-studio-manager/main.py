@@ -1,6 +1,7 @@
 
 import sys
 import os
+import logging
 
 # Add current directory to Python path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -8,6 +9,10 @@ sys.path.insert(0, current_dir)
 
 def main():
     """Main application entry point"""
+    # Slow-query warnings and conflict-check latency go to the console
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
     try:
         # Import after path setup
         from views.main_window import main as run_app
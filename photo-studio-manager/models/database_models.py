@@ -3,7 +3,7 @@ Database models for Photo Studio Management System
 Defines the structure and relationships between entities
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
 class BaseModel:
@@ -28,13 +28,15 @@ class Klien(BaseModel):
     """Client model"""
     
     def __init__(self, id_klien: int = None, nama: str = "", 
-                 nomor_hp: str = "", email: str = "", alamat: str = ""):
+                 nomor_hp: str = "", email: str = "", alamat: str = "",
+                 version: int = None):
         super().__init__()
         self.id_klien = id_klien
         self.nama = nama
         self.nomor_hp = nomor_hp
         self.email = email
         self.alamat = alamat
+        self.version = version  # Version the editor loaded; None skips the check
     
     @staticmethod
     def get_table_schema() -> str:
@@ -44,8 +46,10 @@ class Klien(BaseModel):
             id_klien INTEGER PRIMARY KEY AUTOINCREMENT,
             nama TEXT NOT NULL,
             nomor_hp TEXT NOT NULL,
+            nomor_hp_e164 TEXT,
             email TEXT,
             alamat TEXT,
+            version INTEGER NOT NULL DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -55,12 +59,13 @@ class Fotografer(BaseModel):
     """Photographer model"""
     
     def __init__(self, id_fotografer: int = None, nama: str = "", 
-                 spesialisasi: str = "", nomor_hp: str = ""):
+                 spesialisasi: str = "", nomor_hp: str = "", version: int = None):
         super().__init__()
         self.id_fotografer = id_fotografer
         self.nama = nama
         self.spesialisasi = spesialisasi
         self.nomor_hp = nomor_hp
+        self.version = version
     
     @staticmethod
     def get_table_schema() -> str:
@@ -71,6 +76,7 @@ class Fotografer(BaseModel):
             nama TEXT NOT NULL,
             spesialisasi TEXT NOT NULL,
             nomor_hp TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -80,12 +86,13 @@ class Studio(BaseModel):
     """Studio model"""
     
     def __init__(self, id_studio: int = None, nama_studio: str = "", 
-                 lokasi: str = "", kapasitas: int = 0):
+                 lokasi: str = "", kapasitas: int = 0, version: int = None):
         super().__init__()
         self.id_studio = id_studio
         self.nama_studio = nama_studio
         self.lokasi = lokasi
         self.kapasitas = kapasitas
+        self.version = version
     
     @staticmethod
     def get_table_schema() -> str:
@@ -96,6 +103,7 @@ class Studio(BaseModel):
             nama_studio TEXT NOT NULL,
             lokasi TEXT NOT NULL,
             kapasitas INTEGER NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
@@ -109,7 +117,8 @@ class Jadwal(BaseModel):
     def __init__(self, id_sesi: int = None, id_klien: int = None, 
                  id_fotografer: int = None, id_studio: int = None,
                  tanggal_waktu: datetime = None, jenis_paket: str = "",
-                 status: str = "Booked", catatan: str = ""):
+                 status: str = "Booked", catatan: str = "", durasi_menit: int = None,
+                 version: int = None):
         super().__init__()
         self.id_sesi = id_sesi
         self.id_klien = id_klien
@@ -119,6 +128,17 @@ class Jadwal(BaseModel):
         self.jenis_paket = jenis_paket
         self.status = status if status in self.STATUS_CHOICES else "Booked"
         self.catatan = catatan
+        self.durasi_menit = durasi_menit or default_durasi_menit(jenis_paket)
+        # Every overlap check looks back at most MAX_DURASI_MENIT from a start
+        if not 1 <= self.durasi_menit <= MAX_DURASI_MENIT:
+            raise ValueError(f"durasi_menit must be between 1 and {MAX_DURASI_MENIT}, "
+                             f"got {self.durasi_menit}")
+        self.version = version
+    
+    @property
+    def waktu_selesai(self) -> datetime:
+        """End of the session (exclusive)"""
+        return self.tanggal_waktu + timedelta(minutes=self.durasi_menit)
     
     @staticmethod
     def get_table_schema() -> str:
@@ -133,6 +153,9 @@ class Jadwal(BaseModel):
             jenis_paket TEXT NOT NULL,
             status TEXT NOT NULL DEFAULT 'Booked',
             catatan TEXT,
+            durasi_menit INTEGER NOT NULL DEFAULT 60,
+            waktu_selesai TIMESTAMP,
+            version INTEGER NOT NULL DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (id_klien) REFERENCES klien (id_klien),
@@ -146,4 +169,19 @@ class Jadwal(BaseModel):
 PAKET_JENIS = [
     "Wedding", "Prewedding", "Portrait", "Family", "Corporate", 
     "Product", "Event", "Fashion", "Graduation", "Birthday"
-]
\ No newline at end of file
+]
+
+# Default session length in minutes per package
+PAKET_DURASI_MENIT = {
+    "Wedding": 360, "Prewedding": 180, "Portrait": 60, "Family": 90, "Corporate": 120,
+    "Product": 120, "Event": 240, "Fashion": 180, "Graduation": 60, "Birthday": 120
+}
+DEFAULT_DURASI_MENIT = 60
+
+# Longest bookable session; bounds the range scans of the overlap checks
+MAX_DURASI_MENIT = 12 * 60
+
+
+def default_durasi_menit(jenis_paket: str) -> int:
+    """Get the default session length in minutes for a package"""
+    return PAKET_DURASI_MENIT.get(jenis_paket, DEFAULT_DURASI_MENIT)
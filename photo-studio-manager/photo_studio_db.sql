@@ -64,6 +64,8 @@ CREATE TABLE `jadwal` (
   `jenis_paket` varchar(100) COLLATE utf8mb4_unicode_ci NOT NULL,
   `status` enum('Booked','Selesai','Batal') COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT 'Booked',
   `catatan` text COLLATE utf8mb4_unicode_ci,
+  `durasi_menit` int NOT NULL DEFAULT '60',
+  `waktu_selesai` datetime DEFAULT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -114,6 +116,17 @@ INSERT INTO `jadwal` (`id_sesi`, `id_klien`, `id_fotografer`, `id_studio`, `tang
 (39, 1, 5, 4, '2025-10-04 05:18:03', 'Prewedding', 'Booked', 'Sesi foto mendatang - pastikan semua peralatan siap', '2025-10-03 08:18:03', '2025-10-03 08:18:03'),
 (40, 7, 7, 4, '2025-10-05 06:18:03', 'Product', 'Booked', 'Sesi foto mendatang - pastikan semua peralatan siap', '2025-10-03 08:18:03', '2025-10-03 08:18:03');
 
+--
+-- Session length per package and end time, as the application computes them
+--
+
+UPDATE `jadwal` SET `durasi_menit` = CASE `jenis_paket`
+  WHEN 'Wedding' THEN 360 WHEN 'Prewedding' THEN 180 WHEN 'Portrait' THEN 60
+  WHEN 'Family' THEN 90 WHEN 'Corporate' THEN 120 WHEN 'Product' THEN 120
+  WHEN 'Event' THEN 240 WHEN 'Fashion' THEN 180 WHEN 'Graduation' THEN 60
+  WHEN 'Birthday' THEN 120 ELSE 60 END;
+UPDATE `jadwal` SET `waktu_selesai` = `tanggal_waktu` + INTERVAL `durasi_menit` MINUTE;
+
 -- --------------------------------------------------------
 
 --
@@ -193,7 +206,9 @@ ALTER TABLE `jadwal`
   ADD KEY `idx_status` (`status`),
   ADD KEY `idx_klien` (`id_klien`),
   ADD KEY `idx_fotografer` (`id_fotografer`),
-  ADD KEY `idx_studio` (`id_studio`);
+  ADD KEY `idx_studio` (`id_studio`),
+  ADD KEY `idx_jadwal_photographer_time` (`id_fotografer`,`status`,`tanggal_waktu`,`waktu_selesai`),
+  ADD KEY `idx_jadwal_studio_time` (`id_studio`,`status`,`tanggal_waktu`,`waktu_selesai`);
 
 --
 -- Indexes for table `klien`
@@ -0,0 +1,159 @@
+"""
+Resource assignment for Photo Studio Management System
+Assigns photographers and studios to a batch of pending session requests
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.database_models import default_durasi_menit
+from services.schedule_conflicts import MAX_DURATION, Interval, session_bounds, to_datetime
+
+# Photographer specialisations accepted for each package; a package not
+# listed here needs a photographer with the same specialisation
+PAKET_SPESIALISASI = {
+    "Prewedding": ("Prewedding", "Wedding"),
+    "Graduation": ("Graduation", "Portrait"),
+    "Birthday": ("Birthday", "Event", "Family"),
+}
+
+# Owner recorded for bookings that already exist in the database
+_EXISTING = -1
+
+FOTOGRAFER = "fotografer"
+STUDIO = "studio"
+
+
+def accepted_spesialisasi(jenis_paket: str) -> Tuple[str, ...]:
+    """Get the photographer specialisations that may shoot a package"""
+    return PAKET_SPESIALISASI.get(jenis_paket, (jenis_paket,))
+
+
+class _Calendar:
+    """Sorted (start, end, owner) bookings per resource, owner being a request index or _EXISTING"""
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, int], List[Tuple[datetime, datetime, int]]] = {}
+
+    def add(self, resource: Tuple[str, int], session: Interval, owner: int):
+        insort(self.entries.setdefault(resource, []), session + (owner,))
+
+    def remove(self, resource: Tuple[str, int], session: Interval, owner: int):
+        entries = self.entries[resource]
+        del entries[bisect_left(entries, session + (owner,))]
+
+    def blockers(self, resource: Tuple[str, int], session: Interval) -> List[int]:
+        """Get the owners of the bookings that overlap session"""
+        entries = self.entries.get(resource)
+        if not entries:
+            return []
+        start, end = session
+        owners = []
+        index = bisect_left(entries, (start - MAX_DURATION,))
+        while index < len(entries) and entries[index][0] < end:
+            if entries[index][1] > start:
+                owners.append(entries[index][2])
+            index += 1
+        return owners
+
+
+def assign_resources(requests: Sequence[Dict[str, Any]], fotografer: Iterable[Dict[str, Any]],
+                     studio: Iterable[Dict[str, Any]], booked: Iterable[Dict[str, Any]]
+                     ) -> List[Optional[Tuple[int, int]]]:
+    """Assign a photographer and a studio to as many requests as possible
+
+    Requests are handled in time order. Each gets a free photographer whose
+    specialisation fits its package and the smallest free studio that holds
+    the group, so large studios stay available for large groups. When no
+    eligible resource is free, one augmenting step is tried: a request
+    already holding an eligible resource is moved to another free one to
+    make room, as in bipartite matching. Sessions conflict when their
+    intervals overlap, the same rule as check_schedule_conflict.
+
+    Args:
+        requests: dicts with tanggal_waktu, jenis_paket, jumlah_orang
+            (group size, default 1) and durasi_menit (default per package)
+        fotografer: photographer rows (id_fotografer, spesialisasi)
+        studio: studio rows (id_studio, kapasitas)
+        booked: Booked rows (id_fotografer, id_studio, tanggal_waktu,
+            waktu_selesai) already stored in the database
+
+    Returns:
+        One (id_fotografer, id_studio) tuple per request, None when the
+        request cannot be fulfilled
+    """
+    fotografer_by_spesialisasi: Dict[str, List[int]] = {}
+    for row in fotografer:
+        fotografer_by_spesialisasi.setdefault(row['spesialisasi'], []).append(row['id_fotografer'])
+    studios = sorted((row['kapasitas'], row['id_studio']) for row in studio)
+    capacities = [kapasitas for kapasitas, _ in studios]
+
+    calendar = _Calendar()
+    for row in booked:
+        bounds = session_bounds(row)
+        if row.get('id_fotografer') is not None:
+            calendar.add((FOTOGRAFER, row['id_fotografer']), bounds, _EXISTING)
+        if row.get('id_studio') is not None:
+            calendar.add((STUDIO, row['id_studio']), bounds, _EXISTING)
+
+    times: List[Interval] = []
+    for request in requests:
+        start = to_datetime(request['tanggal_waktu'])
+        durasi = request.get('durasi_menit') or default_durasi_menit(request['jenis_paket'])
+        times.append((start, start + timedelta(minutes=durasi)))
+    eligible: List[Dict[str, List[Tuple[str, int]]]] = []
+    for request in requests:
+        fotografer_ids = []
+        for spesialisasi in accepted_spesialisasi(request['jenis_paket']):
+            fotografer_ids += fotografer_by_spesialisasi.get(spesialisasi, [])
+        # Studios are sorted by capacity, so the eligible ones are a suffix
+        first_studio = bisect_left(capacities, request.get('jumlah_orang') or 1)
+        eligible.append({
+            FOTOGRAFER: [(FOTOGRAFER, id_fotografer) for id_fotografer in sorted(fotografer_ids)],
+            STUDIO: [(STUDIO, id_studio) for _, id_studio in studios[first_studio:]],
+        })
+
+    held: List[Dict[str, Tuple[str, int]]] = [{} for _ in requests]
+
+    def find_free(index: int, kind: str, skip: Tuple[str, int] = None) -> Optional[Tuple[str, int]]:
+        for resource in eligible[index][kind]:
+            if resource != skip and not calendar.blockers(resource, times[index]):
+                return resource
+        return None
+
+    def take(index: int, kind: str) -> Optional[Tuple[str, int]]:
+        resource = find_free(index, kind)
+        if resource is not None:
+            return resource
+        # Augmenting step: free a resource held by exactly one other request
+        for resource in eligible[index][kind]:
+            owners = calendar.blockers(resource, times[index])
+            if len(owners) != 1 or owners[0] == _EXISTING:
+                continue
+            other = owners[0]
+            replacement = find_free(other, kind, skip=resource)
+            if replacement is None:
+                continue
+            calendar.remove(resource, times[other], other)
+            calendar.add(replacement, times[other], other)
+            held[other][kind] = replacement
+            return resource
+        return None
+
+    for index in sorted(range(len(requests)), key=times.__getitem__):
+        fotografer_resource = take(index, FOTOGRAFER)
+        if fotografer_resource is None:
+            continue
+        # Hold the photographer while looking for a studio, so a studio
+        # move cannot pull it away again
+        calendar.add(fotografer_resource, times[index], index)
+        studio_resource = take(index, STUDIO)
+        if studio_resource is None:
+            calendar.remove(fotografer_resource, times[index], index)
+            continue
+        calendar.add(studio_resource, times[index], index)
+        held[index] = {FOTOGRAFER: fotografer_resource, STUDIO: studio_resource}
+
+    return [(resources[FOTOGRAFER][1], resources[STUDIO][1]) if resources else None
+            for resources in held]
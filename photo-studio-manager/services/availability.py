@@ -0,0 +1,210 @@
+"""
+Availability store for Photo Studio Management System
+Per-day bitmaps of the 15-minute slots where a resource is free
+"""
+
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.schedule_conflicts import MAX_DURATION
+from services.schedule_index import ScheduleIndex
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOT = timedelta(minutes=SLOT_MINUTES)
+ALL_SLOTS = (1 << SLOTS_PER_DAY) - 1
+
+FOTOGRAFER = "fotografer"
+STUDIO = "studio"
+
+
+def slot_time(day: date, slot: int) -> datetime:
+    """Get the start time of a slot"""
+    return datetime.combine(day, time()) + slot * SLOT
+
+
+def slot_of(when: datetime) -> int:
+    """Get the number of the slot a time falls in"""
+    return (when - datetime.combine(when.date(), time())) // SLOT
+
+
+def mask_slots(mask: int) -> List[int]:
+    """Get the slot numbers set in a mask"""
+    slots = []
+    while mask:
+        low_bit = mask & -mask
+        slots.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return slots
+
+
+def slot_ranges(mask: int) -> List[Tuple[int, int]]:
+    """Get (first, last) slot numbers of every run of set bits in a mask"""
+    ranges = []
+    for slot in mask_slots(mask):
+        if ranges and ranges[-1][1] == slot - 1:
+            ranges[-1] = (ranges[-1][0], slot)
+        else:
+            ranges.append((slot, slot))
+    return ranges
+
+
+def booking_bits(day_start: datetime, start: datetime, end: datetime) -> int:
+    """Bits of the slots of one day that the session [start, end) overlaps"""
+    first = max((start - day_start) // SLOT, 0)
+    last = min(-((day_start - end) // SLOT) - 1, SLOTS_PER_DAY - 1)  # ceiling division
+    if first > last:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def busy_mask(sessions: Iterable[Tuple[datetime, datetime]], day: date) -> int:
+    """Get the mask of slots of a day that any (start, end) session overlaps"""
+    day_start = datetime.combine(day, time())
+    mask = 0
+    for start, end in sessions:
+        mask |= booking_bits(day_start, start, end)
+    return mask
+
+
+def start_mask(free_today: int, free_tomorrow: int, duration: timedelta) -> int:
+    """Get the slots of a day where a session of duration fits into free slots
+
+    free_tomorrow lets late sessions run past midnight.
+    """
+    free = free_today | free_tomorrow << SLOTS_PER_DAY
+    mask = free
+    for offset in range(1, -(-duration // SLOT)):
+        mask &= free >> offset
+    return mask & ALL_SLOTS
+
+
+class AvailabilityStore:
+    """Bitmaps per photographer and studio per day, fed by a ScheduleIndex
+
+    Bit i of a day's mask stands for the slot [day 00:00 + i * 15 minutes,
+    + 15 minutes); it is set when no Booked session overlaps that slot.
+    With a duration, masks instead mark the slots where a session of that
+    length can start, so a set bit means the conflict check would pass
+    there. Masks are built on first use and updated incrementally when the
+    index changes.
+    """
+
+    def __init__(self, index: ScheduleIndex):
+        """Initialize store and subscribe to schedule index changes"""
+        self.index = index
+        self._lock = threading.Lock()
+        self._bookings: Dict[Tuple[str, int], List[Tuple[datetime, datetime]]] = {}
+        self._blocked: Dict[Tuple[str, int, date], int] = {}
+        index.add_listener(self._on_index_change)
+
+    def free_mask(self, kind: str, resource_id: int, day: date,
+                  duration: Optional[timedelta] = None) -> int:
+        """Get the mask of free slots, or of possible starts for a session of duration"""
+        self.index.refresh()
+        with self._lock:
+            return self._free_mask(kind, resource_id, day, duration)
+
+    def free_masks(self, kind: str, resource_ids: Iterable[int], day: date,
+                   duration: Optional[timedelta] = None) -> Dict[int, int]:
+        """Get free masks for several resources of one kind"""
+        self.index.refresh()
+        with self._lock:
+            return {resource_id: self._free_mask(kind, resource_id, day, duration)
+                    for resource_id in resource_ids}
+
+    def query(self, day: date, all_of: Iterable[Tuple[str, int]] = (),
+              any_of: Iterable[Tuple[str, int]] = (),
+              duration: Optional[timedelta] = None) -> int:
+        """Combine free masks: every resource in all_of AND at least one in any_of
+
+        Example: a photographer free AND any studio free for two hours is
+        query(day, all_of=[("fotografer", 3)], any_of=[("studio", 1), ("studio", 2)],
+        duration=timedelta(hours=2))
+        """
+        all_of = list(all_of)
+        any_of = list(any_of)
+        self.index.refresh()
+        with self._lock:
+            mask = ALL_SLOTS
+            for kind, resource_id in all_of:
+                mask &= self._free_mask(kind, resource_id, day, duration)
+            if any_of:
+                any_mask = 0
+                for kind, resource_id in any_of:
+                    any_mask |= self._free_mask(kind, resource_id, day, duration)
+                mask &= any_mask
+            return mask
+
+    def is_free(self, kind: str, resource_id: int, when: datetime, duration: timedelta) -> bool:
+        """Check a slot-aligned start time against the bitmap"""
+        return bool(self.free_mask(kind, resource_id, when.date(), duration) >> slot_of(when) & 1)
+
+    def _free_mask(self, kind: str, resource_id: int, day: date,
+                   duration: Optional[timedelta]) -> int:
+        """Get a free or start mask; caller holds the lock"""
+        free_today = ALL_SLOTS & ~self._blocked_mask(kind, resource_id, day)
+        if duration is None:
+            return free_today
+        free_tomorrow = ALL_SLOTS & ~self._blocked_mask(kind, resource_id, day + timedelta(days=1))
+        return start_mask(free_today, free_tomorrow, duration)
+
+    def _blocked_mask(self, kind: str, resource_id: int, day: date) -> int:
+        """Get (building if needed) the busy-slot mask; caller holds the lock"""
+        key = (kind, resource_id, day)
+        mask = self._blocked.get(key)
+        if mask is None:
+            sessions = self._bookings.get((kind, resource_id), [])
+            day_start = datetime.combine(day, time())
+            low = bisect_left(sessions, (day_start - MAX_DURATION,))
+            high = bisect_left(sessions, (day_start + timedelta(days=1),))
+            mask = busy_mask(sessions[low:high], day)
+            self._blocked[key] = mask
+        return mask
+
+    @staticmethod
+    def _days_touched(start: datetime, end: datetime) -> List[date]:
+        first = start.date()
+        last = (end - timedelta(microseconds=1)).date()
+        return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+    def _on_index_change(self, event: str, sessions):
+        """Keep bitmaps in step with the schedule index"""
+        with self._lock:
+            if event == "load":
+                self._bookings.clear()
+                self._blocked.clear()
+                for _, id_fotografer, id_studio, start, end in sessions:
+                    self._bookings.setdefault((FOTOGRAFER, id_fotografer), []).append((start, end))
+                    self._bookings.setdefault((STUDIO, id_studio), []).append((start, end))
+                for bookings in self._bookings.values():
+                    bookings.sort()
+                return
+
+            for _, id_fotografer, id_studio, start, end in sessions:
+                for resource in ((FOTOGRAFER, id_fotografer), (STUDIO, id_studio)):
+                    bookings = self._bookings.setdefault(resource, [])
+                    if event == "add":
+                        insort(bookings, (start, end))
+                    else:
+                        index = bisect_left(bookings, (start, end))
+                        if index < len(bookings) and bookings[index] == (start, end):
+                            del bookings[index]
+                    for day in self._days_touched(start, end):
+                        key = resource + (day,)
+                        if key not in self._blocked:
+                            continue  # Built on demand later
+                        if event == "add":
+                            self._blocked[key] |= booking_bits(
+                                datetime.combine(day, time()), start, end)
+                        else:
+                            # Other bookings may share these bits: rebuild the day
+                            del self._blocked[key]
+
+
+def free_resources(masks: Dict[int, int], when: datetime) -> List[int]:
+    """Get the resources whose free mask has the slot of when set"""
+    slot = slot_of(when)
+    return [resource_id for resource_id, mask in masks.items() if mask >> slot & 1]
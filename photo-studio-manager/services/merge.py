@@ -0,0 +1,41 @@
+"""
+Edit merging for Photo Studio Management System
+Three-way merge of a stale form edit with the row another desk saved meanwhile
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def _normalize(value: Any) -> Any:
+    """Treat NULL and empty text as the same value"""
+    return "" if value is None else value
+
+
+def merge_edits(base: Dict[str, Any], mine: Dict[str, Any], theirs: Dict[str, Any],
+                fields: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """Merge this desk's edit onto the current row
+
+    Args:
+        base: the row as it was when the editor opened
+        mine: the values the editor tried to save
+        theirs: the row as it is now in the database
+        fields: the editable fields to merge
+
+    Returns:
+        (merged row, conflicting fields). The merged row is ``theirs`` with
+        every field this desk changed taken from ``mine``; a field both
+        desks changed to different values keeps this desk's value and is
+        listed as a conflict so the user can review it.
+    """
+    merged = dict(theirs)
+    conflicts = []
+    for field in fields:
+        base_value = _normalize(base.get(field))
+        my_value = _normalize(mine.get(field))
+        their_value = _normalize(theirs.get(field))
+        if my_value == base_value:
+            continue  # Untouched here: keep whatever the other desk saved
+        merged[field] = mine.get(field)
+        if their_value != base_value and their_value != my_value:
+            conflicts.append(field)
+    return merged, conflicts
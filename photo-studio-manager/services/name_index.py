@@ -0,0 +1,383 @@
+"""
+Fuzzy name index for Photo Studio Management System
+In-memory trigram index of client names for typo-tolerant lookup
+"""
+
+import logging
+import re
+import threading
+import time
+import unicodedata
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Pre-1972 Indonesian spellings still common in names, mapped to the
+# current ones so "Soekarno" and "Sukarno" get the same trigrams
+_OLD_SPELLINGS = (("oe", "u"), ("dj", "j"), ("tj", "c"), ("sj", "sy"), ("nj", "ny"), ("ch", "kh"))
+
+_NOT_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+_ONE_BITS = re.compile("1")
+
+logger = logging.getLogger(__name__)
+
+# Lowest similarity returned by default, the pg_trgm default
+DEFAULT_THRESHOLD = 0.3
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name, strip accents and punctuation and modernise old spellings"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    text = _NOT_ALPHANUMERIC.sub(" ", text)
+    for old, new in _OLD_SPELLINGS:
+        text = text.replace(old, new)
+    return " ".join(text.split())
+
+
+def trigrams(name: str) -> Set[str]:
+    """Get the trigrams of a name, each word padded with two spaces before and one after"""
+    grams = set()
+    for word in normalize_name(name).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def set_positions(bits: int) -> List[int]:
+    """Get the positions of the set bits of a large bitset, lowest first"""
+    text = bin(bits)
+    top = len(text) - 1
+    return [top - match.start() for match in reversed(list(_ONE_BITS.finditer(text)))]
+
+
+def build_bitset(positions: Iterable[int], size: int) -> int:
+    """Get the bitset of size bits with the given positions set"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def at_least(planes: List[int], count: int) -> int:
+    """Get the bitset of positions whose bit-sliced counter is at least count (count >= 1)"""
+    if count >= 1 << len(planes):
+        return 0
+    greater, equal = 0, -1
+    for level in reversed(range(len(planes))):
+        if count >> level & 1:
+            equal &= planes[level]
+        else:
+            greater |= equal & planes[level]
+            equal &= ~planes[level]
+    return greater | equal
+
+
+class FuzzyNameIndex:
+    """Trigram bitsets of client names for ranked, typo-tolerant lookup
+
+    Every client gets a position, and every trigram a bitset with the bit of
+    each position whose name contains it, like the slot bitmaps of
+    AvailabilityStore. Clients are ranked by shared / (query trigrams + name
+    trigrams - shared), the similarity pg_trgm uses; one wrong letter costs
+    about three trigrams, so "Siti Nurhalisa" still finds "Siti Nurhaliza".
+
+    A lookup adds the bitsets of the query's trigrams into a bit-sliced
+    counter. Name length and shared count fix the score, so clients are
+    then taken per (length, shared) pair from best score down until limit
+    are found. Common trigrams such as "  s" thus cost a few big-integer
+    operations instead of one step per client. Bitsets of trigrams common
+    at load time are kept, rarer ones are built per lookup from their
+    position sets.
+
+    ``loader(None, None)`` returns every client and ``loader(last_id,
+    settled_at)`` those added after last_id or updated after settled_at,
+    each as (rows of id_klien, nama, database time before which every
+    update has committed). The first load reads every name, best started
+    early with start_loading(); after max_age seconds a lookup fetches only
+    other desks' new and renamed clients. The managers keep the index
+    current for their own writes. The database is read and trigrams are
+    computed without holding the index lock, so lookups and writes never
+    wait for a reload, and writes made meanwhile are replayed afterwards.
+    Clients deleted at another desk stay until a lookup reports them gone.
+    """
+
+    # A trigram bitset is kept when at least 1 / CACHE_RATIO of all clients
+    # have the trigram; rarer ones are cheaper to build than to keep
+    CACHE_RATIO = 100
+
+    def __init__(self, loader: Callable[[Optional[int], Any], Tuple[Iterable[Dict[str, Any]], Any]],
+                 max_age: Optional[float] = 300):
+        """Initialize index with a loader returning (klien rows (id_klien, nama), settled_at)"""
+        self.loader = loader
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._last_id: Optional[int] = None
+        self._settled_at: Any = None
+        # Own writes made while the database is being read, replayed after it
+        self._pending: Optional[List[Tuple[int, Optional[Set[str]]]]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ids: List[Optional[int]] = []
+        self._grams: List[Optional[Set[str]]] = []
+        self._positions: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._by_size: Dict[int, int] = {}
+        self._bitsets: Dict[str, int] = {}
+
+    def start_loading(self):
+        """Load the index on a background thread so the first lookup need not wait"""
+        self._stop.clear()
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.error("Could not load client names: %s", e)
+
+        self._thread = threading.Thread(target=run, name="klien-name-index", daemon=True)
+        self._thread.start()
+
+    def stop_loading(self):
+        """Abandon a background load; called before the database is closed"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def refresh(self):
+        """Load every name if the index is empty, else fetch changes older than max_age
+
+        Only the first load is waited for; while another thread fetches
+        changes, lookups go on with what the index holds.
+        """
+        if self._is_current():
+            return
+        with self._lock:
+            loaded = self._loaded_at is not None
+        if not self._load_lock.acquire(blocking=not loaded):
+            return
+        try:
+            if self._is_current():
+                return
+            with self._lock:
+                full = self._loaded_at is None
+                self._pending = []
+            try:
+                if full:
+                    self._load_all()
+                else:
+                    self._load_changes()
+            finally:
+                with self._lock:
+                    self._pending = None
+        finally:
+            self._load_lock.release()
+
+    def invalidate(self):
+        """Force a full reload from the database on next use"""
+        with self._lock:
+            self._loaded_at = None
+
+    def search(self, text: str, limit: int = 10,
+               threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[int, float]]:
+        """Get up to limit (id_klien, similarity) pairs at or above threshold, best first"""
+        query = trigrams(text)
+        if not query:
+            return []
+        self.refresh()
+        with self._lock:
+            planes: List[int] = []
+            for gram in query:
+                carry = self._bitset(gram)
+                for level in range(len(planes)):
+                    if not carry:
+                        break
+                    planes[level], carry = planes[level] ^ carry, planes[level] & carry
+                if carry:
+                    planes.append(carry)
+
+            # A name of `size` trigrams sharing `shared` with the query scores
+            # shared / (len(query) + size - shared); walk those pairs best
+            # first and stop once limit clients are found
+            pairs = []
+            for size in self._by_size:
+                for shared in range(1, min(len(query), size) + 1):
+                    score = shared / (len(query) + size - shared)
+                    if score >= threshold:
+                        pairs.append((score, size, shared))
+            pairs.sort(reverse=True)
+            exactly: Dict[int, int] = {}
+            results: List[Tuple[int, float]] = []
+            for score, group in groupby(pairs, key=itemgetter(0)):
+                ids = []
+                for _, size, shared in group:
+                    if shared not in exactly:
+                        exactly[shared] = at_least(planes, shared) & ~at_least(planes, shared + 1)
+                    bits = self._by_size[size] & exactly[shared]
+                    if bits:
+                        ids += [self._ids[position] for position in set_positions(bits)]
+                results += [(id_klien, score) for id_klien in sorted(ids)]
+                if len(results) >= limit:
+                    break
+        return results[:limit]
+
+    def upsert(self, id_klien: int, nama: str):
+        """Record a created or renamed client"""
+        self.upsert_many([{'id_klien': id_klien, 'nama': nama}])
+
+    def upsert_many(self, rows: Iterable[Dict[str, Any]]):
+        """Record created or renamed clients (rows of id_klien, nama)"""
+        changes = [(row['id_klien'], trigrams(row['nama'])) for row in rows]
+        with self._lock:
+            if self._pending is not None:
+                self._pending += changes
+            if self._loaded_at is not None:
+                self._apply(changes)
+            # Otherwise the first load reads the committed rows anyway
+
+    def remove(self, id_klien: int):
+        """Forget a deleted client"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((id_klien, None))
+            if self._loaded_at is not None:
+                self._remove(id_klien)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the first load has finished"""
+        with self._lock:
+            return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._positions)
+
+    def _is_current(self) -> bool:
+        with self._lock:
+            return self._loaded_at is not None and (
+                self.max_age is None or time.monotonic() - self._loaded_at < self.max_age)
+
+    def _load_all(self):
+        """Build the index from every client, then swap it in"""
+        rows, settled_at = self.loader(None, None)
+        ids: List[Optional[int]] = []
+        grams_list: List[Optional[Set[str]]] = []
+        positions: Dict[int, int] = {}
+        postings: Dict[str, Set[int]] = {}
+        sizes: Dict[int, List[int]] = {}
+        for position, row in enumerate(rows):
+            if position % 1000 == 0 and self._stop.is_set():
+                return
+            grams = trigrams(row['nama'])
+            ids.append(row['id_klien'])
+            grams_list.append(grams)
+            positions[row['id_klien']] = position
+            sizes.setdefault(len(grams), []).append(position)
+            for gram in grams:
+                postings.setdefault(gram, set()).add(position)
+        by_size = {size: build_bitset(members, len(ids)) for size, members in sizes.items()}
+        bitsets = {gram: build_bitset(members, len(ids)) for gram, members in postings.items()
+                   if len(members) * self.CACHE_RATIO >= len(ids)}
+        with self._lock:
+            self._ids = ids
+            self._grams = grams_list
+            self._positions = positions
+            self._free = []
+            self._postings = postings
+            self._by_size = by_size
+            self._bitsets = bitsets
+            self._last_id = max(positions, default=0)
+            self._settled_at = settled_at
+            self._loaded_at = time.monotonic()
+            self._apply(self._pending)
+
+    def _load_changes(self):
+        """Fetch clients added or renamed since the last fetch"""
+        with self._lock:
+            last_id, settled_at = self._last_id, self._settled_at
+        rows, settled_at = self.loader(last_id, settled_at)
+        changes = [(row['id_klien'], trigrams(row['nama'])) for row in rows]
+        with self._lock:
+            self._apply(changes)
+            self._apply(self._pending)
+            self._last_id = max([last_id] + [id_klien for id_klien, _ in changes])
+            self._settled_at = settled_at
+            self._loaded_at = time.monotonic()
+
+    def _apply(self, changes: List[Tuple[int, Optional[Set[str]]]]):
+        """Record (id_klien, trigrams) changes, None trigrams for a deleted client
+
+        Bits of added names are set once per size and trigram, so a bulk
+        import costs a big-integer operation per trigram, not per client.
+        """
+        by_size: Dict[int, List[int]] = {}
+        by_gram: Dict[str, List[int]] = {}
+        for id_klien, grams in changes:
+            position = self._positions.get(id_klien)
+            if position is not None:
+                if grams is not None and self._grams[position] == grams:
+                    continue
+                # The position may be among the added ones whose bits are not set yet
+                self._set_bits(by_size, by_gram)
+                by_size, by_gram = {}, {}
+                self._remove(id_klien)
+            if grams is not None:
+                position = self._add(id_klien, grams)
+                by_size.setdefault(len(grams), []).append(position)
+                for gram in grams:
+                    if gram in self._bitsets:
+                        by_gram.setdefault(gram, []).append(position)
+        self._set_bits(by_size, by_gram)
+
+    def _bitset(self, gram: str) -> int:
+        """Get the bitset of a trigram, building it when it is not cached"""
+        bits = self._bitsets.get(gram)
+        if bits is not None:
+            return bits
+        positions = self._postings.get(gram)
+        return build_bitset(positions, len(self._ids)) if positions else 0
+
+    def _add(self, id_klien: int, grams: Set[str]) -> int:
+        """Give a client a position and its postings; _set_bits sets its bits"""
+        if self._free:
+            position = self._free.pop()
+            self._ids[position] = id_klien
+            self._grams[position] = grams
+        else:
+            position = len(self._ids)
+            self._ids.append(id_klien)
+            self._grams.append(grams)
+        self._positions[id_klien] = position
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(position)
+        return position
+
+    def _set_bits(self, by_size: Dict[int, List[int]], by_gram: Dict[str, List[int]]):
+        for size, positions in by_size.items():
+            self._by_size[size] = self._by_size.get(size, 0) | build_bitset(positions, len(self._ids))
+        for gram, positions in by_gram.items():
+            self._bitsets[gram] |= build_bitset(positions, len(self._ids))
+
+    def _remove(self, id_klien: int):
+        position = self._positions.pop(id_klien, None)
+        if position is None:
+            return
+        grams = self._grams[position]
+        self._ids[position] = None
+        self._grams[position] = None
+        self._free.append(position)
+        bit = 1 << position
+        self._by_size[len(grams)] &= ~bit
+        for gram in grams:
+            postings = self._postings[gram]
+            postings.discard(position)
+            if not postings:
+                del self._postings[gram]
+            if gram in self._bitsets:
+                self._bitsets[gram] &= ~bit
@@ -0,0 +1,50 @@
+"""
+Phone numbers for Photo Studio Management System
+Normalises free-form nomor_hp text to E.164-style digits for exact lookup
+"""
+
+import re
+from typing import Optional, Tuple
+
+# Country code assumed for numbers written the local way ("0812-...")
+DEFAULT_COUNTRY_CODE = "62"
+
+_NON_DIGITS = re.compile(r"\D")
+_PHONE_TEXT = re.compile(r"^\+?[\d\s().-]+$")
+
+
+def normalize_phone(nomor_hp: str) -> Optional[str]:
+    """Get the E.164 form of a phone number, e.g. "0812-3456 7890" -> "+6281234567890"
+
+    "+62...", "62...", "0062..." (international prefix), "08..." (trunk
+    prefix) and "8..." (mobile number without the 0) all give the same
+    result. Returns None when the text has no digits.
+    """
+    digits = _NON_DIGITS.sub("", nomor_hp or "")
+    if not digits:
+        return None
+    if digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = DEFAULT_COUNTRY_CODE + digits[1:]
+    elif digits.startswith("8"):
+        digits = DEFAULT_COUNTRY_CODE + digits
+    return "+" + digits
+
+
+def looks_like_phone(text: str) -> bool:
+    """Check whether search text is (the start of) a phone number rather than a name"""
+    return bool(_PHONE_TEXT.match(text.strip())) and len(_NON_DIGITS.sub("", text)) >= 3
+
+
+def phone_prefix_range(text: str) -> Optional[Tuple[str, str]]:
+    """Get [low, high) bounds of the normalised numbers starting with the typed digits
+
+    A range instead of LIKE lets both SQLite and MySQL walk the index on
+    the normalised column.
+    """
+    prefix = normalize_phone(text)
+    if prefix is None:
+        return None
+    # Normalised numbers are "+" and digits, and ":" sorts right after "9"
+    return prefix, prefix + ":"
@@ -0,0 +1,71 @@
+"""
+Recurrence rules for Photo Studio Management System
+Expands recurring booking series into individual session times
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+RECURRENCE_FREQUENCIES = ["daily", "weekly", "custom"]
+
+# Upper bound on the occurrences of one series
+MAX_OCCURRENCES = 366
+
+
+def expand_recurrence(start: datetime, frequency: str, count: Optional[int] = None,
+                      until: Optional[datetime] = None, interval: int = 1,
+                      weekdays: Optional[Iterable[int]] = None,
+                      dates: Optional[Iterable[datetime]] = None) -> List[datetime]:
+    """Expand a recurrence rule into sorted occurrence times
+
+    Args:
+        start: first occurrence; its time of day is kept for every occurrence
+        frequency: "daily", "weekly" or "custom"
+        count: number of occurrences to generate
+        until: last allowed occurrence time (inclusive)
+        interval: repeat every N days (daily) or N weeks (weekly)
+        weekdays: for weekly rules, weekdays to book (Monday = 0), default
+            the weekday of start
+        dates: for custom rules, the explicit occurrence times
+
+    Returns:
+        Occurrence times in ascending order, at most MAX_OCCURRENCES
+    """
+    if frequency not in RECURRENCE_FREQUENCIES:
+        raise ValueError(f"Unknown frequency '{frequency}', expected one of {RECURRENCE_FREQUENCIES}")
+    if frequency == "custom":
+        occurrences = sorted(set(dates or []))
+        return occurrences[:min(count or MAX_OCCURRENCES, MAX_OCCURRENCES)]
+
+    if count is None and until is None:
+        raise ValueError("A recurrence needs a count or an until date")
+    if interval < 1:
+        raise ValueError("interval must be at least 1")
+    limit = min(count or MAX_OCCURRENCES, MAX_OCCURRENCES)
+
+    occurrences = []
+    if frequency == "daily":
+        step = timedelta(days=interval)
+        when = start
+        while len(occurrences) < limit and (until is None or when <= until):
+            occurrences.append(when)
+            when += step
+        return occurrences
+
+    # Weekly: walk week by week from the Monday of the first week
+    days = sorted(set(weekdays)) if weekdays else [start.weekday()]
+    if any(day < 0 or day > 6 for day in days):
+        raise ValueError("weekdays must be between 0 (Monday) and 6 (Sunday)")
+    week_start = start - timedelta(days=start.weekday())
+    while len(occurrences) < limit:
+        for day in days:
+            when = week_start + timedelta(days=day)
+            if when < start:
+                continue
+            if until is not None and when > until:
+                return occurrences
+            occurrences.append(when)
+            if len(occurrences) == limit:
+                break
+        week_start += timedelta(weeks=interval)
+    return occurrences
@@ -0,0 +1,217 @@
+"""
+Schedule conflict rules for Photo Studio Management System
+Pure-Python conflict detection shared by the database managers
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from models.database_models import DEFAULT_DURASI_MENIT, MAX_DURASI_MENIT
+
+# Sessions occupy [tanggal_waktu, waktu_selesai); two sessions on the same
+# photographer or studio conflict when start < other_end AND end > other_start
+DEFAULT_DURATION = timedelta(minutes=DEFAULT_DURASI_MENIT)
+
+# No session is longer than this, so only sessions starting up to this long
+# before a range can reach into it
+MAX_DURATION = timedelta(minutes=MAX_DURASI_MENIT)
+
+# Granularity of suggested start times
+FREE_SLOT_STEP = timedelta(minutes=30)
+
+FOTOGRAFER_CONFLICT_MSG = "Fotografer sudah memiliki jadwal pada waktu tersebut"
+STUDIO_CONFLICT_MSG = "Studio sudah digunakan pada waktu tersebut"
+
+Interval = Tuple[datetime, datetime]
+
+
+def to_datetime(value) -> datetime:
+    """Convert a tanggal_waktu value from either backend to a datetime"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def session_bounds(row: Dict[str, Any]) -> Interval:
+    """Get (start, end) of a jadwal row; rows without waktu_selesai use durasi_menit"""
+    start = to_datetime(row['tanggal_waktu'])
+    if row.get('waktu_selesai'):
+        return start, to_datetime(row['waktu_selesai'])
+    return start, start + timedelta(minutes=row.get('durasi_menit') or DEFAULT_DURASI_MENIT)
+
+
+def _overlaps(sorted_sessions: List[Interval], start: datetime, end: datetime) -> bool:
+    """Check whether any session in a start-sorted list overlaps [start, end)"""
+    index = bisect_left(sorted_sessions, (start - MAX_DURATION,))
+    while index < len(sorted_sessions) and sorted_sessions[index][0] < end:
+        if sorted_sessions[index][1] > start:
+            return True
+        index += 1
+    return False
+
+
+def merge_intervals(sessions: Iterable[Interval]) -> List[Interval]:
+    """Merge start-sorted sessions into disjoint busy intervals"""
+    merged: List[Interval] = []
+    for start, end in sessions:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def detect_batch_conflicts(candidates: Iterable[Any],
+                           existing: Iterable[Dict[str, Any]]) -> List[str]:
+    """Find conflicts for a batch of new sessions in one pass per resource
+
+    Args:
+        candidates: Jadwal objects in priority order; an accepted Booked
+            candidate blocks later candidates for the same resources
+        existing: Booked rows (id_fotografer, id_studio, tanggal_waktu,
+            waktu_selesai) already stored in the database
+
+    Returns:
+        One message per candidate, empty when the candidate has no conflict
+    """
+    fotografer_sessions: Dict[int, List[Interval]] = {}
+    studio_sessions: Dict[int, List[Interval]] = {}
+    for row in existing:
+        bounds = session_bounds(row)
+        if row.get('id_fotografer') is not None:
+            fotografer_sessions.setdefault(row['id_fotografer'], []).append(bounds)
+        if row.get('id_studio') is not None:
+            studio_sessions.setdefault(row['id_studio'], []).append(bounds)
+    for sessions in list(fotografer_sessions.values()) + list(studio_sessions.values()):
+        sessions.sort()
+
+    results = []
+    for jadwal in candidates:
+        start = to_datetime(jadwal.tanggal_waktu)
+        end = start + timedelta(minutes=jadwal.durasi_menit)
+        booked_fotografer = fotografer_sessions.setdefault(jadwal.id_fotografer, [])
+        booked_studio = studio_sessions.setdefault(jadwal.id_studio, [])
+
+        if _overlaps(booked_fotografer, start, end):
+            results.append(FOTOGRAFER_CONFLICT_MSG)
+            continue
+        if _overlaps(booked_studio, start, end):
+            results.append(STUDIO_CONFLICT_MSG)
+            continue
+
+        results.append("")
+        if jadwal.status == 'Booked':
+            insort(booked_fotografer, (start, end))
+            insort(booked_studio, (start, end))
+
+    return results
+
+
+def free_slots(booked: Sequence[Interval], start: datetime, end: datetime,
+               duration: timedelta = DEFAULT_DURATION,
+               step: timedelta = FREE_SLOT_STEP) -> List[Interval]:
+    """Find the slots in [start, end) that no booking overlaps
+
+    A slot [t, t + duration) is free when no booked session satisfies
+    b_start < t + duration AND b_end > t, the rule used by the conflict check.
+
+    Args:
+        booked: (start, end) of Booked sessions on the resources, sorted by start
+        start: earliest slot start
+        end: latest slot end
+        duration: length of the wanted session
+        step: distance between candidate start times
+
+    Returns:
+        (slot_start, slot_end) tuples in time order
+    """
+    if step <= timedelta(0):
+        raise ValueError("step must be positive")
+
+    # Disjoint busy intervals are ordered by start and by end, so one
+    # forward pointer passes each of them once
+    busy = merge_intervals(booked)
+    slots = []
+    index = 0
+    when = start
+    while when + duration <= end:
+        while index < len(busy) and busy[index][1] <= when:
+            index += 1
+        if index == len(busy) or busy[index][0] >= when + duration:
+            slots.append((when, when + duration))
+        when += step
+    return slots
+
+
+def detect_series_conflicts(times: Sequence[datetime], duration: timedelta,
+                            fotografer_booked: Sequence[Interval],
+                            studio_booked: Sequence[Interval],
+                            blocks_later: bool = True) -> List[str]:
+    """Find conflicts for a series of sessions on one photographer and studio
+
+    Args:
+        times: sorted occurrence start times of the series
+        duration: length of every occurrence
+        fotografer_booked: (start, end) of the photographer's Booked sessions, sorted
+        studio_booked: (start, end) of the studio's Booked sessions, sorted
+        blocks_later: whether accepted occurrences block later ones (Booked series)
+
+    Returns:
+        One message per occurrence, empty when the occurrence has no conflict
+    """
+    fotografer_busy = merge_intervals(fotografer_booked)
+    studio_busy = merge_intervals(studio_booked)
+    results = []
+    fotografer_index = 0
+    studio_index = 0
+    accepted_until = None
+    for when in times:
+        until = when + duration
+        # One merge pass: both pointers only move forward as the series does
+        while (fotografer_index < len(fotografer_busy)
+               and fotografer_busy[fotografer_index][1] <= when):
+            fotografer_index += 1
+        while studio_index < len(studio_busy) and studio_busy[studio_index][1] <= when:
+            studio_index += 1
+
+        if ((fotografer_index < len(fotografer_busy)
+             and fotografer_busy[fotografer_index][0] < until)
+                or (accepted_until is not None and when < accepted_until)):
+            results.append(FOTOGRAFER_CONFLICT_MSG)
+        elif studio_index < len(studio_busy) and studio_busy[studio_index][0] < until:
+            results.append(STUDIO_CONFLICT_MSG)
+        else:
+            results.append("")
+            if blocks_later:
+                accepted_until = until
+    return results
+
+
+def find_overlapping_pairs(rows: Iterable[Dict[str, Any]],
+                           resource_column: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Find every pair of sessions on the same resource that overlap, in one sweep
+
+    The rows must be sorted by resource_column and then by tanggal_waktu,
+    as an ORDER BY on the (resource, tanggal_waktu) index returns them. The
+    sessions still running at the current start are kept in a heap ordered
+    by end time, so the sweep costs O(n log n) plus the pairs found and rows
+    can be streamed straight from a cursor.
+
+    Yields:
+        (earlier row, later row) for each overlapping pair
+    """
+    active: List[Tuple[datetime, int, Dict[str, Any]]] = []
+    current_resource = None
+    for sequence, row in enumerate(rows):
+        start, end = session_bounds(row)
+        if row[resource_column] != current_resource:
+            active.clear()
+            current_resource = row[resource_column]
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, _, other in sorted(active, key=lambda entry: entry[1]):
+            yield other, row
+        heapq.heappush(active, (end, sequence, row))
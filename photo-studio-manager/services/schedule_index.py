@@ -0,0 +1,175 @@
+"""
+Schedule Index for Photo Studio Management System
+In-memory sorted index of Booked sessions per photographer and per studio
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.schedule_conflicts import (DEFAULT_DURATION, FOTOGRAFER_CONFLICT_MSG, MAX_DURATION,
+                                         STUDIO_CONFLICT_MSG, session_bounds, to_datetime)
+
+# (id_sesi, id_fotografer, id_studio, start, end) as passed to listeners
+Session = Tuple[int, int, int, datetime, datetime]
+
+
+class ScheduleIndex:
+    """Sorted arrays of (start, end, id_sesi) for every photographer and studio
+
+    The index is filled from the database by ``loader`` on first use and
+    reloaded after ``max_age`` seconds, so bookings made by other desks are
+    picked up. The managers keep it current for their own writes. Answers
+    are advisory; create_jadwal/update_jadwal still check the database
+    inside their transaction.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Dict[str, Any]]],
+                 max_age: Optional[float] = 60):
+        """Initialize index with a loader returning Booked jadwal rows"""
+        self.loader = loader
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self._sessions: Dict[int, Tuple[int, int, datetime, datetime]] = {}
+        self._fotografer: Dict[int, List[Tuple[datetime, datetime, int]]] = {}
+        self._studio: Dict[int, List[Tuple[datetime, datetime, int]]] = {}
+        self._listeners: List[Callable[[str, List[Session]], None]] = []
+
+    def add_listener(self, callback: Callable[[str, List[Session]], None]):
+        """Register callback(event, sessions) for index changes
+
+        event is "load" (sessions = every Booked session), "add" or "remove";
+        sessions are (id_sesi, id_fotografer, id_studio, start, end) tuples.
+        Callbacks run with the index lock held and must not call back into
+        the index.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def refresh(self):
+        """Load from the database now if the index is empty or expired"""
+        with self._lock:
+            self._ensure_loaded()
+
+    def invalidate(self):
+        """Force a reload from the database on next use"""
+        with self._lock:
+            self._loaded_at = None
+
+    def find_conflict(self, id_fotografer: int, id_studio: int, tanggal_waktu,
+                      exclude_session: int = None, duration: timedelta = DEFAULT_DURATION) -> str:
+        """Check photographer and studio availability from memory
+
+        Returns the same messages as the database check, empty when free.
+        """
+        start = to_datetime(tanggal_waktu)
+        end = start + duration
+        with self._lock:
+            self._ensure_loaded()
+            if self._busy(self._fotografer.get(id_fotografer), start, end, exclude_session):
+                return FOTOGRAFER_CONFLICT_MSG
+            if self._busy(self._studio.get(id_studio), start, end, exclude_session):
+                return STUDIO_CONFLICT_MSG
+        return ""
+
+    def booked_sessions(self, id_fotografer: Optional[int], id_studio: Optional[int],
+                        start: datetime, end: datetime,
+                        exclude_session: int = None) -> List[Tuple[datetime, datetime]]:
+        """Get (start, end) of Booked sessions on either resource overlapping [start, end)
+
+        Sessions of both resources are merged in start order.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            ranges = []
+            for entries in (self._fotografer.get(id_fotografer) if id_fotografer else None,
+                            self._studio.get(id_studio) if id_studio else None):
+                if entries:
+                    low = bisect_left(entries, (start - MAX_DURATION,))
+                    high = bisect_left(entries, (end,))
+                    ranges.append(entries[low:high])
+        return [(session_start, session_end)
+                for session_start, session_end, id_sesi in heapq.merge(*ranges)
+                if session_end > start and id_sesi != exclude_session]
+
+    def upsert(self, id_sesi: int, id_fotografer: int, id_studio: int,
+               tanggal_waktu, status: str = "Booked", duration: timedelta = DEFAULT_DURATION):
+        """Record a created or updated session; non-Booked sessions are dropped"""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # The next load reads the committed row anyway
+            self._remove(id_sesi)
+            if status == "Booked":
+                start = to_datetime(tanggal_waktu)
+                self._add(id_sesi, id_fotografer, id_studio, start, start + duration)
+
+    def remove(self, id_sesi: int):
+        """Forget a deleted session"""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove(id_sesi)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _ensure_loaded(self):
+        """Load from the database when empty or older than max_age"""
+        if self._loaded_at is not None and (
+                self.max_age is None or time.monotonic() - self._loaded_at < self.max_age):
+            return
+        # The lock is held during the load so writes committed meanwhile
+        # are applied on top of the fresh snapshot, never underneath it
+        rows = list(self.loader())
+        self._sessions.clear()
+        self._fotografer.clear()
+        self._studio.clear()
+        for row in rows:
+            start, end = session_bounds(row)
+            self._sessions[row['id_sesi']] = (row['id_fotografer'], row['id_studio'], start, end)
+            self._fotografer.setdefault(row['id_fotografer'], []).append((start, end, row['id_sesi']))
+            self._studio.setdefault(row['id_studio'], []).append((start, end, row['id_sesi']))
+        for entries in list(self._fotografer.values()) + list(self._studio.values()):
+            entries.sort()
+        self._loaded_at = time.monotonic()
+        self._notify("load", [(id_sesi,) + session for id_sesi, session in self._sessions.items()])
+
+    def _notify(self, event: str, sessions: List[Session]):
+        for callback in self._listeners:
+            callback(event, sessions)
+
+    def _add(self, id_sesi: int, id_fotografer: int, id_studio: int,
+             start: datetime, end: datetime):
+        self._sessions[id_sesi] = (id_fotografer, id_studio, start, end)
+        insort(self._fotografer.setdefault(id_fotografer, []), (start, end, id_sesi))
+        insort(self._studio.setdefault(id_studio, []), (start, end, id_sesi))
+        self._notify("add", [(id_sesi, id_fotografer, id_studio, start, end)])
+
+    def _remove(self, id_sesi: int):
+        session = self._sessions.pop(id_sesi, None)
+        if session is None:
+            return
+        id_fotografer, id_studio, start, end = session
+        for entries in (self._fotografer.get(id_fotografer), self._studio.get(id_studio)):
+            index = bisect_left(entries, (start, end, id_sesi))
+            if index < len(entries) and entries[index] == (start, end, id_sesi):
+                del entries[index]
+        self._notify("remove", [(id_sesi, id_fotografer, id_studio, start, end)])
+
+    @staticmethod
+    def _busy(entries: Optional[List[Tuple[datetime, datetime, int]]], start: datetime,
+              end: datetime, exclude_session: int = None) -> bool:
+        """Check whether a session overlaps [start, end)"""
+        if not entries:
+            return False
+        # Only sessions starting less than MAX_DURATION before start can reach it
+        index = bisect_left(entries, (start - MAX_DURATION,))
+        while index < len(entries) and entries[index][0] < end:
+            if entries[index][1] > start and entries[index][2] != exclude_session:
+                return True
+            index += 1
+        return False
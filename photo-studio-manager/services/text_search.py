@@ -0,0 +1,36 @@
+"""
+Text search for Photo Studio Management System
+Turns search box text into SQLite FTS5 and MySQL boolean-mode full-text queries
+"""
+
+import re
+from typing import List
+
+# Characters with a meaning in FTS5 or MySQL boolean-mode query syntax
+_QUERY_SYNTAX = re.compile(r'[+\-<>()~*"@:^{}\[\],.;\'\\/]')
+
+# Shortest term the MySQL ngram parser indexes (server variable ngram_token_size)
+NGRAM_TOKEN_SIZE = 2
+
+
+def search_words(text: str) -> List[str]:
+    """Split search text into words, dropping query syntax characters"""
+    return _QUERY_SYNTAX.sub(" ", text).split()
+
+
+def fts5_prefix_query(text: str) -> str:
+    """Build an FTS5 query requiring a token that starts with each search word
+
+    "ahm 0812" becomes '"ahm"* "0812"*'; empty when text has no words.
+    """
+    return " ".join(f'"{word}"*' for word in search_words(text))
+
+
+def ngram_boolean_query(text: str) -> str:
+    """Build a MySQL boolean-mode query for a FULLTEXT index WITH PARSER ngram
+
+    Every search word is required. The ngram parser matches a quoted word
+    anywhere in a value; words shorter than one n-gram match as its prefix.
+    """
+    return " ".join(f'+"{word}"' if len(word) >= NGRAM_TOKEN_SIZE else f"+{word}*"
+                    for word in search_words(text))
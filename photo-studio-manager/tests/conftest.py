@@ -0,0 +1,9 @@
+"""
+Test configuration for Photo Studio Management System
+Makes the application packages importable when pytest runs from anywhere
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
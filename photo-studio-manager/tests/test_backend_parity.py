@@ -0,0 +1,70 @@
+"""
+Backend parity tests for Photo Studio Management System
+Runs the parity scenario on a throwaway SQLite file, and on a throwaway
+MySQL schema of the configured server when PHOTO_STUDIO_TEST_MYSQL=1
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmark_database import parity_scenario, scratch_backend
+from database.repository import StudioRepository
+
+MYSQL_ENABLED = os.environ.get("PHOTO_STUDIO_TEST_MYSQL") == "1"
+requires_mysql = pytest.mark.skipif(not MYSQL_ENABLED,
+                                    reason="set PHOTO_STUDIO_TEST_MYSQL=1 to test MySQL")
+
+BACKEND_PARAMS = ["sqlite", pytest.param("mysql", marks=requires_mysql)]
+
+
+def scenario_start():
+    """Three whole hours from now, so two sessions fall within get_upcoming_sessions()"""
+    return datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=3)
+
+
+@pytest.fixture(params=BACKEND_PARAMS)
+def repository(request, tmp_path):
+    with scratch_backend(request.param, str(tmp_path)) as db_manager:
+        yield db_manager
+
+
+def test_implements_repository(repository):
+    assert isinstance(repository, StudioRepository)
+
+
+def test_parity_scenario(repository):
+    base = scenario_start()
+    observed = parity_scenario(repository, "Parity Test", base)
+
+    # Sessions overlapping a Booked one are refused, whatever their own status
+    assert [created for created, _ in observed["create_jadwal"]] == [True, False, False]
+    assert [created for created, _ in observed["create_jadwal_many"]] == [True, False, True, True]
+    assert observed["check_schedule_conflict"] == ["", "", "", ""]
+    assert observed["count_jadwal_between"] == [3, 3]
+    assert observed["search_klien"] == ["Parity Test"]
+
+    sessions = [
+        (base, "Booked"),
+        (base + timedelta(hours=3), "Booked"),
+        (base + timedelta(hours=30), "Booked"),
+        (base + timedelta(hours=24 * 40), "Selesai"),
+    ]
+    assert [(when, status) for when, status, _, _ in observed["get_jadwal_between"]] == sessions
+    assert {(klien, studio) for _, _, klien, studio in observed["get_jadwal_between"]} == {
+        ("Parity Test", "Parity Test")}
+    # Newest first, two per page
+    assert [[(when, status) for when, status, _, _ in page]
+            for page in observed["get_jadwal_page"]] == [sessions[:1:-1], sessions[1::-1]]
+    assert [(when, status) for when, status, _, _ in observed["get_upcoming_sessions"]] == sessions[:2]
+
+
+@requires_mysql
+def test_mysql_matches_sqlite(tmp_path):
+    base = scenario_start()
+    observed = {}
+    for backend in ("sqlite", "mysql"):
+        with scratch_backend(backend, str(tmp_path)) as db_manager:
+            observed[backend] = parity_scenario(db_manager, "Parity Test", base)
+    assert observed["mysql"] == observed["sqlite"]
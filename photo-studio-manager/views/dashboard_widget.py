@@ -271,8 +271,9 @@ class DashboardWidget(QWidget):
     def refresh_stats(self):
         """Refresh dashboard statistics"""
         try:
-            # Get statistics from database
-            stats = self.db_manager.get_dashboard_stats()
+            # Get statistics and recent sessions in one round
+            snapshot = self.db_manager.get_dashboard_snapshot(recent_limit=10)
+            stats = snapshot['stats']
             
             # Update cards
             self.cards['klien'].update_value(stats.get('total_klien', 0))
@@ -283,8 +284,7 @@ class DashboardWidget(QWidget):
             self.cards['batal'].update_value(stats.get('sesi_batal', 0))
             
             # Update recent sessions
-            recent_sessions = self.db_manager.get_all_jadwal_with_details()[:10]  # Get last 10
-            self.recent_table.update_sessions(recent_sessions)
+            self.recent_table.update_sessions(snapshot['recent_sessions'])
             
         except Exception as e:
             print(f"Error refreshing dashboard: {e}")
@@ -6,7 +6,7 @@ Provides CRUD operations for photographer data with modern interface
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
+                            QTableView, QHeaderView, QLabel,
                             QLineEdit, QDialog, QFormLayout, QDialogButtonBox,
                             QMessageBox, QFrame, QSplitter, QGroupBox, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal
@@ -16,11 +16,17 @@ from PyQt5.QtGui import QIcon, QPalette, QColor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.database_models import Fotografer
+from database.repository import StaleDataError
+from services.merge import merge_edits
+from views.table_models import ActionButtonDelegate, ColumnStoreModel
 
 
 class FotograferFormDialog(QDialog):
     """Dialog for adding/editing photographer information"""
     
+    # Editable columns, merged field by field after a stale save
+    FIELDS = ("nama", "spesialisasi", "nomor_hp")
+    
     SPECIALIZATIONS = [
         "Wedding", "Portrait", "Fashion", "Product", "Event", 
         "Corporate", "Family", "Nature", "Street", "Fine Art"
@@ -148,7 +154,8 @@ class FotograferFormDialog(QDialog):
         return Fotografer(
             nama=self.nama_edit.text().strip(),
             spesialisasi=self.spesialisasi_combo.currentText().strip(),
-            nomor_hp=self.hp_edit.text().strip()
+            nomor_hp=self.hp_edit.text().strip(),
+            version=self.fotografer_data.get('version') if self.fotografer_data else None
         )
     
     def validate_input(self):
@@ -173,29 +180,51 @@ class FotograferFormDialog(QDialog):
             super().accept()
 
 
-class FotograferTable(QTableWidget):
-    """Custom table widget for displaying photographers"""
+class FotograferTableModel(ColumnStoreModel):
+    """Fotografer rows for FotograferTable, in the order get_all_fotografer() returns them"""
+    
+    HEADERS = ("ID", "Nama", "Spesialisasi", "Nomor HP", "Aksi")
+    KEY_FIELD = 'id_fotografer'
+    SORT_FIELD = 'nama'
+    ACTION_COLUMN = 4
+    
+    def display(self, row, column, role):
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.value(row, 'id_fotografer') or '')
+            if column == 1:
+                return self.value(row, 'nama') or ''
+            if column == 2:
+                return self.value(row, 'spesialisasi') or ''
+            if column == 3:
+                return self.value(row, 'nomor_hp') or ''
+        return None
+
+
+class FotograferTable(QTableView):
+    """Table view for displaying photographers
+    
+    The Edit and Hapus buttons are painted by a delegate, and single rows
+    can be inserted, updated or removed after a save.
+    """
     
     edit_requested = pyqtSignal(dict)
     delete_requested = pyqtSignal(int)
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.fotografer_model = FotograferTableModel(self)
+        self.setModel(self.fotografer_model)
         self.setup_ui()
     
     def setup_ui(self):
         """Setup table interface"""
-        self.setColumnCount(5)
-        self.setHorizontalHeaderLabels([
-            "ID", "Nama", "Spesialisasi", "Nomor HP", "Aksi"
-        ])
-        
         # Hide ID column
         self.setColumnHidden(0, True)
         
         # Style the table
         self.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #404040;
                 alternate-background-color: #454545;
                 gridline-color: #505050;
@@ -212,89 +241,62 @@ class FotograferTable(QTableWidget):
                 font-weight: bold;
                 font-size: 12px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px 8px;
                 border-bottom: 1px solid #505050;
             }
-            QTableWidget::item:selected {
-                background-color: #4A90E2;
-            }
-            QPushButton {
+            QTableView::item:selected {
                 background-color: #4A90E2;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                margin: 2px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #357ABD;
             }
         """)
         
         # Configure table
         self.setAlternatingRowColors(True)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setEditTriggers(QTableView.NoEditTriggers)
         
-        # Auto-resize columns
+        # Edit and delete buttons, drawn rather than created per row
+        self.action_delegate = ActionButtonDelegate(
+            [("Edit", "#4A90E2"), ("Hapus", "#F44336")], self, margin=4, font_size=11
+        )
+        self.action_delegate.clicked.connect(self.on_action_clicked)
+        self.setItemDelegateForColumn(FotograferTableModel.ACTION_COLUMN, self.action_delegate)
+        
+        # Auto-resize columns, measuring only the rows on screen
         header = self.horizontalHeader()
+        header.setResizeContentsPrecision(0)
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # Name column
         header.setSectionResizeMode(2, QHeaderView.Stretch)  # Specialization
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Phone
         header.setSectionResizeMode(4, QHeaderView.Fixed)  # Actions
         self.setColumnWidth(4, 120)
         
-        # Hide vertical header
-        self.verticalHeader().setVisible(False)
+        # Hide vertical header; fixed row heights keep scrolling independent of row count
+        vertical_header = self.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(34)
     
     def update_data(self, fotografer_list):
         """Update table with photographer data"""
-        self.setRowCount(len(fotografer_list))
-        
-        for row, fotografer in enumerate(fotografer_list):
-            # ID (hidden)
-            self.setItem(row, 0, QTableWidgetItem(str(fotografer.get('id_fotografer', ''))))
-            
-            # Photographer info
-            self.setItem(row, 1, QTableWidgetItem(fotografer.get('nama', '')))
-            self.setItem(row, 2, QTableWidgetItem(fotografer.get('spesialisasi', '')))
-            self.setItem(row, 3, QTableWidgetItem(fotografer.get('nomor_hp', '')))
-            
-            # Action buttons
-            self.setup_action_buttons(row, fotografer)
+        self.fotografer_model.set_rows(fotografer_list)
     
-    def setup_action_buttons(self, row, fotografer_data):
-        """Setup action buttons for each row"""
-        button_frame = QFrame()
-        button_layout = QHBoxLayout(button_frame)
-        button_layout.setContentsMargins(4, 4, 4, 4)
-        button_layout.setSpacing(4)
-        
-        # Edit button
-        edit_btn = QPushButton("Edit")
-        edit_btn.clicked.connect(
-            lambda: self.edit_requested.emit(fotografer_data)
-        )
-        button_layout.addWidget(edit_btn)
-        
-        # Delete button
-        delete_btn = QPushButton("Hapus")
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #F44336;
-            }
-            QPushButton:hover {
-                background-color: #D32F2F;
-            }
-        """)
-        delete_btn.clicked.connect(
-            lambda: self.delete_requested.emit(fotografer_data.get('id_fotografer'))
-        )
-        button_layout.addWidget(delete_btn)
-        
-        self.setCellWidget(row, 4, button_frame)
+    def upsert_row(self, fotografer):
+        """Show the saved state of one photographer"""
+        self.fotografer_model.upsert_row(fotografer)
+    
+    def remove_row(self, id_fotografer):
+        """Remove one photographer from the table"""
+        return self.fotografer_model.remove_row(id_fotografer)
+    
+    def on_action_clicked(self, index, button):
+        """Forward a click on the Edit (0) or Hapus (1) button of a row"""
+        fotografer_data = self.fotografer_model.row_data(index.row())
+        if button == 0:
+            self.edit_requested.emit(fotografer_data)
+        else:
+            self.delete_requested.emit(fotografer_data.get('id_fotografer'))
 
 
 class FotograferWidget(QWidget):
@@ -439,6 +441,22 @@ class FotograferWidget(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal melakukan pencarian: {str(e)}")
     
+    def refresh_fotografer(self, fotografer_id):
+        """Show the saved state of one photographer without reloading the table"""
+        search_text = self.search_edit.text().strip()
+        if search_text:
+            # The saved photographer may have started or stopped matching the search
+            self.on_search(search_text)
+            return
+        try:
+            fotografer = self.db_manager.get_fotografer_by_id(fotografer_id)
+            if fotografer is None:
+                self.table.remove_row(fotografer_id)
+            else:
+                self.table.upsert_row(fotografer)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal memuat data fotografer: {str(e)}")
+    
     def add_fotografer(self):
         """Add new photographer"""
         dialog = FotograferFormDialog(parent=self)
@@ -451,7 +469,7 @@ class FotograferWidget(QWidget):
                     self, "Sukses", 
                     f"Fotografer '{fotografer.nama}' berhasil ditambahkan!"
                 )
-                self.load_data()
+                self.refresh_fotografer(fotografer_id)
                 
             except Exception as e:
                 QMessageBox.critical(
@@ -474,30 +492,42 @@ class FotograferWidget(QWidget):
                         self, "Sukses", 
                         f"Data fotografer '{updated_fotografer.nama}' berhasil diperbarui!"
                     )
-                    self.load_data()
+                    self.refresh_fotografer(fotografer_data['id_fotografer'])
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
                         "Tidak ada perubahan data yang disimpan."
                     )
                     
+            except StaleDataError as e:
+                self.resolve_stale_edit(e, fotografer_data, updated_fotografer)
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", 
                     f"Gagal memperbarui fotografer: {str(e)}"
                 )
     
+    def resolve_stale_edit(self, error, fotografer_data, updated_fotografer):
+        """Re-open the editor on the latest row when another desk saved first"""
+        self.refresh_fotografer(fotografer_data['id_fotografer'])
+        if error.current is None:
+            QMessageBox.warning(self, "Data Berubah", "Data fotografer ini sudah dihapus oleh pengguna lain.")
+            return
+        
+        merged, conflicts = merge_edits(fotografer_data, updated_fotografer.to_dict(), error.current,
+                                        FotograferFormDialog.FIELDS)
+        message = ("Data fotografer ini telah diubah oleh pengguna lain. Formulir dibuka kembali "
+                   "dengan data terbaru, perubahan Anda tetap dipertahankan.")
+        if conflicts:
+            message += f"\n\nPeriksa kolom yang juga diubah pengguna lain: {', '.join(conflicts)}"
+        QMessageBox.warning(self, "Data Berubah", message)
+        self.edit_fotografer(merged)
+    
     def delete_fotografer(self, fotografer_id):
         """Delete photographer"""
         try:
             # Get photographer name for confirmation
-            fotografer_data = None
-            all_fotografer = self.db_manager.get_all_fotografer()
-            for f in all_fotografer:
-                if f.get('id_fotografer') == fotografer_id:
-                    fotografer_data = f
-                    break
-            
+            fotografer_data = self.db_manager.get_fotografer_by_id(fotografer_id)
             if not fotografer_data:
                 QMessageBox.warning(self, "Error", "Fotografer tidak ditemukan!")
                 return
@@ -519,7 +549,7 @@ class FotograferWidget(QWidget):
                         self, "Sukses", 
                         f"Fotografer '{fotografer_data['nama']}' berhasil dihapus!"
                     )
-                    self.load_data()
+                    self.table.remove_row(fotografer_id)
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
@@ -5,29 +5,168 @@ Provides comprehensive scheduling with conflict prevention
 
 import sys
 import os
+import logging
+import time
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
+                            QTableWidget, QTableWidgetItem, QTableView, QHeaderView, QLabel,
                             QLineEdit, QDialog, QFormLayout, QDialogButtonBox,
                             QMessageBox, QFrame, QSplitter, QGroupBox, QComboBox,
-                            QDateTimeEdit, QTextEdit, QTabWidget)
-from PyQt5.QtCore import Qt, pyqtSignal, QDateTime
+                            QDateTimeEdit, QTextEdit, QTabWidget, QSpinBox, QDateEdit, QCompleter)
+from PyQt5.QtCore import Qt, pyqtSignal, QDate, QDateTime, QThread, QTimer, QStringListModel
 from PyQt5.QtGui import QIcon, QPalette, QColor, QFont
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models.database_models import Jadwal, PAKET_JENIS
+from models.database_models import Jadwal, PAKET_JENIS, MAX_DURASI_MENIT, default_durasi_menit
+from services.recurrence import expand_recurrence
+from services.availability import free_resources, slot_time
+from services.schedule_conflicts import STUDIO_CONFLICT_MSG, to_datetime
+from services.merge import merge_edits
+from database.repository import StaleDataError
+from views.table_models import ActionButtonDelegate, ColumnStoreModel, FilterProxyModel
+
+logger = logging.getLogger(__name__)
+
+
+class ConflictCheckThread(QThread):
+    """Thread for checking schedule conflicts without blocking the dialog"""
+    
+    result_ready = pyqtSignal(int, str, list, list)
+    
+    def __init__(self, db_manager, sequence, fotografer_id, studio_id, selected_datetime,
+                 exclude_session, durasi_menit, slot_count, slot_search_days, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.sequence = sequence
+        self.fotografer_id = fotografer_id
+        self.studio_id = studio_id
+        self.selected_datetime = selected_datetime
+        self.exclude_session = exclude_session
+        self.durasi_menit = durasi_menit
+        self.slot_count = slot_count
+        self.slot_search_days = slot_search_days
+    
+    def run(self):
+        self.result_ready.emit(self.sequence, *self.check())
+    
+    def check(self):
+        """Get (conflict message, nearest free slots, free studio ids) for the selection"""
+        try:
+            conflict_msg = self.db_manager.check_schedule_conflict(
+                self.fotografer_id, self.studio_id, self.selected_datetime, self.exclude_session,
+                self.durasi_menit
+            )
+        except Exception as e:
+            print(f"Error checking conflicts: {e}")
+            return "", [], []
+        if not conflict_msg:
+            return conflict_msg, [], []
+        studios = self.find_free_studios() if conflict_msg == STUDIO_CONFLICT_MSG else []
+        return conflict_msg, self.find_nearest_slots(), studios
+    
+    def find_nearest_slots(self):
+        """Find the free slots closest to the selected time"""
+        earliest = max(datetime.now(), self.selected_datetime - timedelta(days=1))
+        try:
+            slots = self.db_manager.find_free_slots(
+                self.fotografer_id, self.studio_id,
+                start=earliest.replace(minute=(earliest.minute // 30) * 30, second=0, microsecond=0),
+                end=self.selected_datetime + timedelta(days=self.slot_search_days),
+                duration=timedelta(minutes=self.durasi_menit),
+                exclude_session=self.exclude_session
+            )
+        except Exception as e:
+            print(f"Error finding free slots: {e}")
+            return []
+        
+        nearest = sorted(slots, key=lambda slot: abs(slot[0] - self.selected_datetime))
+        return sorted(nearest[:self.slot_count])
+    
+    def find_free_studios(self):
+        """Find other studios free at the selected time, from the availability bitmaps"""
+        try:
+            masks = self.db_manager.get_day_availability(
+                self.selected_datetime.date(), "studio",
+                duration=timedelta(minutes=self.durasi_menit))
+            # Bitmaps are per 15-minute slot; confirm candidates for the exact time
+            return [id_studio for id_studio in free_resources(masks, self.selected_datetime)
+                    if id_studio != self.studio_id and not self.db_manager.check_schedule_conflict(
+                        self.fotografer_id, id_studio, self.selected_datetime,
+                        self.exclude_session, self.durasi_menit)
+                    ][:self.slot_count]
+        except Exception as e:
+            print(f"Error finding free studios: {e}")
+            return []
+
+
+class KlienSuggestionThread(QThread):
+    """Thread looking up clients for the text typed into the client combo
+    
+    Clients whose name or phone matches come first; when there are fewer
+    than limit, clients with a similar name fill up the list, so a
+    misspelt name still offers the existing client.
+    """
+    
+    result_ready = pyqtSignal(int, list)  # sequence, klien rows
+    
+    def __init__(self, db_manager, sequence, search_term, limit, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.sequence = sequence
+        self.search_term = search_term
+        self.limit = limit
+    
+    def run(self):
+        try:
+            results = self.db_manager.search_klien(self.search_term, self.limit)
+            if len(results) < self.limit:
+                found = {klien['id_klien'] for klien in results}
+                similar = self.db_manager.fuzzy_search_klien(self.search_term, self.limit)
+                results += [klien for klien in similar if klien['id_klien'] not in found]
+        except Exception as e:
+            print(f"Error searching clients: {e}")
+            results = []
+        self.result_ready.emit(self.sequence, results[:self.limit])
 
 
 class JadwalFormDialog(QDialog):
     """Dialog for adding/editing schedule information"""
     
+    SLOT_SUGGESTION_COUNT = 3
+    SLOT_SEARCH_DAYS = 7
+    RECURRENCE_OPTIONS = [("Tidak berulang", None), ("Harian", "daily"), ("Mingguan", "weekly")]
+    CONFLICT_CHECK_DELAY_MS = 250
+    KLIEN_SUGGESTION_COUNT = 10
+    KLIEN_SUGGESTION_DELAY_MS = 200
+    # Editable columns, merged field by field after a stale save
+    FIELDS = ("id_klien", "id_fotografer", "id_studio", "tanggal_waktu",
+              "jenis_paket", "durasi_menit", "status", "catatan")
+    
     def __init__(self, jadwal_data=None, db_manager=None, parent=None):
         super().__init__(parent)
         self.jadwal_data = jadwal_data
         self.db_manager = db_manager
         self.is_edit_mode = jadwal_data is not None
+        
+        # Debounced conflict checking: only the latest request may update the label
+        self.conflict_sequence = 0
+        self.conflict_requested_at = {}
+        self.conflict_threads = []
+        self.conflict_timer = QTimer(self)
+        self.conflict_timer.setSingleShot(True)
+        self.conflict_timer.setInterval(self.CONFLICT_CHECK_DELAY_MS)
+        self.conflict_timer.timeout.connect(self.start_conflict_check)
+        
+        # Debounced client suggestions for the text typed into the client combo
+        self.klien_sequence = 0
+        self.klien_threads = []
+        self.klien_suggestions = {}
+        self.klien_timer = QTimer(self)
+        self.klien_timer.setSingleShot(True)
+        self.klien_timer.setInterval(self.KLIEN_SUGGESTION_DELAY_MS)
+        self.klien_timer.timeout.connect(self.start_klien_suggestion)
         self.setup_ui()
         
         if self.is_edit_mode:
@@ -37,7 +176,7 @@ class JadwalFormDialog(QDialog):
         """Setup dialog user interface"""
         self.setWindowTitle("Edit Jadwal" if self.is_edit_mode else "Tambah Jadwal Sesi")
         self.setModal(True)
-        self.setFixedSize(500, 550)
+        self.setFixedSize(500, 780)
         
         # Apply dark theme
         self.setStyleSheet("""
@@ -49,7 +188,7 @@ class JadwalFormDialog(QDialog):
                 color: #FFFFFF;
                 font-size: 12px;
             }
-            QLineEdit, QComboBox, QDateTimeEdit, QTextEdit {
+            QLineEdit, QComboBox, QDateTimeEdit, QTextEdit, QSpinBox {
                 background-color: #404040;
                 color: #FFFFFF;
                 border: 2px solid #505050;
@@ -57,7 +196,7 @@ class JadwalFormDialog(QDialog):
                 padding: 8px;
                 font-size: 12px;
             }
-            QLineEdit:focus, QComboBox:focus, QDateTimeEdit:focus, QTextEdit:focus {
+            QLineEdit:focus, QComboBox:focus, QDateTimeEdit:focus, QTextEdit:focus, QSpinBox:focus {
                 border-color: #4A90E2;
             }
             QComboBox::drop-down {
@@ -107,9 +246,18 @@ class JadwalFormDialog(QDialog):
         form_layout = QFormLayout()
         form_layout.setSpacing(12)
         
-        # Client selection
+        # Client selection; typing a name or phone number offers matching clients
         self.klien_combo = QComboBox()
+        self.klien_combo.setEditable(True)
+        self.klien_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.klien_combo.lineEdit().setPlaceholderText("Ketik nama atau nomor HP klien")
         self.load_klien_options()
+        self.klien_combo.setCurrentIndex(-1)
+        self.klien_completer = QCompleter(QStringListModel(self), self)
+        self.klien_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.klien_completer.activated[str].connect(self.use_suggested_klien)
+        self.klien_combo.lineEdit().setCompleter(self.klien_completer)
+        self.klien_combo.lineEdit().textEdited.connect(self.schedule_klien_suggestion)
         form_layout.addRow("Klien:", self.klien_combo)
         
         # Photographer selection
@@ -129,11 +277,52 @@ class JadwalFormDialog(QDialog):
         self.datetime_edit.setCalendarPopup(True)
         form_layout.addRow("Tanggal & Waktu:", self.datetime_edit)
         
+        # Recurrence (new sessions only)
+        if not self.is_edit_mode:
+            recurrence_layout = QHBoxLayout()
+            self.repeat_combo = QComboBox()
+            for label, frequency in self.RECURRENCE_OPTIONS:
+                self.repeat_combo.addItem(label, frequency)
+            self.repeat_count_spin = QSpinBox()
+            self.repeat_count_spin.setRange(2, 52)
+            self.repeat_count_spin.setValue(4)
+            self.repeat_count_spin.setSuffix(" kali")
+            self.repeat_count_spin.setEnabled(False)
+            self.repeat_combo.currentIndexChanged.connect(
+                lambda: self.repeat_count_spin.setEnabled(self.repeat_combo.currentData() is not None)
+            )
+            recurrence_layout.addWidget(self.repeat_combo)
+            recurrence_layout.addWidget(self.repeat_count_spin)
+            form_layout.addRow("Ulangi:", recurrence_layout)
+        
         # Package type
         self.paket_combo = QComboBox()
         self.paket_combo.addItems(PAKET_JENIS)
         form_layout.addRow("Jenis Paket:", self.paket_combo)
         
+        # Session length, defaulting to the package's usual duration
+        self.durasi_spin = QSpinBox()
+        self.durasi_spin.setRange(15, MAX_DURASI_MENIT)
+        self.durasi_spin.setSingleStep(15)
+        self.durasi_spin.setSuffix(" menit")
+        self.durasi_spin.setValue(default_durasi_menit(self.paket_combo.currentText()))
+        self.paket_combo.currentTextChanged.connect(
+            lambda paket: self.durasi_spin.setValue(default_durasi_menit(paket))
+        )
+        form_layout.addRow("Durasi:", self.durasi_spin)
+        
+        # Group size, used to pick a photographer and studio automatically
+        assign_layout = QHBoxLayout()
+        self.jumlah_orang_spin = QSpinBox()
+        self.jumlah_orang_spin.setRange(1, 500)
+        self.jumlah_orang_spin.setSuffix(" org")
+        self.auto_assign_btn = QPushButton("Pilih Otomatis")
+        self.auto_assign_btn.setCursor(Qt.PointingHandCursor)
+        self.auto_assign_btn.clicked.connect(self.auto_assign)
+        assign_layout.addWidget(self.jumlah_orang_spin)
+        assign_layout.addWidget(self.auto_assign_btn)
+        form_layout.addRow("Jumlah Orang:", assign_layout)
+        
         # Status
         self.status_combo = QComboBox()
         self.status_combo.addItems(["Booked", "Selesai", "Batal"])
@@ -160,6 +349,38 @@ class JadwalFormDialog(QDialog):
         self.conflict_label.hide()
         layout.addWidget(self.conflict_label)
         
+        # Nearest free slots, offered while a conflict is shown
+        self.slot_suggestions = QWidget()
+        self.slot_layout = QHBoxLayout(self.slot_suggestions)
+        self.slot_layout.setContentsMargins(0, 0, 0, 0)
+        self.slot_layout.addWidget(QLabel("Waktu tersedia:"))
+        self.slot_buttons = []
+        for _ in range(self.SLOT_SUGGESTION_COUNT):
+            button = QPushButton()
+            button.setCursor(Qt.PointingHandCursor)
+            button.clicked.connect(self.use_suggested_slot)
+            self.slot_layout.addWidget(button)
+            self.slot_buttons.append(button)
+        self.slot_layout.addStretch()
+        self.slot_suggestions.hide()
+        layout.addWidget(self.slot_suggestions)
+        
+        # Other studios free at the selected time, offered on a studio conflict
+        self.studio_suggestions = QWidget()
+        studio_layout = QHBoxLayout(self.studio_suggestions)
+        studio_layout.setContentsMargins(0, 0, 0, 0)
+        studio_layout.addWidget(QLabel("Studio kosong:"))
+        self.studio_buttons = []
+        for _ in range(self.SLOT_SUGGESTION_COUNT):
+            button = QPushButton()
+            button.setCursor(Qt.PointingHandCursor)
+            button.clicked.connect(self.use_suggested_studio)
+            studio_layout.addWidget(button)
+            self.studio_buttons.append(button)
+        studio_layout.addStretch()
+        self.studio_suggestions.hide()
+        layout.addWidget(self.studio_suggestions)
+        
         # Dialog buttons
         button_box = QDialogButtonBox(
             QDialogButtonBox.Save | QDialogButtonBox.Cancel
@@ -169,9 +390,10 @@ class JadwalFormDialog(QDialog):
         layout.addWidget(button_box)
         
         # Connect signals for conflict checking
-        self.datetime_edit.dateTimeChanged.connect(self.check_conflicts)
-        self.fotografer_combo.currentIndexChanged.connect(self.check_conflicts)
-        self.studio_combo.currentIndexChanged.connect(self.check_conflicts)
+        self.datetime_edit.dateTimeChanged.connect(self.schedule_conflict_check)
+        self.fotografer_combo.currentIndexChanged.connect(self.schedule_conflict_check)
+        self.studio_combo.currentIndexChanged.connect(self.schedule_conflict_check)
+        self.durasi_spin.valueChanged.connect(self.schedule_conflict_check)
     
     def load_klien_options(self):
         """Load client options into combo box"""
@@ -180,11 +402,57 @@ class JadwalFormDialog(QDialog):
             self.klien_combo.clear()
             self.klien_combo.addItem("-- Pilih Klien --", None)
             for klien in klien_list:
-                display_text = f"{klien['nama']} ({klien['nomor_hp']})"
-                self.klien_combo.addItem(display_text, klien['id_klien'])
+                self.klien_combo.addItem(self.klien_display_text(klien), klien['id_klien'])
         except Exception as e:
             print(f"Error loading clients: {e}")
     
+    @staticmethod
+    def klien_display_text(klien):
+        """Get the combo text of a client"""
+        return f"{klien['nama']} ({klien['nomor_hp']})"
+    
+    def schedule_klien_suggestion(self, text):
+        """Restart the debounce timer; suggestions are looked up once typing pauses"""
+        # Any answer still in flight is for outdated text
+        self.klien_sequence += 1
+        if len(text.strip()) >= 2:
+            self.klien_timer.start()
+        else:
+            self.klien_timer.stop()
+    
+    def start_klien_suggestion(self):
+        """Look up clients for the typed text on a worker thread"""
+        self.klien_sequence += 1
+        thread = KlienSuggestionThread(self.db_manager, self.klien_sequence,
+                                       self.klien_combo.lineEdit().text().strip(),
+                                       self.KLIEN_SUGGESTION_COUNT, parent=self)
+        thread.result_ready.connect(self.on_klien_suggestions)
+        thread.finished.connect(lambda: self.forget_klien_thread(thread))
+        self.klien_threads.append(thread)
+        thread.start()
+    
+    def forget_klien_thread(self, thread):
+        """Release a finished worker thread"""
+        if thread in self.klien_threads:
+            self.klien_threads.remove(thread)
+        thread.deleteLater()
+    
+    def on_klien_suggestions(self, sequence, results):
+        """Show client suggestions unless newer text superseded them"""
+        if sequence != self.klien_sequence or not self.klien_combo.lineEdit().hasFocus():
+            return
+        self.klien_suggestions = {self.klien_display_text(klien): klien['id_klien']
+                                  for klien in results}
+        self.klien_completer.model().setStringList(list(self.klien_suggestions))
+        if results:
+            self.klien_completer.complete()
+    
+    def use_suggested_klien(self, text):
+        """Select the client picked from the suggestions"""
+        index = self.klien_combo.findData(self.klien_suggestions.get(text))
+        if index >= 0:
+            self.klien_combo.setCurrentIndex(index)
+    
     def load_fotografer_options(self):
         """Load photographer options into combo box"""
         try:
@@ -209,29 +477,149 @@ class JadwalFormDialog(QDialog):
         except Exception as e:
             print(f"Error loading studios: {e}")
     
-    def check_conflicts(self):
-        """Check for scheduling conflicts"""
-        if not self.db_manager:
-            return
-            
+    def conflict_check_args(self):
+        """Get (fotografer, studio, datetime, exclude_session, durasi_menit), or None if incomplete"""
         fotografer_id = self.fotografer_combo.currentData()
         studio_id = self.studio_combo.currentData()
+        if not (self.db_manager and fotografer_id and studio_id):
+            return None
         
-        if fotografer_id and studio_id:
-            selected_datetime = self.datetime_edit.dateTime().toPyDateTime()
-            exclude_session = None
-            if self.is_edit_mode and self.jadwal_data:
-                exclude_session = self.jadwal_data.get('id_sesi')
-            
-            conflict_msg = self.db_manager.check_schedule_conflict(
-                fotografer_id, studio_id, selected_datetime, exclude_session
+        exclude_session = None
+        if self.is_edit_mode and self.jadwal_data:
+            exclude_session = self.jadwal_data.get('id_sesi')
+        return (fotografer_id, studio_id, self.datetime_edit.dateTime().toPyDateTime(),
+                exclude_session, self.durasi_spin.value())
+    
+    def schedule_conflict_check(self):
+        """Restart the debounce timer; the check runs once the selection settles"""
+        # Any answer still in flight is for an outdated selection
+        self.conflict_sequence += 1
+        self.conflict_timer.start()
+    
+    def start_conflict_check(self):
+        """Run the conflict check for the current selection on a worker thread"""
+        args = self.conflict_check_args()
+        if args is None:
+            self.show_conflict("", [], [])
+            return
+        
+        self.conflict_sequence += 1
+        sequence = self.conflict_sequence
+        self.conflict_requested_at[sequence] = time.perf_counter()
+        thread = ConflictCheckThread(self.db_manager, sequence, *args,
+                                     self.SLOT_SUGGESTION_COUNT, self.SLOT_SEARCH_DAYS, parent=self)
+        thread.result_ready.connect(self.on_conflict_result)
+        thread.finished.connect(lambda: self.forget_conflict_thread(thread))
+        self.conflict_threads.append(thread)
+        thread.start()
+    
+    def forget_conflict_thread(self, thread):
+        """Release a finished worker thread"""
+        if thread in self.conflict_threads:
+            self.conflict_threads.remove(thread)
+        thread.deleteLater()
+    
+    def on_conflict_result(self, sequence, conflict_msg, slots, studios):
+        """Apply a conflict answer unless a newer selection superseded it"""
+        requested_at = self.conflict_requested_at.pop(sequence, None)
+        latency_ms = (time.perf_counter() - requested_at) * 1000 if requested_at else 0.0
+        if sequence != self.conflict_sequence:
+            logger.info("Conflict check #%d discarded as stale after %.1f ms", sequence, latency_ms)
+            return
+        logger.info("Conflict check #%d answered in %.1f ms", sequence, latency_ms)
+        self.show_conflict(conflict_msg, slots, studios)
+    
+    def check_conflicts(self):
+        """Check for scheduling conflicts synchronously (used before saving)"""
+        self.conflict_timer.stop()
+        self.conflict_sequence += 1
+        args = self.conflict_check_args()
+        if args is None:
+            self.show_conflict("", [], [])
+            return
+        
+        started = time.perf_counter()
+        worker = ConflictCheckThread(self.db_manager, self.conflict_sequence, *args,
+                                     self.SLOT_SUGGESTION_COUNT, self.SLOT_SEARCH_DAYS)
+        self.show_conflict(*worker.check())
+        logger.info("Conflict check before save answered in %.1f ms",
+                    (time.perf_counter() - started) * 1000)
+    
+    def show_conflict(self, conflict_msg, slots, studios):
+        """Show or hide the conflict warning, the nearest free slots and free studios"""
+        if conflict_msg:
+            self.conflict_label.setText(f"⚠️ KONFLIK: {conflict_msg}")
+            self.conflict_label.show()
+            self.show_free_slots(slots)
+            self.show_free_studios(studios)
+        else:
+            self.conflict_label.hide()
+            self.slot_suggestions.hide()
+            self.studio_suggestions.hide()
+    
+    def show_free_slots(self, slots):
+        """Offer the free slots closest to the selected time"""
+        for button, slot in zip(self.slot_buttons, slots + [None] * len(self.slot_buttons)):
+            button.setVisible(slot is not None)
+            if slot is not None:
+                button.setText(slot[0].strftime("%d/%m %H:%M"))
+                button.setProperty("slot_start", QDateTime(slot[0]))
+        self.slot_suggestions.setVisible(bool(slots))
+    
+    def show_free_studios(self, studios):
+        """Offer other studios that are free at the selected time"""
+        for button, id_studio in zip(self.studio_buttons, studios + [None] * len(self.studio_buttons)):
+            index = self.studio_combo.findData(id_studio) if id_studio is not None else -1
+            button.setVisible(index >= 0)
+            if index >= 0:
+                button.setText(self.studio_combo.itemText(index).split(" - ")[0])
+                button.setProperty("studio_index", index)
+        self.studio_suggestions.setVisible(bool(studios))
+    
+    def done(self, result):
+        """Wait for running conflict checks and client lookups before the dialog goes away"""
+        self.conflict_timer.stop()
+        self.conflict_sequence += 1
+        self.klien_timer.stop()
+        self.klien_sequence += 1
+        for thread in list(self.conflict_threads) + list(self.klien_threads):
+            thread.wait()
+        super().done(result)
+    
+    def use_suggested_slot(self):
+        """Move the session to the clicked free slot"""
+        slot_start = self.sender().property("slot_start")
+        if slot_start is not None:
+            self.datetime_edit.setDateTime(slot_start)
+    
+    def use_suggested_studio(self):
+        """Switch the session to the clicked free studio"""
+        index = self.sender().property("studio_index")
+        if index is not None:
+            self.studio_combo.setCurrentIndex(index)
+    
+    def auto_assign(self):
+        """Pick a photographer matching the package and the smallest free studio for the group"""
+        try:
+            assignment = self.db_manager.assign_jadwal_requests([{
+                'tanggal_waktu': self.datetime_edit.dateTime().toPyDateTime(),
+                'jenis_paket': self.paket_combo.currentText(),
+                'jumlah_orang': self.jumlah_orang_spin.value(),
+                'durasi_menit': self.durasi_spin.value(),
+            }])[0]
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal memilih otomatis: {str(e)}")
+            return
+        if assignment is None:
+            QMessageBox.information(
+                self, "Tidak Tersedia",
+                "Tidak ada fotografer dan studio yang cocok dan kosong pada waktu tersebut."
             )
-            
-            if conflict_msg:
-                self.conflict_label.setText(f"⚠️ KONFLIK: {conflict_msg}")
-                self.conflict_label.show()
-            else:
-                self.conflict_label.hide()
+            return
+        
+        fotografer_id, studio_id = assignment
+        self.fotografer_combo.setCurrentIndex(self.fotografer_combo.findData(fotografer_id))
+        self.studio_combo.setCurrentIndex(self.studio_combo.findData(studio_id))
     
     def populate_fields(self):
         """Populate form fields with existing data"""
@@ -275,6 +663,11 @@ class JadwalFormDialog(QDialog):
             if index >= 0:
                 self.paket_combo.setCurrentIndex(index)
             
+            # Set duration (after the package, which resets it to the default)
+            durasi_menit = self.jadwal_data.get('durasi_menit')
+            if durasi_menit:
+                self.durasi_spin.setValue(durasi_menit)
+            
             # Set status
             status = self.jadwal_data.get('status', 'Booked')
             index = self.status_combo.findText(status)
@@ -293,12 +686,26 @@ class JadwalFormDialog(QDialog):
             tanggal_waktu=self.datetime_edit.dateTime().toPyDateTime(),
             jenis_paket=self.paket_combo.currentText(),
             status=self.status_combo.currentText(),
-            catatan=self.catatan_edit.toPlainText().strip()
+            catatan=self.catatan_edit.toPlainText().strip(),
+            durasi_menit=self.durasi_spin.value(),
+            version=self.jadwal_data.get('version') if self.jadwal_data else None
+        )
+    
+    def get_recurrence(self):
+        """Get the occurrence times of a recurring booking, or None for a single session"""
+        if self.is_edit_mode or self.repeat_combo.currentData() is None:
+            return None
+        return expand_recurrence(
+            self.datetime_edit.dateTime().toPyDateTime(),
+            self.repeat_combo.currentData(),
+            count=self.repeat_count_spin.value()
         )
     
     def validate_input(self):
         """Validate form input"""
-        if not self.klien_combo.currentData():
+        # Typed text that was never turned into a selection does not count
+        if (not self.klien_combo.currentData() or self.klien_combo.currentText()
+                != self.klien_combo.itemText(self.klien_combo.currentIndex())):
             QMessageBox.warning(self, "Validasi", "Klien harus dipilih!")
             return False
         
@@ -319,6 +726,7 @@ class JadwalFormDialog(QDialog):
             return False
         
         # Check for conflicts one more time
+        self.check_conflicts()
         if self.conflict_label.isVisible():
             reply = QMessageBox.question(
                 self, "Konflik Jadwal",
@@ -337,30 +745,91 @@ class JadwalFormDialog(QDialog):
             super().accept()
 
 
-class JadwalTable(QTableWidget):
-    """Custom table widget for displaying schedules"""
+class JadwalTableModel(ColumnStoreModel):
+    """Schedule rows for JadwalTable, formatted only when a row is drawn"""
+    
+    HEADERS = ("ID", "Tanggal/Waktu", "Klien", "Fotografer", "Studio",
+               "Paket", "Status", "Catatan", "Aksi")
+    SHARED_FIELDS = ("nama_klien", "nama_fotografer", "nama_studio", "lokasi",
+                     "jenis_paket", "status")
+    KEY_FIELD = 'id_sesi'
+    SORT_FIELD = 'tanggal_waktu'
+    SORT_DESCENDING = True  # Newest first, as get_all_jadwal_with_details() returns them
+    SEARCH_FIELDS = ("nama_klien", "nama_fotografer", "nama_studio", "lokasi", "jenis_paket")
+    ACTION_COLUMN = 8
+    STATUS_COLORS = {
+        'Booked': QColor('#4CAF50'),   # Green
+        'Selesai': QColor('#2196F3'),  # Blue
+        'Batal': QColor('#F44336'),    # Red
+    }
+    
+    def display(self, row, column, role):
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.value(row, 'id_sesi') or '')
+            if column == 1:
+                return self.format_tanggal(self.value(row, 'tanggal_waktu'))
+            if column == 2:
+                return self.value(row, 'nama_klien') or ''
+            if column == 3:
+                return self.value(row, 'nama_fotografer') or ''
+            if column == 4:
+                # Studio with location
+                return f"{self.value(row, 'nama_studio') or ''} - {self.value(row, 'lokasi') or ''}"
+            if column == 5:
+                return self.value(row, 'jenis_paket') or ''
+            if column == 6:
+                return self.value(row, 'status') or ''
+            if column == 7:
+                # Notes (truncated)
+                catatan = self.value(row, 'catatan') or ''
+                return catatan[:50] + '...' if len(catatan) > 50 else catatan
+        elif column == 6:
+            # Status with color coding
+            if role == Qt.BackgroundRole:
+                return self.STATUS_COLORS.get(self.value(row, 'status'))
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+        return None
+    
+    @staticmethod
+    def format_tanggal(tanggal_waktu):
+        """Format a tanggal_waktu value from either backend for display"""
+        if not tanggal_waktu:
+            return ''
+        try:
+            return to_datetime(tanggal_waktu).strftime('%d/%m/%Y %H:%M')
+        except ValueError:
+            return str(tanggal_waktu)
+
+
+class JadwalTable(QTableView):
+    """Table view for displaying schedules
+    
+    Rows live in a JadwalTableModel and only visible rows are drawn; the
+    Edit and Hapus buttons are painted by a delegate. Single rows can be
+    inserted, updated or removed after a save, and set_filter() narrows
+    the loaded rows without going back to the database.
+    """
     
     edit_requested = pyqtSignal(dict)
     delete_requested = pyqtSignal(int)
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.jadwal_model = JadwalTableModel(self)
+        self.filter_model = FilterProxyModel(self.jadwal_model, self)
+        self.setModel(self.filter_model)
         self.setup_ui()
     
     def setup_ui(self):
         """Setup table interface"""
-        self.setColumnCount(9)
-        self.setHorizontalHeaderLabels([
-            "ID", "Tanggal/Waktu", "Klien", "Fotografer", "Studio", 
-            "Paket", "Status", "Catatan", "Aksi"
-        ])
-        
         # Hide ID column
         self.setColumnHidden(0, True)
         
         # Style the table
         self.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #404040;
                 alternate-background-color: #454545;
                 gridline-color: #505050;
@@ -377,34 +846,31 @@ class JadwalTable(QTableWidget):
                 font-weight: bold;
                 font-size: 12px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #505050;
             }
-            QTableWidget::item:selected {
-                background-color: #4A90E2;
-            }
-            QPushButton {
+            QTableView::item:selected {
                 background-color: #4A90E2;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 4px 8px;
-                margin: 1px;
-                font-size: 10px;
-            }
-            QPushButton:hover {
-                background-color: #357ABD;
             }
         """)
         
         # Configure table
         self.setAlternatingRowColors(True)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setEditTriggers(QTableView.NoEditTriggers)
+        
+        # Edit and delete buttons, drawn rather than created per row
+        self.action_delegate = ActionButtonDelegate(
+            [("Edit", "#4A90E2"), ("Hapus", "#F44336")], self
+        )
+        self.action_delegate.clicked.connect(self.on_action_clicked)
+        self.setItemDelegateForColumn(JadwalTableModel.ACTION_COLUMN, self.action_delegate)
         
-        # Auto-resize columns
+        # Auto-resize columns, measuring only the rows on screen
         header = self.horizontalHeader()
+        header.setResizeContentsPrecision(0)
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # DateTime
         header.setSectionResizeMode(2, QHeaderView.Stretch)  # Client
         header.setSectionResizeMode(3, QHeaderView.Stretch)  # Photographer
@@ -415,100 +881,162 @@ class JadwalTable(QTableWidget):
         header.setSectionResizeMode(8, QHeaderView.Fixed)  # Actions
         self.setColumnWidth(8, 100)
         
-        # Hide vertical header
-        self.verticalHeader().setVisible(False)
+        # Hide vertical header; fixed row heights keep scrolling independent of row count
+        vertical_header = self.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(34)
     
     def update_data(self, jadwal_list):
         """Update table with schedule data"""
-        self.setRowCount(len(jadwal_list))
+        self.jadwal_model.set_rows(jadwal_list)
+    
+    def upsert_row(self, jadwal):
+        """Show the saved state of one schedule"""
+        self.jadwal_model.upsert_row(jadwal)
+    
+    def remove_row(self, id_sesi):
+        """Remove one schedule from the table"""
+        return self.jadwal_model.remove_row(id_sesi)
+    
+    def set_filter(self, search_text="", **field_values):
+        """Show only the loaded schedules matching a search text and field values"""
+        self.filter_model.set_filter(search_text, **field_values)
+    
+    def on_action_clicked(self, index, button):
+        """Forward a click on the Edit (0) or Hapus (1) button of a row"""
+        jadwal_data = self.jadwal_model.row_data(self.filter_model.mapToSource(index).row())
+        if button == 0:
+            self.edit_requested.emit(jadwal_data)
+        else:
+            self.delete_requested.emit(jadwal_data.get('id_sesi'))
+
+
+class AvailabilityGrid(QWidget):
+    """Free/busy grid of photographers and studios for one day in 15-minute slots"""
+    
+    FIRST_SLOT = 8 * 4    # 08:00
+    LAST_SLOT = 21 * 4    # 21:00
+    FREE_COLOR = "#2E7D32"
+    BUSY_COLOR = "#5A2B2B"
+    
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """Setup grid interface"""
+        layout = QVBoxLayout(self)
         
-        for row, jadwal in enumerate(jadwal_list):
-            # ID (hidden)
-            self.setItem(row, 0, QTableWidgetItem(str(jadwal.get('id_sesi', ''))))
-            
-            # Format datetime
-            tanggal_waktu = jadwal.get('tanggal_waktu', '')
-            if tanggal_waktu:
-                try:
-                    if isinstance(tanggal_waktu, str):
-                        dt = datetime.fromisoformat(tanggal_waktu.replace('Z', '+00:00'))
-                    else:
-                        dt = tanggal_waktu
-                    formatted_dt = dt.strftime('%d/%m/%Y %H:%M')
-                except:
-                    formatted_dt = str(tanggal_waktu)
-            else:
-                formatted_dt = ''
-            
-            self.setItem(row, 1, QTableWidgetItem(formatted_dt))
-            self.setItem(row, 2, QTableWidgetItem(jadwal.get('nama_klien', '')))
-            self.setItem(row, 3, QTableWidgetItem(jadwal.get('nama_fotografer', '')))
-            
-            # Studio with location
-            studio_info = f"{jadwal.get('nama_studio', '')} - {jadwal.get('lokasi', '')}"
-            self.setItem(row, 4, QTableWidgetItem(studio_info))
-            
-            self.setItem(row, 5, QTableWidgetItem(jadwal.get('jenis_paket', '')))
-            
-            # Status with color coding
-            status = jadwal.get('status', '')
-            status_item = QTableWidgetItem(status)
-            if status == 'Booked':
-                status_item.setBackground(QColor('#4CAF50'))  # Green
-            elif status == 'Selesai':
-                status_item.setBackground(QColor('#2196F3'))  # Blue
-            elif status == 'Batal':
-                status_item.setBackground(QColor('#F44336'))  # Red
-            status_item.setTextAlignment(Qt.AlignCenter)
-            self.setItem(row, 6, status_item)
-            
-            # Notes (truncated)
-            catatan = jadwal.get('catatan', '')
-            if len(catatan) > 50:
-                catatan = catatan[:50] + '...'
-            self.setItem(row, 7, QTableWidgetItem(catatan))
-            
-            # Action buttons
-            self.setup_action_buttons(row, jadwal)
-    
-    def setup_action_buttons(self, row, jadwal_data):
-        """Setup action buttons for each row"""
-        button_frame = QFrame()
-        button_layout = QHBoxLayout(button_frame)
-        button_layout.setContentsMargins(2, 2, 2, 2)
-        button_layout.setSpacing(2)
-        
-        # Edit button
-        edit_btn = QPushButton("Edit")
-        edit_btn.clicked.connect(
-            lambda: self.edit_requested.emit(jadwal_data)
-        )
-        button_layout.addWidget(edit_btn)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Tanggal:"))
+        self.date_edit = QDateEdit(QDate.currentDate())
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDisplayFormat("yyyy-MM-dd")
+        self.date_edit.dateChanged.connect(self.load_data)
+        controls.addWidget(self.date_edit)
         
-        # Delete button
-        delete_btn = QPushButton("Hapus")
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #F44336;
+        controls.addWidget(QLabel("Fotografer + studio mana pun:"))
+        self.fotografer_combo = QComboBox()
+        self.fotografer_combo.currentIndexChanged.connect(self.load_data)
+        controls.addWidget(self.fotografer_combo, 1)
+        layout.addLayout(controls)
+        
+        self.table = QTableWidget()
+        self.table.setColumnCount(self.LAST_SLOT - self.FIRST_SLOT)
+        self.table.setHorizontalHeaderLabels([
+            slot_time(datetime.now().date(), slot).strftime("%H:%M") if slot % 4 == 0 else ""
+            for slot in range(self.FIRST_SLOT, self.LAST_SLOT)
+        ])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setDefaultSectionSize(22)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionMode(QTableWidget.NoSelection)
+        self.table.setStyleSheet("""
+            QTableWidget {
+                background-color: #404040;
+                gridline-color: #505050;
+                color: white;
             }
-            QPushButton:hover {
-                background-color: #D32F2F;
+            QHeaderView::section {
+                background-color: #2D2D2D;
+                color: white;
+                padding: 4px;
+                border: 1px solid #505050;
             }
         """)
-        delete_btn.clicked.connect(
-            lambda: self.delete_requested.emit(jadwal_data.get('id_sesi'))
-        )
-        button_layout.addWidget(delete_btn)
+        layout.addWidget(self.table, 1)
+        
+        legend = QLabel("🟩 Kosong    🟥 Terisi jadwal Booked")
+        legend.setStyleSheet("color: #CCCCCC;")
+        layout.addWidget(legend)
+    
+    def load_resources(self):
+        """Reload photographer and studio lists"""
+        self.fotografers = self.db_manager.get_all_fotografer()
+        self.studios = self.db_manager.get_all_studio()
+        
+        selected = self.fotografer_combo.currentData()
+        self.fotografer_combo.blockSignals(True)
+        self.fotografer_combo.clear()
+        self.fotografer_combo.addItem("-- Pilih Fotografer --", None)
+        for fotografer in self.fotografers:
+            self.fotografer_combo.addItem(fotografer['nama'], fotografer['id_fotografer'])
+            if fotografer['id_fotografer'] == selected:
+                self.fotografer_combo.setCurrentIndex(self.fotografer_combo.count() - 1)
+        self.fotografer_combo.blockSignals(False)
+    
+    def load_data(self):
+        """Fill the grid from the availability bitmaps"""
+        if not hasattr(self, 'studios'):
+            self.load_resources()
+        day = self.date_edit.date().toPyDate()
+        try:
+            fotografer_masks = self.db_manager.get_day_availability(
+                day, "fotografer", [row['id_fotografer'] for row in self.fotografers])
+            studio_masks = self.db_manager.get_day_availability(
+                day, "studio", [row['id_studio'] for row in self.studios])
+        except Exception as e:
+            print(f"Error loading availability: {e}")
+            return
         
-        self.setCellWidget(row, 8, button_frame)
+        rows = [(f"📷 {row['nama']}", fotografer_masks[row['id_fotografer']])
+                for row in self.fotografers]
+        rows += [(f"🏠 {row['nama_studio']}", studio_masks[row['id_studio']])
+                 for row in self.studios]
+        
+        fotografer_id = self.fotografer_combo.currentData()
+        if fotografer_id:
+            combined = self.db_manager.query_availability(
+                day, all_of=[("fotografer", fotografer_id)],
+                any_of=[("studio", id_studio) for id_studio in studio_masks]
+            )
+            rows.append((f"✅ {self.fotografer_combo.currentText()} + studio", combined))
+        
+        self.table.setRowCount(len(rows))
+        self.table.setVerticalHeaderLabels([label for label, _ in rows])
+        for row, (label, mask) in enumerate(rows):
+            for column, slot in enumerate(range(self.FIRST_SLOT, self.LAST_SLOT)):
+                free = bool(mask >> slot & 1)
+                item = QTableWidgetItem()
+                item.setBackground(QColor(self.FREE_COLOR if free else self.BUSY_COLOR))
+                item.setToolTip(f"{label} {slot_time(day, slot).strftime('%H:%M')}: "
+                                f"{'tersedia' if free else 'terisi'}")
+                self.table.setItem(row, column, item)
 
 
 class JadwalWidget(QWidget):
     """Main schedule management widget"""
     
+    # Seconds filtering trusts the loaded rows before checking the data version again
+    DATA_VERSION_MAX_AGE = 5
+    
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.data_version = None
+        self.data_checked_at = 0.0
         self.setup_ui()
         self.load_data()
     
@@ -584,6 +1112,11 @@ class JadwalWidget(QWidget):
         
         self.tab_widget.addTab(upcoming_tab, "Jadwal Mendatang")
         
+        # Availability grid tab
+        self.availability_grid = AvailabilityGrid(self.db_manager)
+        self.tab_widget.addTab(self.availability_grid, "Ketersediaan")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        
         layout.addWidget(self.tab_widget)
     
     def setup_control_panel(self, parent_layout):
@@ -693,17 +1226,59 @@ class JadwalWidget(QWidget):
     def load_data(self):
         """Load schedule data from database"""
         try:
-            # Load all schedules
+            # Load all schedules; the version is read first so a change made
+            # while loading triggers another load
+            self.data_version = self.db_manager.get_jadwal_data_version()
+            self.data_checked_at = time.monotonic()
             jadwal_list = self.db_manager.get_all_jadwal_with_details()
             self.table.update_data(jadwal_list)
             
-            # Load upcoming schedules
-            upcoming_list = self.db_manager.get_upcoming_sessions(24)  # 24 hours
-            self.upcoming_table.update_data(upcoming_list)
+            self.refresh_secondary_views()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal memuat data jadwal: {str(e)}")
     
+    def refresh_secondary_views(self):
+        """Reload the upcoming schedules and, while shown, the availability grid"""
+        # The 24-hour window is small; its rows are diffed into the table
+        upcoming_list = self.db_manager.get_upcoming_sessions(24)  # 24 hours
+        self.upcoming_table.update_data(upcoming_list)
+        
+        # Refresh the availability grid only while it is shown
+        if self.tab_widget.currentWidget() is self.availability_grid:
+            self.availability_grid.load_resources()
+            self.availability_grid.load_data()
+    
+    def refresh_jadwal(self, jadwal_id):
+        """Show the saved state of one schedule without reloading the table"""
+        try:
+            # The filter model decides whether the saved schedule is shown
+            jadwal = self.db_manager.get_jadwal_details_by_id(jadwal_id)
+            if jadwal is None:
+                self.table.remove_row(jadwal_id)
+            else:
+                self.table.upsert_row(jadwal)
+            self.refresh_secondary_views()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal memuat data jadwal: {str(e)}")
+    
+    def refresh_jadwal_many(self, jadwal_ids):
+        """Show newly saved schedules without reloading the table"""
+        try:
+            for jadwal_id in jadwal_ids:
+                jadwal = self.db_manager.get_jadwal_details_by_id(jadwal_id)
+                if jadwal is not None:
+                    self.table.upsert_row(jadwal)
+            self.refresh_secondary_views()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal memuat data jadwal: {str(e)}")
+    
+    def on_tab_changed(self, index):
+        """Load the availability grid when its tab is opened"""
+        if self.tab_widget.widget(index) is self.availability_grid:
+            self.availability_grid.load_resources()
+            self.availability_grid.load_data()
+    
     def on_search(self, text):
         """Handle search functionality"""
         self.apply_filters()
@@ -713,34 +1288,17 @@ class JadwalWidget(QWidget):
         self.apply_filters()
     
     def apply_filters(self):
-        """Apply search and filter criteria"""
+        """Apply search and filter criteria to the loaded schedules"""
         try:
-            search_text = self.search_edit.text().strip().lower()
-            status_filter = self.status_filter.currentText()
-            
-            all_jadwal = self.db_manager.get_all_jadwal_with_details()
-            filtered = []
-            
-            for jadwal in all_jadwal:
-                # Apply status filter
-                if status_filter != "Semua Status" and jadwal.get('status') != status_filter:
-                    continue
-                
-                # Apply text search
-                if search_text:
-                    searchable_text = (
-                        jadwal.get('nama_klien', '').lower() + ' ' +
-                        jadwal.get('nama_fotografer', '').lower() + ' ' +
-                        jadwal.get('nama_studio', '').lower() + ' ' +
-                        jadwal.get('lokasi', '').lower() + ' ' +
-                        jadwal.get('jenis_paket', '').lower()
-                    )
-                    if search_text not in searchable_text:
-                        continue
-                
-                filtered.append(jadwal)
+            # Reload only when the data changed since it was loaded
+            if time.monotonic() - self.data_checked_at > self.DATA_VERSION_MAX_AGE:
+                self.data_checked_at = time.monotonic()
+                if self.db_manager.get_jadwal_data_version() != self.data_version:
+                    self.load_data()
             
-            self.table.update_data(filtered)
+            status_filter = self.status_filter.currentText()
+            field_values = {} if status_filter == "Semua Status" else {'status': status_filter}
+            self.table.set_filter(self.search_edit.text().strip(), **field_values)
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal memfilter data: {str(e)}")
@@ -777,6 +1335,11 @@ class JadwalWidget(QWidget):
         if dialog.exec_() == QDialog.Accepted:
             try:
                 jadwal = dialog.get_jadwal_data()
+                occurrences = dialog.get_recurrence()
+                if occurrences:
+                    self.create_series(jadwal, occurrences)
+                    return
+                
                 success, message = self.db_manager.create_jadwal(jadwal)
                 
                 if success:
@@ -784,7 +1347,7 @@ class JadwalWidget(QWidget):
                         self, "Sukses", 
                         "Jadwal sesi berhasil dibuat!"
                     )
-                    self.load_data()
+                    self.refresh_jadwal(jadwal.id_sesi)
                 else:
                     QMessageBox.warning(self, "Gagal", message)
                     
@@ -794,6 +1357,22 @@ class JadwalWidget(QWidget):
                     f"Gagal membuat jadwal: {str(e)}"
                 )
     
+    def create_series(self, jadwal, occurrences):
+        """Create a recurring booking series and report skipped occurrences"""
+        results = self.db_manager.create_jadwal_series(jadwal, occurrences)
+        created = [id_sesi for _, success, _, id_sesi in results if success]
+        skipped = [f"• {when.strftime('%d/%m/%Y %H:%M')}: {message}"
+                   for when, success, message, _ in results if not success]
+        
+        summary = f"{len(created)} dari {len(results)} jadwal sesi berhasil dibuat."
+        if skipped:
+            summary += "\n\nDilewati karena konflik:\n" + "\n".join(skipped)
+            QMessageBox.warning(self, "Jadwal Berulang", summary)
+        else:
+            QMessageBox.information(self, "Sukses", summary)
+        if created:
+            self.refresh_jadwal_many(created)
+    
     def edit_jadwal(self, jadwal_data):
         """Edit existing schedule"""
         dialog = JadwalFormDialog(jadwal_data, self.db_manager, parent=self)
@@ -809,16 +1388,37 @@ class JadwalWidget(QWidget):
                         self, "Sukses", 
                         "Jadwal sesi berhasil diperbarui!"
                     )
-                    self.load_data()
+                    self.refresh_jadwal(jadwal_data['id_sesi'])
                 else:
                     QMessageBox.warning(self, "Gagal", message)
                     
+            except StaleDataError as e:
+                self.resolve_stale_edit(e, jadwal_data, updated_jadwal)
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", 
                     f"Gagal memperbarui jadwal: {str(e)}"
                 )
     
+    def resolve_stale_edit(self, error, jadwal_data, updated_jadwal):
+        """Re-open the editor on the latest row when another desk saved first"""
+        self.refresh_jadwal(jadwal_data['id_sesi'])
+        if error.current is None:
+            QMessageBox.warning(self, "Data Berubah", "Jadwal ini sudah dihapus oleh pengguna lain.")
+            return
+        
+        # SQLite returns tanggal_waktu as text; compare it as a datetime
+        base = dict(jadwal_data, tanggal_waktu=to_datetime(jadwal_data['tanggal_waktu']))
+        current = dict(error.current, tanggal_waktu=to_datetime(error.current['tanggal_waktu']))
+        merged, conflicts = merge_edits(base, updated_jadwal.to_dict(), current,
+                                        JadwalFormDialog.FIELDS)
+        message = ("Jadwal ini telah diubah oleh pengguna lain. Formulir dibuka kembali "
+                   "dengan data terbaru, perubahan Anda tetap dipertahankan.")
+        if conflicts:
+            message += f"\n\nPeriksa kolom yang juga diubah pengguna lain: {', '.join(conflicts)}"
+        QMessageBox.warning(self, "Data Berubah", message)
+        self.edit_jadwal(merged)
+    
     def delete_jadwal(self, jadwal_id):
         """Delete schedule"""
         try:
@@ -838,7 +1438,8 @@ class JadwalWidget(QWidget):
                         self, "Sukses", 
                         "Jadwal sesi berhasil dihapus!"
                     )
-                    self.load_data()
+                    self.table.remove_row(jadwal_id)
+                    self.refresh_secondary_views()
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
@@ -6,21 +6,80 @@ Provides CRUD operations for client data with modern interface
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
+                            QTableView, QHeaderView, QLabel,
                             QLineEdit, QDialog, QFormLayout, QDialogButtonBox,
                             QMessageBox, QFrame, QSplitter, QGroupBox)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt5.QtGui import QIcon, QPalette, QColor
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.database_models import Klien
+from database.repository import StaleDataError
+from services.merge import merge_edits
+from services.phone_numbers import normalize_phone
+from views.table_models import ActionButtonDelegate, ColumnStoreModel
+
+
+class KlienSearchThread(QThread):
+    """Thread running a client search without blocking the widget
+    
+    When nothing matches, names resembling the search term are looked up
+    instead, so a misspelt name still finds the client.
+    """
+    
+    result_ready = pyqtSignal(int, list, bool, str)  # sequence, rows, similar names only, error
+    
+    def __init__(self, db_manager, sequence, search_term, limit, similar_limit, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.sequence = sequence
+        self.search_term = search_term
+        self.limit = limit
+        self.similar_limit = similar_limit
+    
+    def run(self):
+        similar = False
+        try:
+            results = self.db_manager.search_klien(self.search_term, self.limit)
+            if not results:
+                results = self.db_manager.fuzzy_search_klien(self.search_term, self.similar_limit)
+                similar = bool(results)
+        except Exception as e:
+            self.result_ready.emit(self.sequence, [], False, str(e))
+            return
+        self.result_ready.emit(self.sequence, results, similar, "")
+
+
+class KlienDuplicateThread(QThread):
+    """Thread looking up existing clients whose name resembles a new client's"""
+    
+    result_ready = pyqtSignal(object, list, str)  # new Klien, similar rows, error
+    
+    def __init__(self, db_manager, klien, limit, threshold, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.klien = klien
+        self.limit = limit
+        self.threshold = threshold
+    
+    def run(self):
+        try:
+            similar = self.db_manager.fuzzy_search_klien(self.klien.nama, self.limit,
+                                                         self.threshold)
+        except Exception as e:
+            self.result_ready.emit(self.klien, [], str(e))
+            return
+        self.result_ready.emit(self.klien, similar, "")
 
 
 class KlienFormDialog(QDialog):
     """Dialog for adding/editing client information"""
     
+    # Editable columns, merged field by field after a stale save
+    FIELDS = ("nama", "nomor_hp", "email", "alamat")
+    
     def __init__(self, klien_data=None, parent=None):
         super().__init__(parent)
         self.klien_data = klien_data
@@ -125,7 +184,8 @@ class KlienFormDialog(QDialog):
             nama=self.nama_edit.text().strip(),
             nomor_hp=self.hp_edit.text().strip(),
             email=self.email_edit.text().strip(),
-            alamat=self.alamat_edit.text().strip()
+            alamat=self.alamat_edit.text().strip(),
+            version=self.klien_data.get('version') if self.klien_data else None
         )
     
     def validate_input(self):
@@ -146,29 +206,53 @@ class KlienFormDialog(QDialog):
             super().accept()
 
 
-class KlienTable(QTableWidget):
-    """Custom table widget for displaying clients"""
+class KlienTableModel(ColumnStoreModel):
+    """Klien rows for KlienTable, in the order get_all_klien() returns them"""
+    
+    HEADERS = ("ID", "Nama", "Nomor HP/WA", "Email", "Alamat", "Aksi")
+    KEY_FIELD = 'id_klien'
+    SORT_FIELD = 'nama'
+    ACTION_COLUMN = 5
+    
+    def display(self, row, column, role):
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.value(row, 'id_klien') or '')
+            if column == 1:
+                return self.value(row, 'nama') or ''
+            if column == 2:
+                return self.value(row, 'nomor_hp') or ''
+            if column == 3:
+                return self.value(row, 'email') or ''
+            if column == 4:
+                return self.value(row, 'alamat') or ''
+        return None
+
+
+class KlienTable(QTableView):
+    """Table view for displaying clients
+    
+    The Edit and Hapus buttons are painted by a delegate, and single rows
+    can be inserted, updated or removed after a save.
+    """
     
     edit_requested = pyqtSignal(dict)
     delete_requested = pyqtSignal(int)
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.klien_model = KlienTableModel(self)
+        self.setModel(self.klien_model)
         self.setup_ui()
     
     def setup_ui(self):
         """Setup table interface"""
-        self.setColumnCount(6)
-        self.setHorizontalHeaderLabels([
-            "ID", "Nama", "Nomor HP/WA", "Email", "Alamat", "Aksi"
-        ])
-        
         # Hide ID column
         self.setColumnHidden(0, True)
         
         # Style the table
         self.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #404040;
                 alternate-background-color: #454545;
                 gridline-color: #505050;
@@ -185,34 +269,31 @@ class KlienTable(QTableWidget):
                 font-weight: bold;
                 font-size: 12px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px 8px;
                 border-bottom: 1px solid #505050;
             }
-            QTableWidget::item:selected {
-                background-color: #4A90E2;
-            }
-            QPushButton {
+            QTableView::item:selected {
                 background-color: #4A90E2;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                margin: 2px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #357ABD;
             }
         """)
         
         # Configure table
         self.setAlternatingRowColors(True)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setEditTriggers(QTableView.NoEditTriggers)
+        
+        # Edit and delete buttons, drawn rather than created per row
+        self.action_delegate = ActionButtonDelegate(
+            [("Edit", "#4A90E2"), ("Hapus", "#F44336")], self, margin=4, font_size=11
+        )
+        self.action_delegate.clicked.connect(self.on_action_clicked)
+        self.setItemDelegateForColumn(KlienTableModel.ACTION_COLUMN, self.action_delegate)
         
-        # Auto-resize columns
+        # Auto-resize columns, measuring only the rows on screen
         header = self.horizontalHeader()
+        header.setResizeContentsPrecision(0)
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # Name column
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Phone
         header.setSectionResizeMode(3, QHeaderView.Stretch)  # Email
@@ -220,64 +301,58 @@ class KlienTable(QTableWidget):
         header.setSectionResizeMode(5, QHeaderView.Fixed)  # Actions
         self.setColumnWidth(5, 120)
         
-        # Hide vertical header
-        self.verticalHeader().setVisible(False)
+        # Hide vertical header; fixed row heights keep scrolling independent of row count
+        vertical_header = self.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(34)
     
     def update_data(self, klien_list):
         """Update table with client data"""
-        self.setRowCount(len(klien_list))
-        
-        for row, klien in enumerate(klien_list):
-            # ID (hidden)
-            self.setItem(row, 0, QTableWidgetItem(str(klien.get('id_klien', ''))))
-            
-            # Client info
-            self.setItem(row, 1, QTableWidgetItem(klien.get('nama', '')))
-            self.setItem(row, 2, QTableWidgetItem(klien.get('nomor_hp', '')))
-            self.setItem(row, 3, QTableWidgetItem(klien.get('email', '')))
-            self.setItem(row, 4, QTableWidgetItem(klien.get('alamat', '')))
-            
-            # Action buttons
-            self.setup_action_buttons(row, klien)
-    
-    def setup_action_buttons(self, row, klien_data):
-        """Setup action buttons for each row"""
-        button_frame = QFrame()
-        button_layout = QHBoxLayout(button_frame)
-        button_layout.setContentsMargins(4, 4, 4, 4)
-        button_layout.setSpacing(4)
-        
-        # Edit button
-        edit_btn = QPushButton("Edit")
-        edit_btn.clicked.connect(
-            lambda: self.edit_requested.emit(klien_data)
-        )
-        button_layout.addWidget(edit_btn)
-        
-        # Delete button
-        delete_btn = QPushButton("Hapus")
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #F44336;
-            }
-            QPushButton:hover {
-                background-color: #D32F2F;
-            }
-        """)
-        delete_btn.clicked.connect(
-            lambda: self.delete_requested.emit(klien_data.get('id_klien'))
-        )
-        button_layout.addWidget(delete_btn)
-        
-        self.setCellWidget(row, 5, button_frame)
+        self.klien_model.set_rows(klien_list)
+    
+    def upsert_row(self, klien):
+        """Show the saved state of one client"""
+        self.klien_model.upsert_row(klien)
+    
+    def remove_row(self, id_klien):
+        """Remove one client from the table"""
+        return self.klien_model.remove_row(id_klien)
+    
+    def on_action_clicked(self, index, button):
+        """Forward a click on the Edit (0) or Hapus (1) button of a row"""
+        klien_data = self.klien_model.row_data(index.row())
+        if button == 0:
+            self.edit_requested.emit(klien_data)
+        else:
+            self.delete_requested.emit(klien_data.get('id_klien'))
 
 
 class KlienWidget(QWidget):
     """Main client management widget"""
     
+    SEARCH_DELAY_MS = 250
+    SEARCH_RESULT_LIMIT = 200
+    SIMILAR_RESULT_LIMIT = 10
+    # Similarity from which a new client's name is reported as a likely duplicate
+    DUPLICATE_SIMILARITY = 0.5
+    DUPLICATE_RESULT_LIMIT = 5
+    # Shortest normalised number ("+62" and 8 digits) looked up in the caller panel
+    CALLER_MIN_LENGTH = 11
+    
     def __init__(self, db_manager, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        
+        # Debounced search: only the answer for the latest text may fill the table
+        self.search_sequence = 0
+        self.search_threads = []
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.start_search)
+        # New clients wait here while similar names are looked up
+        self.duplicate_threads = []
         self.setup_ui()
         self.load_data()
     
@@ -304,6 +379,9 @@ class KlienWidget(QWidget):
         # Control panel
         self.setup_control_panel(layout)
         
+        # Caller lookup
+        self.setup_caller_panel(layout)
+        
         # Table
         self.setup_table(layout)
     
@@ -345,6 +423,10 @@ class KlienWidget(QWidget):
         self.search_edit.textChanged.connect(self.on_search)
         panel_layout.addWidget(self.search_edit, 1)
         
+        self.result_label = QLabel()
+        self.result_label.setStyleSheet("color: #CCCCCC; font-size: 12px;")
+        panel_layout.addWidget(self.result_label)
+        
         # Action buttons
         self.add_btn = QPushButton("➕ Tambah Klien")
         self.add_btn.setStyleSheet("""
@@ -384,6 +466,72 @@ class KlienWidget(QWidget):
         
         parent_layout.addWidget(panel_frame)
     
+    def setup_caller_panel(self, parent_layout):
+        """Setup the panel showing which client is calling from a phone number"""
+        panel_frame = QFrame()
+        panel_frame.setStyleSheet("""
+            QFrame {
+                background-color: #404040;
+                border-radius: 10px;
+                padding: 6px;
+            }
+        """)
+        
+        panel_layout = QHBoxLayout(panel_frame)
+        panel_layout.setContentsMargins(15, 10, 15, 10)
+        panel_layout.setSpacing(15)
+        
+        caller_label = QLabel("📞 Penelepon:")
+        caller_label.setStyleSheet("color: #FFFFFF; font-weight: bold;")
+        panel_layout.addWidget(caller_label)
+        
+        self.caller_edit = QLineEdit()
+        self.caller_edit.setPlaceholderText("Nomor HP yang menelepon...")
+        self.caller_edit.setMaximumWidth(260)
+        self.caller_edit.setStyleSheet("""
+            QLineEdit {
+                background-color: #505050;
+                color: #FFFFFF;
+                border: 2px solid #606060;
+                border-radius: 6px;
+                padding: 8px;
+                font-size: 12px;
+            }
+            QLineEdit:focus {
+                border-color: #4A90E2;
+            }
+        """)
+        # One indexed lookup per change, cheap enough to skip the debounce
+        self.caller_edit.textChanged.connect(self.on_caller_number)
+        panel_layout.addWidget(self.caller_edit)
+        
+        self.caller_info = QLabel()
+        self.caller_info.setStyleSheet("color: #FFFFFF; font-size: 13px;")
+        self.caller_info.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        panel_layout.addWidget(self.caller_info, 1)
+        
+        self.caller_open_btn = QPushButton("✏️ Buka Data")
+        self.caller_open_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #4A90E2;
+                color: white;
+                border: none;
+                border-radius: 8px;
+                padding: 8px 16px;
+                font-size: 13px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #357ABD;
+            }
+        """)
+        self.caller_open_btn.clicked.connect(self.open_caller)
+        self.caller_open_btn.hide()
+        panel_layout.addWidget(self.caller_open_btn)
+        self.caller_matches = []
+        
+        parent_layout.addWidget(panel_frame)
+    
     def setup_table(self, parent_layout):
         """Setup client table"""
         self.table = KlienTable()
@@ -400,35 +548,169 @@ class KlienWidget(QWidget):
             QMessageBox.critical(self, "Error", f"Gagal memuat data klien: {str(e)}")
     
     def on_search(self, text):
-        """Handle search functionality"""
+        """Restart the debounce timer; the search runs once typing pauses"""
+        # Any answer still in flight is for outdated text
+        self.search_sequence += 1
+        if text.strip():
+            self.search_timer.start()
+        else:
+            self.search_timer.stop()
+            self.result_label.clear()
+            self.load_data()
+    
+    def start_search(self):
+        """Run the search for the current text on a worker thread"""
+        search_text = self.search_edit.text().strip()
+        if not search_text:
+            return
+        
+        self.search_sequence += 1
+        # One row more than shown tells whether the results were cut off
+        thread = KlienSearchThread(self.db_manager, self.search_sequence, search_text,
+                                   self.SEARCH_RESULT_LIMIT + 1, self.SIMILAR_RESULT_LIMIT,
+                                   parent=self)
+        thread.result_ready.connect(self.on_search_result)
+        thread.finished.connect(lambda: self.forget_search_thread(thread))
+        self.search_threads.append(thread)
+        thread.start()
+    
+    def forget_search_thread(self, thread):
+        """Release a finished worker thread"""
+        if thread in self.search_threads:
+            self.search_threads.remove(thread)
+        thread.deleteLater()
+    
+    def on_search_result(self, sequence, results, similar, error):
+        """Show search results unless newer text superseded them"""
+        if sequence != self.search_sequence:
+            return
+        if error:
+            QMessageBox.critical(self, "Error", f"Gagal melakukan pencarian: {error}")
+            return
+        
+        self.table.update_data(results[:self.SEARCH_RESULT_LIMIT])
+        if similar:
+            self.result_label.setText(f"Tidak ada yang cocok, {len(results)} nama mirip")
+        elif len(results) > self.SEARCH_RESULT_LIMIT:
+            self.result_label.setText(f"{self.SEARCH_RESULT_LIMIT} hasil pertama")
+        else:
+            self.result_label.setText(f"{len(results)} hasil")
+    
+    def stop_search(self):
+        """Wait for running searches and duplicate checks; called before the database is closed"""
+        self.search_timer.stop()
+        self.search_sequence += 1
+        for thread in list(self.search_threads) + list(self.duplicate_threads):
+            thread.wait()
+    
+    def on_caller_number(self, text):
+        """Name the client(s) registered under the typed phone number"""
+        self.caller_matches = []
+        self.caller_open_btn.hide()
+        normalized = normalize_phone(text)
+        if normalized is None:
+            self.caller_info.clear()
+            return
+        if len(normalized) < self.CALLER_MIN_LENGTH:
+            self.caller_info.setStyleSheet("color: #CCCCCC; font-size: 13px;")
+            self.caller_info.setText("Ketik nomor lengkap...")
+            return
+        
         try:
-            if text.strip():
-                results = self.db_manager.search_klien(text.strip())
-                self.table.update_data(results)
+            self.caller_matches = self.db_manager.find_klien_by_phone(text)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal mencari penelepon: {str(e)}")
+            return
+        if not self.caller_matches:
+            self.caller_info.setStyleSheet("color: #FFB74D; font-size: 13px;")
+            self.caller_info.setText(f"{normalized} belum terdaftar sebagai klien")
+            return
+        
+        self.caller_info.setStyleSheet("color: #81C784; font-size: 13px; font-weight: bold;")
+        self.caller_info.setText("  |  ".join(
+            " · ".join(value for value in (klien['nama'], klien.get('email'), klien.get('alamat'))
+                       if value)
+            for klien in self.caller_matches
+        ))
+        self.caller_open_btn.setText("✏️ Buka Data" if len(self.caller_matches) == 1
+                                     else f"✏️ Buka Data ({len(self.caller_matches)})")
+        self.caller_open_btn.show()
+    
+    def open_caller(self):
+        """Open the caller's client data; with a shared number, list the clients in the table"""
+        if len(self.caller_matches) == 1:
+            self.edit_klien(self.caller_matches[0])
+            self.on_caller_number(self.caller_edit.text())
+        elif self.caller_matches:
+            self.search_edit.setText(self.caller_edit.text().strip())
+    
+    def refresh_klien(self, klien_id):
+        """Show the saved state of one client without reloading the table"""
+        search_text = self.search_edit.text().strip()
+        if search_text:
+            # The saved client may have started or stopped matching the search
+            self.on_search(search_text)
+            return
+        try:
+            klien = self.db_manager.get_klien_by_id(klien_id)
+            if klien is None:
+                self.table.remove_row(klien_id)
             else:
-                self.load_data()
+                self.table.upsert_row(klien)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal melakukan pencarian: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Gagal memuat data klien: {str(e)}")
     
     def add_klien(self):
-        """Add new client"""
+        """Add new client once a worker thread has looked for similar names"""
         dialog = KlienFormDialog(parent=self)
         if dialog.exec_() == QDialog.Accepted:
-            try:
-                klien = dialog.get_klien_data()
-                klien_id = self.db_manager.create_klien(klien)
-                
-                QMessageBox.information(
-                    self, "Sukses", 
-                    f"Klien '{klien.nama}' berhasil ditambahkan!"
-                )
-                self.load_data()
-                
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error", 
-                    f"Gagal menambahkan klien: {str(e)}"
-                )
+            klien = dialog.get_klien_data()
+            self.add_btn.setEnabled(False)
+            thread = KlienDuplicateThread(self.db_manager, klien, self.DUPLICATE_RESULT_LIMIT,
+                                          self.DUPLICATE_SIMILARITY, parent=self)
+            thread.result_ready.connect(self.confirm_new_klien)
+            thread.finished.connect(lambda: self.forget_duplicate_thread(thread))
+            self.duplicate_threads.append(thread)
+            thread.start()
+    
+    def forget_duplicate_thread(self, thread):
+        """Release a finished duplicate check"""
+        if thread in self.duplicate_threads:
+            self.duplicate_threads.remove(thread)
+        thread.deleteLater()
+    
+    def confirm_new_klien(self, klien, similar, error):
+        """Ask before adding a client whose name resembles an existing one, then save it"""
+        self.add_btn.setEnabled(True)
+        if error:
+            QMessageBox.critical(self, "Error", f"Gagal memeriksa nama klien: {error}")
+            return
+        if similar:
+            names = "\n".join(f"• {row['nama']} ({row['nomor_hp']})" for row in similar)
+            reply = QMessageBox.question(
+                self, "Klien Mirip",
+                f"Klien dengan nama mirip sudah terdaftar:\n\n{names}\n\n"
+                f"Tetap tambahkan '{klien.nama}' sebagai klien baru?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+        
+        try:
+            klien_id = self.db_manager.create_klien(klien)
+            
+            QMessageBox.information(
+                self, "Sukses", 
+                f"Klien '{klien.nama}' berhasil ditambahkan!"
+            )
+            self.refresh_klien(klien_id)
+            
+        except Exception as e:
+            QMessageBox.critical(
+                self, "Error", 
+                f"Gagal menambahkan klien: {str(e)}"
+            )
     
     def edit_klien(self, klien_data):
         """Edit existing client"""
@@ -445,19 +727,37 @@ class KlienWidget(QWidget):
                         self, "Sukses", 
                         f"Data klien '{updated_klien.nama}' berhasil diperbarui!"
                     )
-                    self.load_data()
+                    self.refresh_klien(klien_data['id_klien'])
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
                         "Tidak ada perubahan data yang disimpan."
                     )
                     
+            except StaleDataError as e:
+                self.resolve_stale_edit(e, klien_data, updated_klien)
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", 
                     f"Gagal memperbarui klien: {str(e)}"
                 )
     
+    def resolve_stale_edit(self, error, klien_data, updated_klien):
+        """Re-open the editor on the latest row when another desk saved first"""
+        self.refresh_klien(klien_data['id_klien'])
+        if error.current is None:
+            QMessageBox.warning(self, "Data Berubah", "Data klien ini sudah dihapus oleh pengguna lain.")
+            return
+        
+        merged, conflicts = merge_edits(klien_data, updated_klien.to_dict(), error.current,
+                                        KlienFormDialog.FIELDS)
+        message = ("Data klien ini telah diubah oleh pengguna lain. Formulir dibuka kembali "
+                   "dengan data terbaru, perubahan Anda tetap dipertahankan.")
+        if conflicts:
+            message += f"\n\nPeriksa kolom yang juga diubah pengguna lain: {', '.join(conflicts)}"
+        QMessageBox.warning(self, "Data Berubah", message)
+        self.edit_klien(merged)
+    
     def delete_klien(self, klien_id):
         """Delete client"""
         try:
@@ -484,7 +784,7 @@ class KlienWidget(QWidget):
                         self, "Sukses", 
                         f"Klien '{klien_data['nama']}' berhasil dihapus!"
                     )
-                    self.load_data()
+                    self.table.remove_row(klien_id)
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
@@ -367,27 +367,10 @@ class ReportGeneratorThread(QThread):
         self.report_completed.emit(self.output_path)
     
     def get_period_report_data(self):
-        """Get report data for custom period"""
-        # This would need to be implemented in database_manager
-        # For now, we'll get all data and filter
-        all_data = self.db_manager.get_all_jadwal_with_details()
-        filtered_data = []
-        
-        for item in all_data:
-            tanggal_waktu_str = item.get('tanggal_waktu', '')
-            if tanggal_waktu_str:
-                try:
-                    if isinstance(tanggal_waktu_str, str):
-                        dt = datetime.fromisoformat(tanggal_waktu_str.replace('Z', '+00:00'))
-                    else:
-                        dt = tanggal_waktu_str
-                    
-                    if self.start_date <= dt.date() <= self.end_date:
-                        filtered_data.append(item)
-                except:
-                    pass
-        
-        return filtered_data
+        """Get report data for custom period (both dates inclusive)"""
+        return self.db_manager.get_jadwal_between(
+            self.start_date, self.end_date + timedelta(days=1)
+        )
 
 
 class LaporanWidget(QWidget):
@@ -730,8 +713,8 @@ class LaporanWidget(QWidget):
                 self.stats_layout.addWidget(error_label)
                 return
             
-            # Get dashboard stats
-            stats = self.db_manager.get_dashboard_stats()
+            # Get dashboard counters (no recent sessions needed here)
+            stats = self.db_manager.get_dashboard_snapshot(recent_limit=0)['stats']
             
             # Create stat cards
             stat_items = [
@@ -14,7 +14,7 @@ from PyQt5.QtGui import QFont, QIcon, QPalette, QColor
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.mysql_database_manager import MySQLDatabaseManager
+from database.repository import create_repository
 from views.dashboard_widget import DashboardWidget
 from views.klien_widget import KlienWidget
 from views.fotografer_widget import FotograferWidget
@@ -181,8 +181,8 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         
-        # Initialize MySQL database
-        self.db_manager = MySQLDatabaseManager()
+        # Initialize the configured database backend
+        self.db_manager = create_repository()
         
         # Setup window
         self.setup_window()
@@ -390,6 +390,14 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'notification_timer'):
             self.notification_timer.stop()
         
+        # Searches still running need the database
+        if hasattr(self, 'klien_widget'):
+            self.klien_widget.stop_search()
+        
+        # Release pooled database connections
+        if hasattr(self.db_manager, 'close'):
+            self.db_manager.close()
+        
         event.accept()
 
 
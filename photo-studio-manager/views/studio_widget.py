@@ -6,7 +6,7 @@ Provides CRUD operations for studio data with modern interface
 import sys
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, QLabel,
+                            QTableView, QHeaderView, QLabel,
                             QLineEdit, QDialog, QFormLayout, QDialogButtonBox,
                             QMessageBox, QFrame, QSplitter, QGroupBox, QSpinBox)
 from PyQt5.QtCore import Qt, pyqtSignal
@@ -16,11 +16,17 @@ from PyQt5.QtGui import QIcon, QPalette, QColor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.database_models import Studio
+from database.repository import StaleDataError
+from services.merge import merge_edits
+from views.table_models import ActionButtonDelegate, ColumnStoreModel
 
 
 class StudioFormDialog(QDialog):
     """Dialog for adding/editing studio information"""
     
+    # Editable columns, merged field by field after a stale save
+    FIELDS = ("nama_studio", "lokasi", "kapasitas")
+    
     def __init__(self, studio_data=None, parent=None):
         super().__init__(parent)
         self.studio_data = studio_data
@@ -130,7 +136,8 @@ class StudioFormDialog(QDialog):
         return Studio(
             nama_studio=self.nama_studio_edit.text().strip(),
             lokasi=self.lokasi_edit.text().strip(),
-            kapasitas=self.kapasitas_spin.value()
+            kapasitas=self.kapasitas_spin.value(),
+            version=self.studio_data.get('version') if self.studio_data else None
         )
     
     def validate_input(self):
@@ -155,29 +162,54 @@ class StudioFormDialog(QDialog):
             super().accept()
 
 
-class StudioTable(QTableWidget):
-    """Custom table widget for displaying studios"""
+class StudioTableModel(ColumnStoreModel):
+    """Studio rows for StudioTable, in the order get_all_studio() returns them"""
+    
+    HEADERS = ("ID", "Nama Studio", "Lokasi", "Kapasitas", "Aksi")
+    KEY_FIELD = 'id_studio'
+    SORT_FIELD = 'nama_studio'
+    ACTION_COLUMN = 4
+    
+    def display(self, row, column, role):
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.value(row, 'id_studio') or '')
+            if column == 1:
+                return self.value(row, 'nama_studio') or ''
+            if column == 2:
+                return self.value(row, 'lokasi') or ''
+            if column == 3:
+                # Format capacity with unit
+                return f"{self.value(row, 'kapasitas') or 0} orang"
+        elif role == Qt.TextAlignmentRole and column == 3:
+            return Qt.AlignCenter
+        return None
+
+
+class StudioTable(QTableView):
+    """Table view for displaying studios
+    
+    The Edit and Hapus buttons are painted by a delegate, and single rows
+    can be inserted, updated or removed after a save.
+    """
     
     edit_requested = pyqtSignal(dict)
     delete_requested = pyqtSignal(int)
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.studio_model = StudioTableModel(self)
+        self.setModel(self.studio_model)
         self.setup_ui()
     
     def setup_ui(self):
         """Setup table interface"""
-        self.setColumnCount(5)
-        self.setHorizontalHeaderLabels([
-            "ID", "Nama Studio", "Lokasi", "Kapasitas", "Aksi"
-        ])
-        
         # Hide ID column
         self.setColumnHidden(0, True)
         
         # Style the table
         self.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #404040;
                 alternate-background-color: #454545;
                 gridline-color: #505050;
@@ -194,95 +226,62 @@ class StudioTable(QTableWidget):
                 font-weight: bold;
                 font-size: 12px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px 8px;
                 border-bottom: 1px solid #505050;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #4A90E2;
             }
-            QPushButton {
-                background-color: #4A90E2;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                margin: 2px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #357ABD;
-            }
         """)
         
         # Configure table
         self.setAlternatingRowColors(True)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setEditTriggers(QTableView.NoEditTriggers)
+        
+        # Edit and delete buttons, drawn rather than created per row
+        self.action_delegate = ActionButtonDelegate(
+            [("Edit", "#4A90E2"), ("Hapus", "#F44336")], self, margin=4, font_size=11
+        )
+        self.action_delegate.clicked.connect(self.on_action_clicked)
+        self.setItemDelegateForColumn(StudioTableModel.ACTION_COLUMN, self.action_delegate)
         
-        # Auto-resize columns
+        # Auto-resize columns, measuring only the rows on screen
         header = self.horizontalHeader()
+        header.setResizeContentsPrecision(0)
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # Studio name column
         header.setSectionResizeMode(2, QHeaderView.Stretch)  # Location
         header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Capacity
         header.setSectionResizeMode(4, QHeaderView.Fixed)  # Actions
         self.setColumnWidth(4, 120)
         
-        # Hide vertical header
-        self.verticalHeader().setVisible(False)
+        # Hide vertical header; fixed row heights keep scrolling independent of row count
+        vertical_header = self.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(34)
     
     def update_data(self, studio_list):
         """Update table with studio data"""
-        self.setRowCount(len(studio_list))
-        
-        for row, studio in enumerate(studio_list):
-            # ID (hidden)
-            self.setItem(row, 0, QTableWidgetItem(str(studio.get('id_studio', ''))))
-            
-            # Studio info
-            self.setItem(row, 1, QTableWidgetItem(studio.get('nama_studio', '')))
-            self.setItem(row, 2, QTableWidgetItem(studio.get('lokasi', '')))
-            
-            # Format capacity with unit
-            kapasitas = studio.get('kapasitas', 0)
-            capacity_text = f"{kapasitas} orang"
-            capacity_item = QTableWidgetItem(capacity_text)
-            capacity_item.setTextAlignment(Qt.AlignCenter)
-            self.setItem(row, 3, capacity_item)
-            
-            # Action buttons
-            self.setup_action_buttons(row, studio)
+        self.studio_model.set_rows(studio_list)
     
-    def setup_action_buttons(self, row, studio_data):
-        """Setup action buttons for each row"""
-        button_frame = QFrame()
-        button_layout = QHBoxLayout(button_frame)
-        button_layout.setContentsMargins(4, 4, 4, 4)
-        button_layout.setSpacing(4)
-        
-        # Edit button
-        edit_btn = QPushButton("Edit")
-        edit_btn.clicked.connect(
-            lambda: self.edit_requested.emit(studio_data)
-        )
-        button_layout.addWidget(edit_btn)
-        
-        # Delete button
-        delete_btn = QPushButton("Hapus")
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #F44336;
-            }
-            QPushButton:hover {
-                background-color: #D32F2F;
-            }
-        """)
-        delete_btn.clicked.connect(
-            lambda: self.delete_requested.emit(studio_data.get('id_studio'))
-        )
-        button_layout.addWidget(delete_btn)
-        
-        self.setCellWidget(row, 4, button_frame)
+    def upsert_row(self, studio):
+        """Show the saved state of one studio"""
+        self.studio_model.upsert_row(studio)
+    
+    def remove_row(self, id_studio):
+        """Remove one studio from the table"""
+        return self.studio_model.remove_row(id_studio)
+    
+    def on_action_clicked(self, index, button):
+        """Forward a click on the Edit (0) or Hapus (1) button of a row"""
+        studio_data = self.studio_model.row_data(index.row())
+        if button == 0:
+            self.edit_requested.emit(studio_data)
+        else:
+            self.delete_requested.emit(studio_data.get('id_studio'))
 
 
 class StudioWidget(QWidget):
@@ -427,6 +426,22 @@ class StudioWidget(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal melakukan pencarian: {str(e)}")
     
+    def refresh_studio(self, studio_id):
+        """Show the saved state of one studio without reloading the table"""
+        search_text = self.search_edit.text().strip()
+        if search_text:
+            # The saved studio may have started or stopped matching the search
+            self.on_search(search_text)
+            return
+        try:
+            studio = self.db_manager.get_studio_by_id(studio_id)
+            if studio is None:
+                self.table.remove_row(studio_id)
+            else:
+                self.table.upsert_row(studio)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal memuat data studio: {str(e)}")
+    
     def add_studio(self):
         """Add new studio"""
         dialog = StudioFormDialog(parent=self)
@@ -439,7 +454,7 @@ class StudioWidget(QWidget):
                     self, "Sukses", 
                     f"Studio '{studio.nama_studio}' berhasil ditambahkan!"
                 )
-                self.load_data()
+                self.refresh_studio(studio_id)
                 
             except Exception as e:
                 QMessageBox.critical(
@@ -462,30 +477,42 @@ class StudioWidget(QWidget):
                         self, "Sukses", 
                         f"Data studio '{updated_studio.nama_studio}' berhasil diperbarui!"
                     )
-                    self.load_data()
+                    self.refresh_studio(studio_data['id_studio'])
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
                         "Tidak ada perubahan data yang disimpan."
                     )
                     
+            except StaleDataError as e:
+                self.resolve_stale_edit(e, studio_data, updated_studio)
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", 
                     f"Gagal memperbarui studio: {str(e)}"
                 )
     
+    def resolve_stale_edit(self, error, studio_data, updated_studio):
+        """Re-open the editor on the latest row when another desk saved first"""
+        self.refresh_studio(studio_data['id_studio'])
+        if error.current is None:
+            QMessageBox.warning(self, "Data Berubah", "Data studio ini sudah dihapus oleh pengguna lain.")
+            return
+        
+        merged, conflicts = merge_edits(studio_data, updated_studio.to_dict(), error.current,
+                                        StudioFormDialog.FIELDS)
+        message = ("Data studio ini telah diubah oleh pengguna lain. Formulir dibuka kembali "
+                   "dengan data terbaru, perubahan Anda tetap dipertahankan.")
+        if conflicts:
+            message += f"\n\nPeriksa kolom yang juga diubah pengguna lain: {', '.join(conflicts)}"
+        QMessageBox.warning(self, "Data Berubah", message)
+        self.edit_studio(merged)
+    
     def delete_studio(self, studio_id):
         """Delete studio"""
         try:
             # Get studio name for confirmation
-            studio_data = None
-            all_studio = self.db_manager.get_all_studio()
-            for s in all_studio:
-                if s.get('id_studio') == studio_id:
-                    studio_data = s
-                    break
-            
+            studio_data = self.db_manager.get_studio_by_id(studio_id)
             if not studio_data:
                 QMessageBox.warning(self, "Error", "Studio tidak ditemukan!")
                 return
@@ -507,7 +534,7 @@ class StudioWidget(QWidget):
                         self, "Sukses", 
                         f"Studio '{studio_data['nama_studio']}' berhasil dihapus!"
                     )
-                    self.load_data()
+                    self.table.remove_row(studio_id)
                 else:
                     QMessageBox.warning(
                         self, "Peringatan", 
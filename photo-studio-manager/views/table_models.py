@@ -0,0 +1,412 @@
+"""
+Table models for Photo Studio Management System
+Column-store Qt models and the action button delegate used by the table views
+"""
+
+import sys
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import (Qt, QAbstractProxyModel, QAbstractTableModel, QEvent, QModelIndex,
+                          QRect, pyqtSignal)
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+
+class ColumnStoreModel(QAbstractTableModel):
+    """Read-only table model keeping its rows as one list per field
+
+    Rows cost one slot in each field list instead of a dict per row and an
+    item object per cell; strings of the fields in SHARED_FIELDS (names,
+    packages, statuses) are interned so repeated values share one object.
+    The view asks data() only for the rows on screen, so formatting is done
+    there. Subclasses set HEADERS and implement display().
+
+    Rows are identified by KEY_FIELD and kept in the order of SORT_FIELD
+    (the ORDER BY of the query that loads them), so a single saved row can
+    be inserted, updated or removed without reloading the table.
+    
+    The lowercased SEARCH_FIELDS of every row are joined into search_keys
+    when the row is stored, for FilterProxyModel.
+    """
+
+    HEADERS: Sequence[str] = ()
+    SHARED_FIELDS: Sequence[str] = ()
+    KEY_FIELD = ""
+    SORT_FIELD = ""
+    SORT_DESCENDING = False
+    SEARCH_FIELDS: Sequence[str] = ()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns: Dict[str, List[Any]] = {}
+        self.search_keys: List[str] = []
+        self.row_total = 0
+
+    def set_rows(self, rows: Sequence[Dict[str, Any]]):
+        """Replace all rows with as few model changes as possible
+
+        Rows that disappeared are removed and new rows inserted where they
+        belong, so the view keeps its selection and scroll position. Only
+        when the kept rows changed order is the model reset.
+        """
+        fields = list(rows[0].keys()) if rows else []
+        if not (self.row_total and rows and self.KEY_FIELD) or set(fields) != set(self.columns):
+            self.reset_rows(rows)
+            return
+
+        old_keys = self.columns[self.KEY_FIELD]
+        new_keys = [row.get(self.KEY_FIELD) for row in rows]
+        old_set = set(old_keys)
+        new_set = set(new_keys)
+        if ([key for key in old_keys if key in new_set]
+                != [key for key in new_keys if key in old_set]):
+            self.reset_rows(rows)
+            return
+
+        # Bottom-up, so the positions of runs still to be removed stay valid
+        removed = [row for row, key in enumerate(old_keys) if key not in new_set]
+        for first, last in reversed(self._runs(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for values in self.columns.values():
+                del values[first:last + 1]
+            del self.search_keys[first:last + 1]
+            self.row_total -= last - first + 1
+            self.endRemoveRows()
+
+        # Top-down: every row above an inserted run is already in place
+        inserted = [row for row, key in enumerate(new_keys) if key not in old_set]
+        for first, last in self._runs(inserted):
+            self.beginInsertRows(QModelIndex(), first, last)
+            for field, values in self.columns.items():
+                values[first:first] = self._stored(field, (row.get(field)
+                                                           for row in rows[first:last + 1]))
+            self.search_keys[first:first] = [self._search_key(row) for row in rows[first:last + 1]]
+            self.row_total += last - first + 1
+            self.endInsertRows()
+
+        # Kept rows may have new values; the view repaints only what is visible
+        for field in fields:
+            self.columns[field] = self._stored(field, (row.get(field) for row in rows))
+        self.search_keys = [self._search_key(row) for row in rows]
+        self.dataChanged.emit(self.index(0, 0),
+                              self.index(self.row_total - 1, self.columnCount() - 1))
+
+    def reset_rows(self, rows: Sequence[Dict[str, Any]]):
+        """Replace all rows with a model reset"""
+        self.beginResetModel()
+        fields = list(rows[0].keys()) if rows else list(self.columns)
+        self.columns = {field: self._stored(field, (row.get(field) for row in rows))
+                        for field in fields}
+        self.search_keys = [self._search_key(row) for row in rows]
+        self.row_total = len(rows)
+        self.endResetModel()
+
+    def upsert_row(self, row: Dict[str, Any]):
+        """Update a row in place, or insert it at its sorted position"""
+        position = self.find_row(row.get(self.KEY_FIELD))
+        if position is not None:
+            if not self.SORT_FIELD or row.get(self.SORT_FIELD) == self.value(position,
+                                                                             self.SORT_FIELD):
+                for field, value in row.items():
+                    self._column(field)[position] = self._stored(field, [value])[0]
+                self.search_keys[position] = self._search_key(self.row_data(position))
+                self.dataChanged.emit(self.index(position, 0),
+                                      self.index(position, self.columnCount() - 1))
+                return
+            # The sort value changed: move the row
+            self.remove_row(row.get(self.KEY_FIELD))
+
+        for field in row:
+            self._column(field)
+        position = self._sorted_position(row)
+        self.beginInsertRows(QModelIndex(), position, position)
+        for field, values in self.columns.items():
+            values.insert(position, self._stored(field, [row.get(field)])[0])
+        self.search_keys.insert(position, self._search_key(row))
+        self.row_total += 1
+        self.endInsertRows()
+
+    def remove_row(self, key: Any) -> bool:
+        """Remove the row with a key; False when it is not shown"""
+        position = self.find_row(key)
+        if position is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), position, position)
+        for values in self.columns.values():
+            del values[position]
+        del self.search_keys[position]
+        self.row_total -= 1
+        self.endRemoveRows()
+        return True
+
+    def find_row(self, key: Any) -> Optional[int]:
+        """Get the position of the row with a key"""
+        try:
+            return self.columns.get(self.KEY_FIELD, []).index(key)
+        except ValueError:
+            return None
+
+    def value(self, row: int, field: str) -> Any:
+        """Get one stored field of a row"""
+        column = self.columns.get(field)
+        return column[row] if column is not None else None
+
+    def row_data(self, row: int) -> Dict[str, Any]:
+        """Rebuild the row as the dict the database returned"""
+        return {field: values[row] for field, values in self.columns.items()}
+
+    def _column(self, field: str) -> List[Any]:
+        """Get the values of a field, adding the field when it is new"""
+        if field not in self.columns:
+            self.columns[field] = [None] * self.row_total
+        return self.columns[field]
+
+    def _stored(self, field: str, values: Iterable[Any]) -> List[Any]:
+        """Prepare values of a field for storage, interning shared strings"""
+        if field in self.SHARED_FIELDS:
+            return [sys.intern(value) if isinstance(value, str) else value for value in values]
+        return list(values)
+
+    def _search_key(self, row: Dict[str, Any]) -> str:
+        """Join the lowercased SEARCH_FIELDS of a row"""
+        return " ".join(str(row.get(field) or '') for field in self.SEARCH_FIELDS).lower()
+
+    def _sorted_position(self, row: Dict[str, Any]) -> int:
+        """Binary search for where a row goes in SORT_FIELD order, after equal values"""
+        if not self.SORT_FIELD:
+            return self.row_total
+        values = self.columns[self.SORT_FIELD]
+        target = row.get(self.SORT_FIELD)
+        low, high = 0, self.row_total
+        while low < high:
+            middle = (low + high) // 2
+            if self.SORT_DESCENDING:
+                before = values[middle] >= target
+            else:
+                before = values[middle] <= target
+            if before:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    @staticmethod
+    def _runs(rows: List[int]) -> List[Tuple[int, int]]:
+        """Group sorted row numbers into (first, last) runs of consecutive rows"""
+        runs: List[Tuple[int, int]] = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1] = (runs[-1][0], row)
+            else:
+                runs.append((row, row))
+        return runs
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_total
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.display(index.row(), index.column(), role)
+
+    def display(self, row: int, column: int, role: int) -> Any:
+        """Get the value of a cell for a role"""
+        raise NotImplementedError
+
+
+class FilterProxyModel(QAbstractProxyModel):
+    """Shows the rows of a ColumnStoreModel that match a search text and field values
+
+    The matching source rows are kept as a sorted list and found with list
+    comprehensions over the model's search_keys and columns, instead of a
+    filterAcceptsRow() call per row as in QSortFilterProxyModel, so
+    filtering tens of thousands of rows takes milliseconds. Rows inserted,
+    removed or changed in the source are applied as row diffs.
+    """
+
+    # More scattered changes than this are applied as a reset
+    MAX_DIFF_RUNS = 64
+
+    def __init__(self, source: ColumnStoreModel, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.search_text = ""
+        self.field_values: Dict[str, Any] = {}
+        self.source_rows: List[int] = []
+        self._removing = (0, 0)
+        self.setSourceModel(source)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self._on_source_reset)
+        source.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        source.rowsRemoved.connect(self._on_rows_removed)
+        source.rowsInserted.connect(self._on_rows_inserted)
+        source.dataChanged.connect(self._on_data_changed)
+        self.source_rows = self._matching(0, source.row_total)
+
+    def set_filter(self, search_text: str = "", **field_values):
+        """Show the rows whose search key contains search_text and whose fields equal field_values"""
+        self.beginResetModel()
+        self.search_text = search_text.lower()
+        self.field_values = field_values
+        self.source_rows = self._matching(0, self.source.row_total)
+        self.endResetModel()
+
+    def _matching(self, first: int, stop: int) -> List[int]:
+        """Get the source rows in [first, stop) that pass the filter"""
+        rows: Iterable[int] = range(first, stop)
+        for field, value in self.field_values.items():
+            column = self.source.columns.get(field)
+            if column is None:
+                return []
+            rows = [row for row in rows if column[row] == value]
+        if self.search_text:
+            keys = self.source.search_keys
+            text = self.search_text
+            rows = [row for row in rows if text in keys[row]]
+        return list(rows)
+
+    def _on_source_reset(self):
+        self.source_rows = self._matching(0, self.source.row_total)
+        self.endResetModel()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        low = bisect_left(self.source_rows, first)
+        high = bisect_right(self.source_rows, last)
+        self._removing = (low, high)
+        if high > low:
+            self.beginRemoveRows(QModelIndex(), low, high - 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        low, high = self._removing
+        count = last - first + 1
+        self.source_rows[low:] = [row - count for row in self.source_rows[high:]]
+        if high > low:
+            self.endRemoveRows()
+
+    def _on_rows_inserted(self, parent, first, last):
+        count = last - first + 1
+        position = bisect_left(self.source_rows, first)
+        self.source_rows[position:] = [row + count for row in self.source_rows[position:]]
+        matching = self._matching(first, last + 1)
+        if matching:
+            self.beginInsertRows(QModelIndex(), position, position + len(matching) - 1)
+            self.source_rows[position:position] = matching
+            self.endInsertRows()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        """Rows may start or stop matching: diff the proxy rows of the changed range"""
+        low = bisect_left(self.source_rows, top_left.row())
+        high = bisect_right(self.source_rows, bottom_right.row())
+        matching = self._matching(top_left.row(), bottom_right.row() + 1)
+        shown = self.source_rows[low:high]
+        if matching != shown:
+            kept = set(matching)
+            added = kept.difference(shown)
+            removed = ColumnStoreModel._runs([low + i for i, row in enumerate(shown)
+                                              if row not in kept])
+            inserted = ColumnStoreModel._runs([low + i for i, row in enumerate(matching)
+                                               if row in added])
+            if len(removed) + len(inserted) > self.MAX_DIFF_RUNS:
+                self.beginResetModel()
+                self.source_rows[low:high] = matching
+                self.endResetModel()
+                return
+            # Same order as ColumnStoreModel.set_rows: removals bottom-up, insertions top-down
+            for first, last in reversed(removed):
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self.source_rows[first:last + 1]
+                self.endRemoveRows()
+            for first, last in inserted:
+                self.beginInsertRows(QModelIndex(), first, last)
+                self.source_rows[first:first] = matching[first - low:last - low + 1]
+                self.endInsertRows()
+        if matching:
+            self.dataChanged.emit(self.index(low, 0),
+                                  self.index(low + len(matching) - 1, self.columnCount() - 1))
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.source.index(self.source_rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        position = bisect_left(self.source_rows, source_index.row())
+        if position < len(self.source_rows) and self.source_rows[position] == source_index.row():
+            return self.index(position, source_index.column())
+        return QModelIndex()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < len(self.source_rows)
+                                    and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.source_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.source.columnCount()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        # Horizontal headers do not depend on which rows are shown
+        return self.source.headerData(section, orientation, role)
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Draws a row of buttons in a cell and reports clicks, without per-row widgets"""
+
+    clicked = pyqtSignal(QModelIndex, int)  # index, button number
+
+    def __init__(self, buttons: Sequence[Tuple[str, str]], parent=None, margin: int = 2,
+                 font_size: int = 10):
+        """buttons: (label, background color) pairs, left to right"""
+        super().__init__(parent)
+        self.buttons = [(label, QColor(color)) for label, color in buttons]
+        self.margin = margin
+        self.font_size = font_size
+
+    def button_rects(self, rect: QRect) -> List[QRect]:
+        """Get the rectangles of the buttons inside a cell"""
+        inner = rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        count = len(self.buttons)
+        width = (inner.width() - self.margin * (count - 1)) // count
+        return [QRect(inner.left() + i * (width + self.margin), inner.top(), width, inner.height())
+                for i in range(count)]
+
+    def paint(self, painter, option, index):
+        # Background and selection first; the cell itself has no text
+        super().paint(painter, option, index)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        font = QFont(option.font)
+        font.setPixelSize(self.font_size)
+        painter.setFont(font)
+        for rect, (label, color) in zip(self.button_rects(option.rect), self.buttons):
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(color)
+            painter.drawRoundedRect(rect, 4, 4)
+            painter.setPen(Qt.white)
+            painter.drawText(rect, Qt.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            for number, rect in enumerate(self.button_rects(option.rect)):
+                if rect.contains(event.pos()):
+                    self.clicked.emit(index, number)
+                    return True
+        return super().editorEvent(event, model, option, index)